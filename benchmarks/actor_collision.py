@@ -0,0 +1,94 @@
+"""
+Stress scenario for actor-vs-actor collision: a crowd of enemies converging on the player, timed with and without the
+ActiveGroup broad phase
+
+Usage: python -m benchmarks.actor_collision
+"""
+from pygame.math import Vector2
+
+from random import Random
+
+from settings import *
+from src.groups import CollisionGroup, ActiveGroup
+from .common import init_pygame, Actor, Block, time_frames, summarise
+
+
+ENEMY_COUNTS = (50, 200, 1000)
+FRAMES = 20
+ARENA_TILES = 48
+
+
+def brute_force(collision_sprites: CollisionGroup, active_sprites: ActiveGroup, player: Actor):
+    # The pre-broad phase update_active_sprites_position(), with every active sprite checked against every other one
+    for active_sprite in active_sprites:
+        active_sprite.rect.x += active_sprite.delta.x
+        collision_sprites.check_collision(active_sprite, collision_sprites.grid.query(active_sprite.rect), 'horizontal', player)
+        collision_sprites.check_collision(active_sprite, active_sprites, 'horizontal', player)
+
+        active_sprite.rect.y += active_sprite.delta.y
+        collision_sprites.check_collision(active_sprite, collision_sprites.grid.query(active_sprite.rect), 'vertical', player)
+        collision_sprites.check_collision(active_sprite, active_sprites, 'vertical', player)
+
+
+def build_scene(enemy_count: int, seed: int = 0):
+    rng = Random(seed)
+
+    collision_sprites = CollisionGroup()
+    active_sprites = ActiveGroup()
+
+    # Walled square arena
+    for i in range(ARENA_TILES):
+        for pos in ((i, 0), (i, ARENA_TILES - 1), (0, i), (ARENA_TILES - 1, i)):
+            Block((pos[0] * TILE_SIZE, pos[1] * TILE_SIZE), [collision_sprites])
+
+    centre = ARENA_TILES * TILE_SIZE // 2
+    player = Actor((centre, centre), [active_sprites]) # player must be the first active sprite, as it is in Game
+
+    span = (ARENA_TILES - 2) * TILE_SIZE - 64
+    enemies = [Actor((TILE_SIZE + rng.randrange(span), TILE_SIZE + rng.randrange(span)), [active_sprites]) for _ in range(enemy_count)]
+
+    return collision_sprites, active_sprites, player, enemies
+
+
+def chase(player: Actor, enemies: list[Actor], vel: float = 3):
+    # Same steering as Enemy.persue_player(), so the crowd packs up around the player over the run
+    target = player.rect.center
+
+    for enemy in enemies:
+        centre = Vector2(enemy.rect.center)
+        enemy.delta = centre.move_towards(target, vel) - centre
+        enemy.direction.x = (enemy.delta.x > 0) - (enemy.delta.x < 0)
+        enemy.direction.y = (enemy.delta.y > 0) - (enemy.delta.y < 0)
+
+
+def measure(enemy_count: int, update) -> dict:
+    collision_sprites, active_sprites, player, enemies = build_scene(enemy_count)
+
+    def frame():
+        chase(player, enemies)
+        update(collision_sprites, active_sprites, player)
+
+    # Steering is timed along with collision, so time it on its own and take it back off
+    steering = summarise(time_frames(lambda: chase(player, enemies), FRAMES))['mean ms']
+    collision_sprites, active_sprites, player, enemies = build_scene(enemy_count)
+
+    result = summarise(time_frames(frame, FRAMES))
+    result['mean ms'] = round(max(result['mean ms'] - steering, 0), 4)
+
+    return result
+
+
+def run():
+    init_pygame()
+
+    print(f'{"enemies":>8} {"all pairs ms/frame":>19} {"broad phase ms/frame":>21} {"speedup":>8}')
+
+    for enemy_count in ENEMY_COUNTS:
+        brute = measure(enemy_count, brute_force)
+        broad = measure(enemy_count, lambda c, a, p: c.update_active_sprites_position(a, p))
+
+        print(f'{enemy_count:>8} {brute["mean ms"]:>19.3f} {broad["mean ms"]:>21.3f} {brute["mean ms"] / broad["mean ms"]:>7.1f}x')
+
+
+if __name__ == '__main__':
+    run()
@@ -0,0 +1,101 @@
+"""
+Compares decoding every effect and every music track into a Sound (how the game used to load its audio) with the sound bank,
+which decodes the effects and streams the music through pygame.mixer.music. Reports the decoded audio memory, the resident
+memory growth, the slowest music start (the hitch the first play of a track used to cause) and how many of 20 same-frame plays
+of one effect actually start a voice. Every mode runs in a fresh interpreter
+
+Usage: python -m benchmarks.audio
+"""
+import pygame
+
+import json
+import os
+import subprocess
+import sys
+from time import perf_counter
+
+from settings import *
+from .common import init_pygame
+
+
+MODES = ('decoded', 'bank')
+HITS = 20
+
+
+def get_rss() -> int:
+    # Current resident memory in kB
+    with open('/proc/self/statm') as rf:
+        return int(rf.read().split()[1]) * os.sysconf('SC_PAGE_SIZE') // 1024
+
+
+def measure(mode: str) -> dict:
+    init_pygame()
+
+    from src.sound import sounds, EFFECTS, MUSIC
+
+    frequency, size, channels = pygame.mixer.get_init()
+    music = {name: path for name, (path, _) in MUSIC.items() if os.path.exists(path)}
+    rss_before = get_rss()
+    music_starts = []
+
+    if mode == 'decoded':
+        decoded = [pygame.mixer.Sound(path) for path, _ in EFFECTS.values()]
+
+        for path in music.values():
+            start = perf_counter()
+            track = pygame.mixer.Sound(path)
+            track.play()
+            music_starts.append(perf_counter() - start)
+            decoded.append(track)
+
+        decoded_bytes = int(sum(sound.get_length() * frequency for sound in decoded) * abs(size) // 8 * channels)
+
+        played = 0
+        for _ in range(HITS):
+            if pygame.mixer.find_channel() is not None:
+                decoded[0].play()
+                played += 1
+
+    else:
+        for name in EFFECTS:
+            sounds.get(name)
+
+        for name in music:
+            start = perf_counter()
+            sounds.play_music(name)
+            music_starts.append(perf_counter() - start)
+
+        decoded_bytes = sounds.get_decoded_bytes()
+
+        for _ in range(HITS):
+            sounds.play('enemy hurt')
+        played = sounds.plays
+
+    return {
+        'mode': mode,
+        'decoded kB': decoded_bytes // 1024,
+        'rss kB': get_rss() - rss_before,
+        'max music start ms': max(music_starts) * 1000 if music_starts else 0,
+        'voices started': played,
+        'missing music': [name for name in MUSIC if name not in music]
+    }
+
+
+def run():
+    print(f'{"mode":>8} {"decoded kB":>11} {"rss kB":>8} {"max music start ms":>19} {f"voices of {HITS} hits":>17}')
+
+    for mode in MODES:
+        output = subprocess.run([sys.executable, '-m', 'benchmarks.audio', mode], capture_output=True, text=True, check=True).stdout
+        result = json.loads(output.strip().splitlines()[-1])
+
+        print(f'{result["mode"]:>8} {result["decoded kB"]:>11} {result["rss kB"]:>8} {result["max music start ms"]:>19.2f} {result["voices started"]:>17}')
+
+    if result['missing music']:
+        print(f'missing music files, left out of both modes: {", ".join(result["missing music"])}')
+
+
+if __name__ == '__main__':
+    if len(sys.argv) == 2:
+        print(json.dumps(measure(sys.argv[1])))
+    else:
+        run()
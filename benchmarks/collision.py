@@ -0,0 +1,64 @@
+"""
+Compares the grid-indexed wall collision in CollisionGroup against the old linear scan over every wall
+
+Usage: python -m benchmarks.collision
+"""
+from pygame.sprite import Group
+
+from random import Random
+
+from src.groups import CollisionGroup, ActiveGroup
+from .common import init_pygame, Actor, Block, wall_positions, floor_positions, time_frames, summarise
+
+
+WALL_COUNTS = (1_000, 10_000, 100_000)
+ACTORS = 20
+FRAMES = 10
+
+
+def linear_scan(collision_sprites: CollisionGroup, active_sprites: Group, player: Actor):
+    # The pre-grid update_active_sprites_position(), with walls checked by walking the whole group
+    for active_sprite in active_sprites:
+        active_sprite.rect.x += active_sprite.delta.x
+        collision_sprites.check_collision(active_sprite, collision_sprites, 'horizontal', player)
+        collision_sprites.check_collision(active_sprite, active_sprites, 'horizontal', player)
+
+        active_sprite.rect.y += active_sprite.delta.y
+        collision_sprites.check_collision(active_sprite, collision_sprites, 'vertical', player)
+        collision_sprites.check_collision(active_sprite, active_sprites, 'vertical', player)
+
+
+def build_scene(wall_count: int, seed: int = 0):
+    rng = Random(seed)
+
+    collision_sprites = CollisionGroup()
+    active_sprites = ActiveGroup()
+
+    walls = wall_positions(wall_count)
+    for pos in walls:
+        Block(pos, [collision_sprites])
+
+    actors = [Actor(pos, [active_sprites]) for pos in floor_positions(ACTORS, walls, rng)]
+    for actor in actors:
+        actor.steer(rng)
+
+    return collision_sprites, active_sprites, actors[0]
+
+
+def run():
+    init_pygame()
+
+    print(f'{"walls":>8} {"linear ms/frame":>16} {"grid ms/frame":>14} {"speedup":>8}')
+
+    for wall_count in WALL_COUNTS:
+        collision_sprites, active_sprites, player = build_scene(wall_count)
+        linear = summarise(time_frames(lambda: linear_scan(collision_sprites, active_sprites, player), FRAMES))
+
+        collision_sprites, active_sprites, player = build_scene(wall_count)
+        grid = summarise(time_frames(lambda: collision_sprites.update_active_sprites_position(active_sprites, player), FRAMES))
+
+        print(f'{wall_count:>8} {linear["mean ms"]:>16.3f} {grid["mean ms"]:>14.3f} {linear["mean ms"] / grid["mean ms"]:>7.1f}x')
+
+
+if __name__ == '__main__':
+    run()
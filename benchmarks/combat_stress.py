@@ -0,0 +1,114 @@
+"""
+Combat stress test: a red 4 dies next to the player every few ticks and drops its coins through ActiveGroup.drop_coins, which the
+player then picks up, for a few thousand ticks. Runs with the coin pool and with it turned off (every coin built from scratch),
+each in a fresh interpreter, and reports the coins allocated, the time to drop a coin, the garbage collections and their pauses
+and the frame times
+
+Usage: python -m benchmarks.combat_stress [--ticks 3000]
+"""
+import pygame
+
+import argparse
+import gc
+import json
+import subprocess
+import sys
+from time import perf_counter
+
+from settings import *
+from .common import init_pygame, summarise
+
+
+MODES = ('pool', 'no pool')
+DEATH_INTERVAL = 10 # ticks between deaths
+
+
+def measure(mode: str, ticks: int) -> dict:
+    init_pygame(display=True)
+
+    from src.game import Game
+    from src.controls import ScriptedInput
+    from src.pool import coin_pool
+
+    if mode == 'no pool':
+        coin_pool.limit = 0
+
+    win = pygame.display.get_surface()
+    game = Game(ScriptedInput([]))
+
+    player = game.player.sprite
+    player.health = player.initial_health = 10 ** 9
+    groups = [game.camera_sprites, game.animation_sprites, game.interactive_sprites]
+
+    collections = {0: 0, 1: 0, 2: 0}
+    pauses = []
+    started = []
+
+    def on_gc(phase: str, info: dict):
+        if phase == 'start':
+            started.append(perf_counter())
+        else:
+            pauses.append(perf_counter() - started.pop())
+            collections[info['generation']] += 1
+
+    gc.collect()
+    gc.callbacks.append(on_gc)
+
+    samples = []
+    coins_before = player.coins
+    dropped = 0
+    drop_time = 0
+
+    for tick in range(ticks):
+        start = perf_counter()
+
+        if tick % DEATH_INTERVAL == 0:
+            enemy = game.create_enemy('red 4', (0, 0))
+            enemy.rect.center = (player.rect.centerx + 40, player.rect.centery)
+            drop_start = perf_counter()
+            game.active_sprites.drop_coins(enemy, groups)
+            drop_time += perf_counter() - drop_start
+            enemy.kill()
+            dropped += enemy.coin_drops
+
+        win.fill(COLOURS['background'])
+        game.step()
+        game.draw()
+        samples.append(perf_counter() - start)
+
+    gc.callbacks.remove(on_gc)
+
+    return {
+        'mode': mode,
+        'coins dropped': dropped,
+        'coins collected': player.coins - coins_before,
+        'coins allocated': coin_pool.created,
+        'us per drop': drop_time / dropped * 1e6,
+        'gc': collections,
+        'gc total ms': sum(pauses) * 1000,
+        'gc max ms': max(pauses, default=0) * 1000,
+        'frame': summarise(samples)
+    }
+
+
+def run(ticks: int):
+    print(f'{"mode":>8} {"dropped":>8} {"collected":>10} {"allocated":>10} {"us/coin":>8} {"gen0":>6} {"gen1":>5} {"gen2":>5} {"gc ms":>7} {"gc max ms":>10} {"p99 ms":>7} {"max ms":>7}')
+
+    for mode in MODES:
+        output = subprocess.run([sys.executable, '-m', 'benchmarks.combat_stress', '--mode', mode, '--ticks', str(ticks)], capture_output=True, text=True, check=True).stdout
+        result = json.loads(output.strip().splitlines()[-1])
+        gc_counts = result['gc']
+
+        print(f'{mode:>8} {result["coins dropped"]:>8} {result["coins collected"]:>10} {result["coins allocated"]:>10} {result["us per drop"]:>8.2f} {gc_counts["0"]:>6} {gc_counts["1"]:>5} {gc_counts["2"]:>5} {result["gc total ms"]:>7.2f} {result["gc max ms"]:>10.2f} {result["frame"]["p99 ms"]:>7.3f} {result["frame"]["max ms"]:>7.3f}')
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--ticks', type=int, default=3000)
+    parser.add_argument('--mode', choices=MODES, help='measure one mode in this interpreter and print it as JSON')
+    args = parser.parse_args()
+
+    if args.mode:
+        print(json.dumps(measure(args.mode, args.ticks)))
+    else:
+        run(args.ticks)
@@ -0,0 +1,156 @@
+import pygame
+from pygame.math import Vector2
+from pygame.sprite import Sprite
+
+import os
+from array import array
+from collections import Counter
+from random import Random
+from time import perf_counter
+from statistics import mean
+
+from settings import *
+
+
+def init_pygame(display: bool = False):
+    """
+    Note: Benchmarks run without a window, so SDL is pointed at its dummy drivers before pygame is initialised
+    """
+    os.environ.setdefault('SDL_VIDEODRIVER', 'dummy')
+    os.environ.setdefault('SDL_AUDIODRIVER', 'dummy')
+
+    pygame.init()
+
+    if display:
+        pygame.display.set_mode((WIN_X, WIN_Y))
+
+
+class Actor(Sprite):
+    """
+    Note: Stand-in for Player/Enemy with only the attributes the collision code reads (rect, delta and direction)
+    """
+    def __init__(self, pos: tuple, groups: list, size: int = 48):
+        super().__init__(groups)
+
+        self.rect = pygame.Rect(*pos, size, size)
+        self.delta = Vector2()
+        self.direction = Vector2()
+
+    def steer(self, rng: Random, vel: float = 4):
+        self.direction = Vector2(rng.choice((-1, 1)), rng.choice((-1, 1)))
+        self.delta = self.direction * vel
+
+
+class Block(Sprite):
+    def __init__(self, pos: tuple, groups: list, size: int = TILE_SIZE):
+        super().__init__(groups)
+
+        self.rect = pygame.Rect(*pos, size, size)
+
+
+def wall_positions(count: int, room_size: int = 8) -> list[tuple[int, int]]:
+    """
+    Note: Lays out count wall tiles as a grid of square rooms, row by row, so actors have open floor to walk on
+    """
+    positions = []
+    width = max(room_size, int((count * room_size / 2) ** 0.5)) # a room of n tiles has about 2n walls per n^2 tiles
+
+    y = 0
+    while len(positions) < count:
+        for x in range(width):
+            if x % room_size == 0 or y % room_size == 0:
+                positions.append((x * TILE_SIZE, y * TILE_SIZE))
+
+                if len(positions) == count:
+                    break
+        y += 1
+
+    return positions
+
+
+def floor_positions(count: int, walls: list[tuple[int, int]], rng: Random) -> list[tuple[int, int]]:
+    taken = set(walls)
+    width = max(x for x, _ in walls) // TILE_SIZE + 1
+    height = max(y for _, y in walls) // TILE_SIZE + 1
+
+    positions = []
+    while len(positions) < count:
+        pos = (rng.randrange(width) * TILE_SIZE, rng.randrange(height) * TILE_SIZE)
+        if pos not in taken:
+            positions.append((pos[0] + 8, pos[1] + 8))
+
+    return positions
+
+
+def generate_level(size: int, room_size: int = 16, seed: int = 0):
+    """
+    Note: Builds a size x size tile LevelData of square rooms joined by 2 tile wide doors in the middle of every wall, with an
+    enemy and two coins per room, the spawn point in the middle room and a ladder in the corner of the first one (every level needs
+    one). Tiles are the most common ground, wall, coin and ladder tiles of level_1.tmx
+    """
+    from src.level import LevelData, load_level_data
+
+    source = load_level_data(LEVELS[0])
+    tiles = [None] + [source.tiles[Counter(i for i in source.layers[name] if i).most_common(1)[0][0]] for name in ('Ground', 'Wall', 'Coin', 'Ladder')]
+    ground, wall, coin, ladder = 1, 2, 3, 4
+
+    rng = Random(seed)
+    middle = room_size // 2
+
+    def is_wall(x: int, y: int) -> bool:
+        if x in (0, size - 1) or y in (0, size - 1):
+            return True
+        return (x % room_size == 0 and y % room_size not in (middle - 1, middle)) or (y % room_size == 0 and x % room_size not in (middle - 1, middle))
+
+    layers = {
+        'Ground': array('H', [ground]) * (size * size),
+        'Wall': array('H', [wall if is_wall(x, y) else 0 for y in range(size) for x in range(size)]),
+        'Coin': array('H', bytes(size * size * 2)),
+        'Ladder': array('H', bytes(size * size * 2))
+    }
+    layers['Ladder'][size + 1] = ladder
+
+    rooms = size // room_size
+    objects = []
+
+    for room_x in range(rooms):
+        for room_y in range(rooms):
+            left, top = room_x * room_size + 2, room_y * room_size + 2
+
+            for _ in range(2):
+                layers['Coin'][(top + rng.randrange(room_size - 4)) * size + left + rng.randrange(room_size - 4)] = coin
+
+            objects.append(('red 1', (left + rng.randrange(room_size - 4)) * TILE_SIZE, (top + rng.randrange(room_size - 4)) * TILE_SIZE))
+
+    spawn = (rooms // 2 * room_size + middle) * TILE_SIZE
+    objects.insert(0, ('Spawn Point', spawn, spawn))
+
+    level = LevelData(size, size, layers, tiles, objects)
+    level.converted = True
+
+    return level
+
+
+def time_frames(frame, frames: int) -> list[float]:
+    samples = []
+
+    for _ in range(frames):
+        start = perf_counter()
+        frame()
+        samples.append(perf_counter() - start)
+
+    return samples
+
+
+def summarise(samples: list[float]) -> dict:
+    ordered = sorted(samples)
+
+    def percentile(p: float) -> float:
+        return ordered[min(len(ordered) - 1, int(len(ordered) * p))] * 1000
+
+    return {
+        'mean ms': round(mean(ordered) * 1000, 4),
+        'p95 ms': round(percentile(0.95), 4),
+        'p99 ms': round(percentile(0.99), 4),
+        'max ms': round(ordered[-1] * 1000, 4)
+    }
@@ -0,0 +1,116 @@
+"""
+Compares drawing the static Ground/Bone/Wall layers of level_1.tmx one 64x64 tile at a time (the old draw_sprites) against
+blitting the pre-rendered chunks in CameraGroup, and drawing actor shadows scaled every frame against the cached shadows
+
+Usage: python -m benchmarks.draw
+"""
+import pygame
+from pytmx import TiledTileLayer
+from pytmx.util_pygame import load_pygame
+
+from pygame.math import Vector2
+
+from random import Random
+
+from settings import *
+from src.groups import CameraGroup
+from .common import init_pygame, Actor, time_frames, summarise
+
+
+LEVEL = './assets/tmx/level_1.tmx'
+STATIC_LAYERS = ('Ground', 'Bone', 'Wall')
+FRAMES = 300
+SHADOW_ACTORS = 100
+
+
+def load_static_tiles(path: str) -> list[tuple[pygame.Surface, tuple[int, int]]]:
+    tmx_data = load_pygame(path)
+    tiles = []
+
+    for layer in tmx_data.visible_layers:
+        if isinstance(layer, TiledTileLayer) and layer.name in STATIC_LAYERS:
+            for x, y, surface in layer.tiles():
+                tiles.append((pygame.transform.scale(surface, (TILE_SIZE, TILE_SIZE)), (x * TILE_SIZE, y * TILE_SIZE)))
+
+    return tiles
+
+
+def camera_path(frames: int, map_pixels: int) -> list[tuple[float, float]]:
+    # Pans diagonally across the map so every chunk is on screen at some point
+    return [(i / frames * (map_pixels - WIN_X), i / frames * (map_pixels - WIN_Y)) for i in range(frames)]
+
+
+def print_results(results: dict):
+    print(f'{"":>14} {"mean ms":>9} {"p95 ms":>9} {"p99 ms":>9}')
+    for name, result in results.items():
+        print(f'{name:>14} {result["mean ms"]:>9.3f} {result["p95 ms"]:>9.3f} {result["p99 ms"]:>9.3f}')
+
+    before, after = results.values()
+    print(f'speedup: {before["mean ms"] / after["mean ms"]:.1f}x')
+
+
+def run_shadows():
+    win = pygame.display.get_surface()
+    rng = Random(0)
+
+    camera_sprites = CameraGroup()
+    actors = [Actor((rng.randrange(WIN_X - 64), rng.randrange(WIN_Y - 64)), [camera_sprites], size=rng.choice((48, 64))) for _ in range(SHADOW_ACTORS)]
+
+    def shadow_args(sprite: Actor) -> tuple:
+        return (sprite.rect.width / 1.8, sprite.rect.height / 3.5), sprite.rect.bottomleft - camera_sprites.offset + Vector2(15, -10)
+
+    allocations = 0
+    def scaled_every_frame():
+        nonlocal allocations
+        for sprite in actors:
+            size, pos = shadow_args(sprite)
+            win.blit(pygame.transform.scale(camera_sprites.shadow_image, size), pos)
+            allocations += 1
+
+    def cached():
+        for sprite in actors:
+            size, pos = shadow_args(sprite)
+            win.blit(camera_sprites.get_shadow(size), pos)
+
+    results = {'scaled': summarise(time_frames(scaled_every_frame, FRAMES)), 'cached': summarise(time_frames(cached, FRAMES))}
+
+    print(f'\n{SHADOW_ACTORS} actor shadows')
+    print(f'surfaces allocated per frame: scaled {allocations // FRAMES}, cached {len(camera_sprites.shadow_images)} in total')
+    print_results(results)
+
+
+def run():
+    init_pygame(display=True)
+    win = pygame.display.get_surface()
+
+    tiles = load_static_tiles(LEVEL)
+    camera_sprites = CameraGroup()
+    for image, pos in tiles:
+        camera_sprites.add_static_tile(pos, image)
+
+    map_pixels = max(max(pos) for _, pos in tiles) + TILE_SIZE
+    path = camera_path(FRAMES, map_pixels)
+
+    frame_index = iter(range(FRAMES))
+    def per_tile():
+        offset = pygame.math.Vector2(path[next(frame_index)])
+        for image, pos in tiles:
+            win.blit(image, pos - offset)
+
+    per_tile_result = summarise(time_frames(per_tile, FRAMES))
+
+    frame_index = iter(range(FRAMES))
+    def chunked():
+        camera_sprites.offset.update(path[next(frame_index)])
+        camera_sprites.draw_static_chunks()
+
+    chunked_result = summarise(time_frames(chunked, FRAMES))
+
+    print(f'static tiles: {len(tiles)}, chunks: {len(camera_sprites.static_chunks)} ({CHUNK_SIZE}x{CHUNK_SIZE} tiles)')
+    print_results({'per tile': per_tile_result, 'chunked': chunked_result})
+
+    run_shadows()
+
+
+if __name__ == '__main__':
+    run()
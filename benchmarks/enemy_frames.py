@@ -0,0 +1,77 @@
+"""
+Per-frame cost of picking enemy and player images with 100 enemies on screen: flipping and building masks every frame (the old
+Enemy.update_image / Player.animate) against looking them up in the shared (frame, facing) table
+
+Usage: python -m benchmarks.enemy_frames
+"""
+import pygame
+from pygame.sprite import Group, GroupSingle
+
+import json
+from random import Random
+
+from settings import *
+from .common import init_pygame, time_frames, summarise
+
+
+ENEMIES = 100
+FRAMES = 300
+
+
+def build_scene(seed: int = 0):
+    from src.groups import CameraGroup, AnimationGroup
+    from src.player import Player
+    from src.enemy import Enemy
+
+    rng = Random(seed)
+
+    camera_sprites = CameraGroup()
+    animation_sprites = AnimationGroup()
+    enemy_sprites = Group()
+
+    player = Player((WIN_X / 2, WIN_Y / 2), [camera_sprites, GroupSingle()])
+
+    with open('./data/enemy_data.json') as rf:
+        enemy_names = list(json.load(rf))
+
+    enemies = [Enemy((rng.randrange(WIN_X - 64), rng.randrange(WIN_Y - 64)), [camera_sprites, animation_sprites, enemy_sprites], rng.choice(enemy_names)) for _ in range(ENEMIES)]
+    for i, enemy in enumerate(enemies):
+        enemy.facing_right = i % 2 == 0
+
+    return player, enemies, animation_sprites
+
+
+def flip_and_mask(player, enemies: list, animation_sprites):
+    # What Enemy.update_image and Player.animate did every frame before the table
+    animation_sprites.animate()
+
+    for sprite, image in [(player, player.p_animations[player.status][int(player.p_animation_index)])] + [(enemy, enemy.image) for enemy in enemies]:
+        sprite.image = image if sprite.facing_right else pygame.transform.flip(image, True, False)
+        sprite.mask = pygame.mask.from_surface(sprite.image)
+
+
+def table_lookup(player, enemies: list, animation_sprites):
+    animation_sprites.animate()
+
+    player.animate()
+    for enemy in enemies:
+        enemy.update_image()
+
+
+def run():
+    init_pygame(display=True)
+
+    print(f'{ENEMIES} enemies on screen, {FRAMES} frames')
+    print(f'{"":>14} {"mean ms":>9} {"p95 ms":>9} {"p99 ms":>9}')
+
+    results = {}
+    for name, frame in (('flip and mask', flip_and_mask), ('cached table', table_lookup)):
+        scene = build_scene()
+        results[name] = summarise(time_frames(lambda: frame(*scene), FRAMES))
+        print(f'{name:>14} {results[name]["mean ms"]:>9.3f} {results[name]["p95 ms"]:>9.3f} {results[name]["p99 ms"]:>9.3f}')
+
+    print(f'speedup: {results["flip and mask"]["mean ms"] / results["cached table"]["mean ms"]:.1f}x')
+
+
+if __name__ == '__main__':
+    run()
@@ -0,0 +1,89 @@
+"""
+Spawns 1,000 enemies (cycling through every type) with the shared stats records from src/data.py and with the old loader (a listdir of
+the enemy assets and a parse of the whole enemy_data.json for every enemy), and reports the time per spawn and the memory the
+enemies' data takes
+
+Usage: python -m benchmarks.enemy_spawn [--count 1000] [--repeat 5]
+"""
+from pygame.sprite import Group
+
+import argparse
+import json
+import sys
+from os import listdir
+from time import perf_counter
+
+from settings import *
+from .common import init_pygame
+
+
+def make_legacy_enemy():
+    from src.data import EnemyStats
+    from src.enemy import Enemy
+
+    class LegacyEnemy(Enemy):
+        # Loads its data the way Enemy did before the data store
+        def import_enemy_data(self):
+            assert self.enemy_name in listdir('./assets/enemies/'), 'Enemy not found in assets'
+
+            with open('./data/enemy_data.json') as rf:
+                self.data: dict = json.load(rf)[self.enemy_name]
+
+            self.stats = EnemyStats(*(self.data[field.replace('_', ' ')] for field in EnemyStats._fields))
+
+    return LegacyEnemy
+
+
+def spawn(enemy_class, names: list[str], count: int) -> tuple[float, list]:
+    group = Group()
+
+    start = perf_counter()
+    enemies = [enemy_class((i % 64 * TILE_SIZE, i // 64 * TILE_SIZE), [group], names[i % len(names)]) for i in range(count)]
+
+    return perf_counter() - start, enemies
+
+
+def data_bytes(enemies: list) -> int:
+    # Memory of each enemy's own copy of its data, shared records are only counted once
+    seen = set()
+    total = 0
+
+    for enemy in enemies:
+        for value in (getattr(enemy, 'data', None), enemy.stats):
+            if value is not None and id(value) not in seen:
+                seen.add(id(value))
+                total += sys.getsizeof(value) + (sum(sys.getsizeof(key) for key in value) if isinstance(value, dict) else 0)
+
+    return total
+
+
+def run(count: int, repeat: int):
+    init_pygame(display=True)
+
+    from src.data import game_data
+    from src.enemy import Enemy
+
+    names = list(game_data.get_enemies())
+    loaders = {'data store': Enemy, 'legacy': make_legacy_enemy()}
+
+    spawn(Enemy, names, len(names)) # loads the frames and the data store, so both loaders start warm
+
+    print(f'{"loader":>10} {"total ms":>9} {"us/enemy":>9} {"data kB":>8}  ({count} enemies, best of {repeat})')
+
+    for name, enemy_class in loaders.items():
+        times = []
+        for _ in range(repeat):
+            elapsed, enemies = spawn(enemy_class, names, count)
+            times.append(elapsed)
+
+        best = min(times)
+        print(f'{name:>10} {best * 1000:>9.2f} {best / count * 1e6:>9.2f} {data_bytes(enemies) / 1024:>8.1f}')
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--count', type=int, default=1000)
+    parser.add_argument('--repeat', type=int, default=5)
+    args = parser.parse_args()
+
+    run(args.count, args.repeat)
@@ -0,0 +1,64 @@
+"""
+Measures getting a level's tiles and objects ready for Game.load_level: parsing the TMX with pytmx and scaling every tile (the old
+load_level), compiling the TMX and saving it (cold) and loading the memory mapped compiled level (warm). Every run is a fresh
+interpreter so nothing is already cached
+
+Usage: python -m benchmarks.level_load
+"""
+import pygame
+from pytmx import TiledTileLayer
+from pytmx.util_pygame import load_pygame
+
+import json
+import subprocess
+import sys
+import tempfile
+from time import perf_counter
+
+from settings import *
+from .common import init_pygame
+
+
+LEVELS = ('./assets/tmx/level_1.tmx', './assets/tmx/level_2.tmx')
+MODES = ('pytmx', 'cold', 'warm')
+
+
+def load(mode: str, tmx_path: str, cache_dir: str) -> dict:
+    init_pygame(display=True)
+
+    from src.level import load_level_data
+
+    start = perf_counter()
+
+    if mode == 'pytmx':
+        tmx_data = load_pygame(tmx_path)
+        cells = 0
+        for layer in tmx_data.visible_layers:
+            if isinstance(layer, TiledTileLayer):
+                for x, y, surface in layer.tiles():
+                    pygame.transform.scale(surface, (TILE_SIZE, TILE_SIZE))
+                    cells += 1
+    else:
+        level = load_level_data(tmx_path, use_cache=True, cache_dir=cache_dir)
+        cells = sum(1 for layer_name in level.layers for _ in level.layer_tiles(layer_name))
+
+    return {'mode': mode, 'load ms': round((perf_counter() - start) * 1000, 3), 'cells': cells}
+
+
+def run():
+    print(f'{"level":>12} {"mode":>6} {"load ms":>9} {"cells":>7}')
+
+    for tmx_path in LEVELS:
+        with tempfile.TemporaryDirectory() as cache_dir:
+            for mode in MODES: # cold has to run before warm, since it writes the compiled level warm loads
+                output = subprocess.run([sys.executable, '-m', 'benchmarks.level_load', mode, tmx_path, cache_dir], capture_output=True, text=True, check=True).stdout
+                result = json.loads(output.strip().splitlines()[-1])
+
+                print(f'{tmx_path.split("/")[-1]:>12} {result["mode"]:>6} {result["load ms"]:>9.2f} {result["cells"]:>7}')
+
+
+if __name__ == '__main__':
+    if len(sys.argv) == 4:
+        print(json.dumps(load(*sys.argv[1:])))
+    else:
+        run()
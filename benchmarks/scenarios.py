@@ -0,0 +1,216 @@
+"""
+Runs whole game scenarios headless and reports mean/p95/p99/max frame times overall and for every subsystem in
+Game.step_stages and Game.draw_stages, so runs on different commits can be compared from the JSON output. Each frame is one
+simulation tick plus one draw, and the player can't die so every scenario runs its full length
+
+Scenarios:
+    level_1       level_1.tmx as shipped, walking the headless demo route
+    generated     a generated map of rooms (256x256 tiles by default) with an enemy and two coins per room
+    enemies       500 enemies around the player on level_1, all chasing
+    coins         2,000 dropped coins scattered over the chunks of level_1 loaded around the player
+    sword fight   the player swinging non-stop with 40 enemies packed around them
+
+Usage: python -m benchmarks.scenarios [--frames 600] [--scenario NAME ...] [--map-size 256] [--output results.json]
+"""
+import pygame
+
+import argparse
+import gc
+import json
+import subprocess
+from random import Random
+from time import perf_counter
+
+from settings import *
+from .common import init_pygame, summarise, generate_level
+
+
+FRAMES = 600
+MAP_SIZE = 256 # tiles
+ENEMIES = 500
+COINS = 2000
+FIGHT_ENEMIES = 40
+
+
+def load_enemy_names() -> list[str]:
+    with open('./data/enemy_data.json') as rf:
+        return list(json.load(rf))
+
+
+def make_game(input_source, level=None):
+    from src.game import Game
+
+    game = Game(input_source, {'level': level} if level is not None else None)
+
+    player = game.player.sprite
+    player.health = player.initial_health = 10 ** 9
+
+    # The streamer only loads the chunks on screen straight away and prefetches the rest of STREAM_RADIUS over the next ticks,
+    # the scenarios spawn their sprites into all of it
+    for key in game.streamer.get_chunks_around(game.streamer.player_chunk, STREAM_RADIUS):
+        if key not in game.streamer.loaded:
+            game.streamer.load_chunk(key)
+
+    return game
+
+
+def free_positions(game, count: int, rng: Random, area: pygame.Rect, size: int = TILE_SIZE) -> list[tuple[int, int]]:
+    # Random positions inside area that don't overlap any wall
+    positions = []
+
+    while len(positions) < count:
+        rect = pygame.Rect(rng.randrange(area.left, area.right - size), rng.randrange(area.top, area.bottom - size), size, size)
+        if not game.collision_sprites.grid.query(rect):
+            positions.append(rect.topleft)
+
+    return positions
+
+
+def around_player(game, radius: int) -> pygame.Rect:
+    return pygame.Rect(0, 0, radius * 2, radius * 2).move(game.player.sprite.rect.centerx - radius, game.player.sprite.rect.centery - radius)
+
+
+def loaded_area(game) -> pygame.Rect:
+    # Bounding box of the chunks the streamer has loaded, dropped coins and enemies outside it are stored away on the first tick
+    size = game.streamer.chunk_pixels
+    xs = [x for x, _ in game.streamer.loaded]
+    ys = [y for _, y in game.streamer.loaded]
+
+    return pygame.Rect(min(xs) * size, min(ys) * size, (max(xs) + 1 - min(xs)) * size, (max(ys) + 1 - min(ys)) * size)
+
+
+def build_scenario(name: str, map_size: int):
+    from src.controls import InputFrame, ScriptedInput
+    from src.headless import demo_script
+    from src.enemy import Enemy
+    from src.tile import Coin
+
+    rng = Random(0)
+
+    match name:
+        case 'level_1':
+            return make_game(ScriptedInput(demo_script(), loop=True))
+
+        case 'generated':
+            return make_game(ScriptedInput(demo_script(), loop=True), generate_level(map_size))
+
+        case 'enemies':
+            game = make_game(ScriptedInput(demo_script(), loop=True))
+            enemy_names = load_enemy_names()
+
+            for pos in free_positions(game, ENEMIES, rng, around_player(game, 450)):
+                Enemy(pos, [game.camera_sprites, game.animation_sprites, game.active_sprites, game.enemy_sprites], rng.choice(enemy_names))
+            return game
+
+        case 'coins':
+            game = make_game(ScriptedInput(demo_script(), loop=True))
+
+            for pos in free_positions(game, COINS, rng, around_player(game, 1200).clip(loaded_area(game))):
+                Coin(pos, [game.camera_sprites, game.animation_sprites, game.interactive_sprites], 'Coin')
+
+            game.streamer.evict_strays()
+            live = sum(isinstance(sprite, Coin) and sprite not in game.streamer.cell_sprites for sprite in game.interactive_sprites)
+            assert live == COINS, f'only {live} of {COINS} coins are live, the rest were spawned outside the loaded chunks'
+            return game
+
+        case 'sword fight':
+            # Click every third of a second, aiming at alternating sides of the player
+            frames = [InputFrame(frozenset(), tick % 20 < 3, (WIN_X // 2 + (150 if tick // 20 % 2 else -150), WIN_Y // 2)) for tick in range(TICK_RATE * 4)]
+            game = make_game(ScriptedInput(frames, loop=True))
+            enemy_names = load_enemy_names()
+
+            for pos in free_positions(game, FIGHT_ENEMIES, rng, around_player(game, 250)):
+                Enemy(pos, [game.camera_sprites, game.animation_sprites, game.active_sprites, game.enemy_sprites], rng.choice(enemy_names))
+            return game
+
+        case _:
+            raise ValueError(f'Unknown scenario \'{name}\'')
+
+
+SCENARIOS = ('level_1', 'generated', 'enemies', 'coins', 'sword fight')
+
+
+def instrument(game) -> dict[str, list[float]]:
+    """
+    Note: Swaps every stage of game for a wrapper that records how long it took, returns {stage name: [seconds per frame]}
+    """
+    samples = {name: [] for name, _ in game.step_stages + game.draw_stages}
+
+    def timed(name: str, stage):
+        def run():
+            start = perf_counter()
+            stage()
+            samples[name].append(perf_counter() - start)
+        return run
+
+    game.step_stages = [(name, timed(name, stage)) for name, stage in game.step_stages]
+    game.draw_stages = [(name, timed(name, stage)) for name, stage in game.draw_stages]
+
+    return samples
+
+
+def run_scenario(name: str, frames: int, map_size: int) -> dict:
+    win = pygame.display.get_surface()
+
+    start = perf_counter()
+    game = build_scenario(name, map_size)
+    load_time = perf_counter() - start
+
+    samples = instrument(game)
+    frame_samples = []
+
+    for _ in range(frames):
+        start = perf_counter()
+        win.fill(COLOURS['background'])
+        game.step()
+        game.draw()
+        frame_samples.append(perf_counter() - start)
+
+    return {
+        'load s': round(load_time, 3),
+        'sprites': len(game.camera_sprites),
+        'enemies': len(game.enemy_sprites),
+        'frame': summarise(frame_samples),
+        'subsystems': {stage: summarise(times) for stage, times in samples.items()}
+    }
+
+
+def current_commit() -> str | None:
+    try:
+        return subprocess.run(['git', 'rev-parse', '--short', 'HEAD'], capture_output=True, text=True, check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def print_results(name: str, result: dict):
+    print(f'\n{name}: {result["sprites"]} sprites, {result["enemies"]} enemies, loaded in {result["load s"]}s')
+    print(f'{"":>14} {"mean ms":>9} {"p95 ms":>9} {"p99 ms":>9} {"max ms":>9}')
+
+    for stage, summary in [('frame', result['frame'])] + list(result['subsystems'].items()):
+        print(f'{stage:>14} {summary["mean ms"]:>9.3f} {summary["p95 ms"]:>9.3f} {summary["p99 ms"]:>9.3f} {summary["max ms"]:>9.3f}')
+
+
+def run():
+    parser = argparse.ArgumentParser(description='Time game scenarios per subsystem')
+    parser.add_argument('--frames', type=int, default=FRAMES)
+    parser.add_argument('--scenario', action='append', choices=SCENARIOS, help='scenario to run (repeatable, all by default)')
+    parser.add_argument('--map-size', type=int, default=MAP_SIZE, help='width and height of the generated map in tiles')
+    parser.add_argument('--output', help='write the results to this JSON file')
+    args = parser.parse_args()
+
+    init_pygame(display=True)
+
+    results = {'commit': current_commit(), 'frames': args.frames, 'tick rate': TICK_RATE, 'scenarios': {}}
+
+    for name in args.scenario or SCENARIOS:
+        results['scenarios'][name] = run_scenario(name, args.frames, args.map_size)
+        print_results(name, results['scenarios'][name])
+        gc.collect() # the generated map's chunks are big, free them before the next scenario
+
+    if args.output:
+        with open(args.output, 'w') as wf:
+            json.dump(results, wf, indent=4)
+
+
+if __name__ == '__main__':
+    run()
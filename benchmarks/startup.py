@@ -0,0 +1,88 @@
+"""
+Measures loading the tile, player and enemy animation frames at startup: one PNG per frame (no atlas), building and saving
+the atlases (cold) and mapping the saved atlases (warm), then drawing every frame once. Saved atlases are only read from disk as
+they are drawn, so the first draw and the memory growth include that. Every mode runs in a fresh interpreter so nothing is
+already cached
+
+Usage: python -m benchmarks.startup
+"""
+import pygame
+
+import json
+import resource
+import subprocess
+import sys
+import tempfile
+from time import perf_counter
+
+from .common import init_pygame
+
+
+MODES = ('files', 'cold', 'warm')
+
+
+def load(mode: str, cache_dir: str) -> dict:
+    init_pygame(display=True)
+
+    from src.assets import assets, animation_spec, ANIMATIONS
+    from src.player import Player
+    from src.enemy import Enemy
+
+    with open('./data/enemy_data.json') as rf:
+        enemy_names = list(json.load(rf))
+
+    families = {
+        'sprite animations': {layer_name: animation_spec(layer_name) for layer_name in ANIMATIONS},
+        'player': Player.frame_specs(),
+        'enemies': Enemy.frame_specs(enemy_names)
+    }
+
+    rss_before = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    start = perf_counter()
+
+    for family, specs in families.items():
+        if mode == 'files':
+            for key, spec in specs.items():
+                assets.get_frames(key, spec)
+        else:
+            assets.load_atlas(family, specs, use_cache=True, cache_dir=cache_dir)
+
+    elapsed = perf_counter() - start
+
+    scratch = pygame.Surface((256, 256))
+    start = perf_counter()
+
+    for frames in assets.frames.values():
+        for frame in frames:
+            scratch.blit(frame, (0, 0))
+
+    draw_elapsed = perf_counter() - start
+    report = assets.report()
+
+    return {
+        'mode': mode,
+        'load ms': round(elapsed * 1000, 3),
+        'first draw ms': round(draw_elapsed * 1000, 3),
+        'file opens': report['load count'],
+        'surfaces': report['frames'] if mode == 'files' else report['atlases'],
+        'pixel bytes': report['loaded bytes'],
+        'max rss growth kB': resource.getrusage(resource.RUSAGE_SELF).ru_maxrss - rss_before
+    }
+
+
+def run():
+    with tempfile.TemporaryDirectory() as cache_dir:
+        print(f'{"mode":>6} {"load ms":>9} {"first draw ms":>14} {"file opens":>11} {"surfaces":>9} {"pixel bytes":>12} {"max rss growth kB":>18}')
+
+        for mode in MODES: # cold has to run before warm, since it writes the atlases warm loads
+            output = subprocess.run([sys.executable, '-m', 'benchmarks.startup', mode, cache_dir], capture_output=True, text=True, check=True).stdout
+            result = json.loads(output.strip().splitlines()[-1])
+
+            print(f'{result["mode"]:>6} {result["load ms"]:>9.2f} {result["first draw ms"]:>14.2f} {result["file opens"]:>11} {result["surfaces"]:>9} {result["pixel bytes"]:>12} {result["max rss growth kB"]:>18}')
+
+
+if __name__ == '__main__':
+    if len(sys.argv) == 3:
+        print(json.dumps(load(*sys.argv[1:])))
+    else:
+        run()
@@ -0,0 +1,100 @@
+"""
+Fills an open 64x64 tile room with enemies around the player (spawned in a ring from inside their attack radius to inside their
+pursue radius, so some attack, leap and cool down from the first tick and the rest pursue) and steps the game headless, without
+drawing, with enemy AI batched through numpy and one enemy at a time. Thousands of enemies don't fit in a pursue radius without
+overlapping, and collision would push most of them out of range within a few ticks, so enemies just move by their delta here.
+Reports the enemies pursuing and attacking at the end, the time of the 'enemy update' stage and of a whole step, and the state
+hash both modes end on, which should be the same. Every mode and count runs in a fresh interpreter
+
+Usage: python -m benchmarks.steering [--counts 1000 5000] [--ticks 45]
+"""
+import argparse
+import json
+import math
+import subprocess
+import sys
+from random import Random
+from time import perf_counter
+
+from settings import *
+from .common import init_pygame, generate_level, summarise
+from .scenarios import instrument
+
+
+MODES = ('numpy', 'scalar')
+RING = (60, 480) # px from the player, red 1 attacks within 150 and pursues within 500
+
+
+def measure(mode: str, count: int, ticks: int) -> dict:
+    init_pygame(display=True)
+
+    from src.game import Game
+    from src.controls import ScriptedInput
+    from support import rng as game_rng
+
+    game_rng.seed(0) # the hashes of the two modes are only comparable if the game rolls the same numbers
+    game = Game(ScriptedInput([]), {'level': generate_level(64, room_size=64)})
+
+    if mode == 'scalar':
+        game.enemy_sprites.steering = None
+
+    player = game.player.sprite
+    player.health = player.initial_health = 10 ** 9
+
+    for sprite in list(game.enemy_sprites):
+        sprite.kill()
+
+    rng = Random(0)
+    for _ in range(count):
+        angle = rng.uniform(0, math.tau)
+        distance = rng.uniform(*RING)
+        game.create_enemy('red 1', (player.rect.centerx + math.cos(angle) * distance, player.rect.centery + math.sin(angle) * distance))
+
+    def move_enemies():
+        for sprite in game.active_sprites:
+            sprite.rect.x += sprite.delta.x
+            sprite.rect.y += sprite.delta.y
+
+    game.step_stages = [(name, move_enemies if name == 'collision' else stage) for name, stage in game.step_stages]
+    samples = instrument(game)
+    step_samples = []
+
+    for _ in range(ticks):
+        start = perf_counter()
+        game.step()
+        step_samples.append(perf_counter() - start)
+
+    return {
+        'mode': mode,
+        'count': count,
+        'pursuing': sum(not sprite.is_busy() and sprite.ai_tier == 'active' for sprite in game.enemy_sprites),
+        'attacking': sum(sprite.attack_state for sprite in game.enemy_sprites),
+        'enemy update': summarise(samples['enemy update']),
+        'step': summarise(step_samples),
+        'hash': game.state_hash()
+    }
+
+
+def run(counts: list[int], ticks: int):
+    print(f'{"enemies":>8} {"mode":>7} {"pursuing":>9} {"attacking":>10} {"ai mean ms":>11} {"ai p99 ms":>10} {"step mean ms":>13} {"step p99 ms":>12} {"steps/s":>8} {"hash":>17}')
+
+    for count in counts:
+        for mode in MODES:
+            output = subprocess.run([sys.executable, '-m', 'benchmarks.steering', '--mode', mode, '--counts', str(count), '--ticks', str(ticks)], capture_output=True, text=True, check=True).stdout
+            result = json.loads(output.strip().splitlines()[-1])
+            ai, step = result['enemy update'], result['step']
+
+            print(f'{count:>8} {mode:>7} {result["pursuing"]:>9} {result["attacking"]:>10} {ai["mean ms"]:>11.3f} {ai["p99 ms"]:>10.3f} {step["mean ms"]:>13.3f} {step["p99 ms"]:>12.3f} {1000 / step["mean ms"]:>8.1f} {result["hash"]:>17}')
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--counts', type=int, nargs='+', default=[1000, 5000])
+    parser.add_argument('--ticks', type=int, default=45)
+    parser.add_argument('--mode', choices=MODES, help='measure one mode (and the first count) in this interpreter and print it as JSON')
+    args = parser.parse_args()
+
+    if args.mode:
+        print(json.dumps(measure(args.mode, args.counts[0], args.ticks)))
+    else:
+        run(args.counts, args.ticks)
@@ -0,0 +1,86 @@
+"""
+Runs generated room maps of growing size (up to 512x512 tiles) with the player walking east through the doors, crossing a chunk
+every few seconds, and reports load time, frame times, memory (while loading and while playing) and how much of the map is alive.
+With chunk streaming the frame times, the memory growth while playing and the live sprites should stay flat as the map grows. Every size runs in a fresh interpreter so memory isn't shared between them
+
+Usage: python -m benchmarks.streaming
+"""
+import pygame
+
+import json
+import os
+import subprocess
+import sys
+from time import perf_counter
+
+from settings import *
+from .common import init_pygame, generate_level, summarise
+
+
+SIZES = (64, 128, 256, 512)
+FRAMES = 1200
+
+
+def get_rss() -> int:
+    # Current (not peak) resident memory in kB
+    with open('/proc/self/statm') as rf:
+        return int(rf.read().split()[1]) * os.sysconf('SC_PAGE_SIZE') // 1024
+
+
+def run_size(size: int) -> dict:
+    init_pygame(display=True)
+
+    from src.game import Game
+    from src.controls import InputFrame, ScriptedInput
+
+    win = pygame.display.get_surface()
+    rss_before = get_rss()
+
+    start = perf_counter()
+    game = Game(ScriptedInput([InputFrame(frozenset({pygame.K_d}))] * FRAMES), {'level': generate_level(size)})
+    load_time = perf_counter() - start
+    rss_loaded = get_rss()
+
+    player = game.player.sprite
+    player.health = player.initial_health = 10 ** 9
+
+    samples = []
+    max_chunks = max_sprites = 0
+
+    for _ in range(FRAMES):
+        start = perf_counter()
+        win.fill(COLOURS['background'])
+        game.step()
+        game.draw()
+        samples.append(perf_counter() - start)
+
+        max_chunks = max(max_chunks, len(game.streamer.loaded))
+        max_sprites = max(max_sprites, len(game.camera_sprites))
+
+    return {
+        'size': size,
+        'load ms': round(load_time * 1000, 1),
+        'frame': summarise(samples),
+        'load rss kB': rss_loaded - rss_before,
+        'run rss kB': get_rss() - rss_loaded,
+        'max loaded chunks': max_chunks,
+        'max camera sprites': max_sprites
+    }
+
+
+def run():
+    print(f'{"tiles":>9} {"load ms":>8} {"mean ms":>8} {"p99 ms":>8} {"max ms":>8} {"load rss kB":>12} {"run rss kB":>11} {"max chunks":>11} {"max sprites":>12}')
+
+    for size in SIZES:
+        output = subprocess.run([sys.executable, '-m', 'benchmarks.streaming', str(size)], capture_output=True, text=True, check=True).stdout
+        result = json.loads(output.strip().splitlines()[-1])
+        frame = result['frame']
+
+        print(f'{f"{size}x{size}":>9} {result["load ms"]:>8.1f} {frame["mean ms"]:>8.3f} {frame["p99 ms"]:>8.3f} {frame["max ms"]:>8.3f} {result["load rss kB"]:>12} {result["run rss kB"]:>11} {result["max loaded chunks"]:>11} {result["max camera sprites"]:>12}')
+
+
+if __name__ == '__main__':
+    if len(sys.argv) == 2:
+        print(json.dumps(run_size(int(sys.argv[1]))))
+    else:
+        run()
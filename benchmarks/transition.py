@@ -0,0 +1,89 @@
+"""
+Measures the frames around a level transition: the player is put within PRELOAD_DISTANCE of the first level's ladder, left there
+for a second (long enough for the next level to be preloaded), then put on the ladder. Reports the frame the transition happens in
+and the longest frame of the second after it, with preloading (the next level is read, compiled if it has to be and the chunks around
+its spawn point baked on a worker thread) and with it turned off (all of that happens during the transition). Every run is in a
+fresh interpreter, after one untimed run that compiles the level cache, so the no preload runs measure a read rather than a compile
+
+Usage: python -m benchmarks.transition [--runs 5]
+"""
+import pygame
+
+import argparse
+import json
+import subprocess
+import sys
+from time import perf_counter
+
+from settings import *
+from .common import init_pygame
+
+
+MODES = ('preload', 'no preload')
+WAIT = TICK_RATE # ticks between getting near the ladder and stepping on it
+AFTER = TICK_RATE # ticks measured after the transition
+
+
+def measure(mode: str) -> dict:
+    init_pygame(display=True)
+
+    import src.game
+    from src.game import Game
+    from src.controls import ScriptedInput
+
+    if mode == 'no preload':
+        src.game.PRELOAD_DISTANCE = 0
+
+    win = pygame.display.get_surface()
+    game = Game(ScriptedInput([]))
+
+    player = game.player.sprite
+    player.health = player.initial_health = 10 ** 9
+    ladder_x, ladder_y = game.ladders[0]
+
+    def frame() -> float:
+        start = perf_counter()
+        win.fill(COLOURS['background'])
+        game.step()
+        game.draw()
+        return perf_counter() - start
+
+    player.rect.center = (ladder_x, ladder_y - TILE_SIZE * 3)
+    for _ in range(WAIT):
+        frame()
+
+    player.rect.center = (ladder_x, ladder_y)
+    transition = frame()
+    after = [frame() for _ in range(AFTER)]
+
+    assert game.level_index == 1
+
+    return {'transition ms': transition * 1000, 'max after ms': max(after) * 1000, 'mean after ms': sum(after) / len(after) * 1000}
+
+
+def run_mode(mode: str) -> dict:
+    output = subprocess.run([sys.executable, '-m', 'benchmarks.transition', '--mode', mode], capture_output=True, text=True, check=True).stdout
+    return json.loads(output.strip().splitlines()[-1])
+
+
+def run(runs: int):
+    run_mode(MODES[0]) # compiles the level cache, so that it isn't only the first mode measured that pays for it
+    print(f'{"mode":>11} {"transition ms":>14} {"max after ms":>13} {"mean after ms":>14}  (worst of {runs} runs)')
+
+    for mode in MODES:
+        results = [run_mode(mode) for _ in range(runs)]
+
+        worst = max(result["transition ms"] for result in results)
+        print(f'{mode:>11} {worst:>14.2f} {max(result["max after ms"] for result in results):>13.2f} {max(result["mean after ms"] for result in results):>14.3f}  {"within" if worst <= 1000 / TICK_RATE else "over"} a {1000 / TICK_RATE:.1f}ms frame')
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--runs', type=int, default=5)
+    parser.add_argument('--mode', choices=MODES, help='measure one mode in this interpreter and print it as JSON')
+    args = parser.parse_args()
+
+    if args.mode:
+        print(json.dumps(measure(args.mode)))
+    else:
+        run(args.runs)
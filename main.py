@@ -1,16 +1,20 @@
 import pygame
 from pygame.locals import *
 import sys
+import argparse
 
 from settings import *
 from support import display_text
-from src import Game
 from src import Menu
+from src.replay import RecordingInput
+from src.profiler import Profiler
+from src.loader import GameLoader
+from src.sound import sounds
 
 
 
 class Main:
-    def __init__(self):
+    def __init__(self, record: str | None = None):
         pygame.init()
         pygame.font.init()
         pygame.display.set_caption('Dungeon Game')
@@ -22,12 +26,30 @@ class Main:
         # Custom cursor setup
         self.cursor = pygame.image.load('./assets/gui/cursor/white.png')
 
-        self.game = Game()
+        # With record, every tick's input and the RNG seed are saved to that path on quit (see src/replay.py)
+        self.record = record
+        self.recording = RecordingInput() if record else None
+
+        # The game is built on a worker thread while the menu is up, and taken over on the first frame after that finishes
+        self.loader = GameLoader(self.recording)
+        self.loader.start()
+        self.game = None
+        self.profiler = None
+
         self.menu = Menu()
 
+        self.accumulator = 0 # real time (in seconds) that the simulation still has to catch up on
+
+
+    def update(self, dt: float):
+        sounds.update()
 
-    def update(self):
-        if self.menu.in_menu:
+        if self.game is None and self.loader.ready:
+            self.game = self.loader.build()
+            self.profiler = Profiler(self.game)
+
+        if self.menu.in_menu or self.game is None: # PLAY keeps the menu up until the game has loaded
+            self.menu.progress = self.loader.progress
             self.menu.play_music()
             self.menu.update()
         else:
@@ -37,7 +59,33 @@ class Main:
                 self.display_game_over_screen()
             elif not self.game.game_over:
                 self.game.play_music()
-                self.game.update()
+                self.update_game(dt)
+
+    def update_game(self, dt: float):
+        """
+        Note: The game is stepped in fixed TICK sized steps for however much time has passed, then drawn once, interpolated
+        between the last two ticks. Past MAX_TICKS_PER_FRAME the leftover time is dropped so the game slows down instead of freezing
+        """
+        self.profiler.begin_frame()
+
+        self.accumulator += dt
+        ticks = 0
+
+        while self.accumulator >= TICK and ticks < MAX_TICKS_PER_FRAME:
+            self.game.step()
+            self.accumulator -= TICK
+            ticks += 1
+
+            if self.game.game_over or self.game.victory:
+                break
+
+        if ticks == MAX_TICKS_PER_FRAME:
+            self.accumulator = min(self.accumulator, TICK)
+
+        self.game.draw(min(self.accumulator / TICK, 1))
+
+        self.profiler.end_frame()
+        self.profiler.draw()
     
     def display_game_over_screen(self):
         display_text(self.win, 'Game Over', (WIN_X / 2, WIN_Y / 4), font_name='yoster', font_size=100)
@@ -54,18 +102,31 @@ class Main:
         while True:
             self.win.fill(COLOURS['background'])
             
-            self.update()
+            dt = self.CLOCK.tick(FPS) / 1000
 
-            self.CLOCK.tick(FPS)
+            self.update(dt)
 
             pygame.display.update()
 
             for event in pygame.event.get():
                 if event.type == pygame.QUIT:
+                    if self.recording is not None and self.game is not None:
+                        self.recording.save(self.record, self.game.state_hash())
+
                     pygame.quit()
                     sys.exit()
 
+                if event.type == pygame.KEYDOWN and self.profiler is not None:
+                    if event.key == pygame.key.key_code(PROFILER_KEY):
+                        self.profiler.toggle()
+                    elif event.key == pygame.key.key_code(PROFILER_EXPORT_KEY) and self.profiler.enabled:
+                        self.profiler.export_trace()
+
 
 if __name__ == '__main__':
-    main = Main()
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--record', metavar='PATH', help='record the input of this run so it can be replayed with python -m src.replay PATH')
+    args = parser.parse_args()
+
+    main = Main(args.record)
     main.run()
\ No newline at end of file
@@ -1,7 +1,64 @@
-FPS = 60
+FPS = 60 # render rate cap (0 for uncapped)
+
+# The simulation runs at a fixed TICK_RATE no matter how fast frames are rendered. Speeds, timers and animation speeds throughout
+# the game were tuned per 60 Hz frame, so they are multiplied by TIME_SCALE to keep the same real-time behaviour at other tick rates
+TICK_RATE = 60
+TICK = 1 / TICK_RATE
+TIME_SCALE = 60 / TICK_RATE
+MAX_TICKS_PER_FRAME = 5 # catch-up limit after a slow frame, so the simulation can't spiral behind
+
+ROTATION_STEP = 2 # degrees between the pre-rendered rotations of weapons and their particles
 
 TILE_SIZE = 64
 
+CHUNK_SIZE = 16 # tiles per side of a chunk, both for the pre-rendered static chunks and for streaming
+
+# Chunk streaming: chunks up to STREAM_RADIUS chunks away from the player's chunk are loaded, and chunks further than
+# STREAM_EVICT_RADIUS are evicted (the gap stops chunks on a border from being loaded and evicted over and over). Chunks one
+# further out than STREAM_RADIUS are prefetched, at most STREAM_LOADS_PER_TICK a tick, once the player is within
+# STREAM_PREFETCH_MARGIN pixels of the chunks that will need them, so crossing into a chunk normally finds its neighbours loaded
+STREAM_RADIUS = 1
+STREAM_EVICT_RADIUS = 2 # has to be more than STREAM_RADIUS, or prefetched chunks would be evicted again straight away
+STREAM_PREFETCH_MARGIN = TILE_SIZE * 4
+STREAM_LOADS_PER_TICK = 1
+STREAM_INTERVAL = 15 # ticks between checks for enemies and coins that have wandered out of the loaded chunks
+
+VIEW_MARGIN = TILE_SIZE * 2 # extra pixels around the window that still count as visible
+
+# Enemy AI level of detail: enemies within their pursue radius think every frame, enemies up to AI_WAKE_MARGIN further out think
+# every AI_REDUCED_INTERVAL frames, and enemies beyond that sleep and are only checked every AI_SLEEP_INTERVAL frames
+AI_WAKE_MARGIN = 300
+AI_REDUCED_INTERVAL = 4
+AI_SLEEP_INTERVAL = 15
+
+# Enemy steering is batched with numpy (when it is installed) for any AI tier with at least STEERING_MIN_BATCH enemies due in a frame
+STEERING_BATCH = True
+STEERING_MIN_BATCH = 64
+
+# Frame profiler (see src/profiler.py): PROFILER_KEY toggles the overlay and PROFILER_EXPORT_KEY writes the last PROFILER_WINDOW
+# frames to PROFILER_TRACE_PATH as a Chrome trace (open it in chrome://tracing or ui.perfetto.dev)
+PROFILER_KEY = 'f3'
+PROFILER_EXPORT_KEY = 'f4'
+PROFILER_WINDOW = 240 # frames
+PROFILER_TRACE_PATH = './profile.json'
+
+ATLAS_CACHE = True # write packed texture atlases to disk and load them on later runs
+ATLAS_CACHE_DIR = './cache/atlas'
+
+POOL_LIMIT = 256 # most killed sprites a SpritePool keeps for reuse (see src/pool.py)
+
+# Sound bank (see src/sound.py)
+SOUND_CHANNELS = 16 # mixer channels shared by every effect
+SOUND_VOICES = 3 # channels one effect can play on at once
+SOUND_MERGE_TICKS = 1 # plays of the same effect fewer than this many simulation ticks apart are merged into one
+
+LEVEL_CACHE = True # compile TMX levels to a binary file on first load and load that on later runs, until the TMX changes
+LEVEL_CACHE_DIR = './cache/levels'
+
+# Levels in the order they are played, the ladder of each one leads to the next and the ladder of the last one wins the game
+LEVELS = ('./assets/tmx/level_1.tmx', './assets/tmx/level_2.tmx')
+PRELOAD_DISTANCE = 24 * TILE_SIZE # the next level is read in the background once the player is this close to a ladder
+
 SIZE = WIN_X, WIN_Y = 1200, 700
 
 COLOURS = {
@@ -0,0 +1,205 @@
+import pygame
+
+import json
+import os
+from typing import NamedTuple
+
+from settings import *
+from .atlas import TextureAtlas
+from .rotation import RotationCache
+
+
+# Layer name -> (frame path pattern inside './assets/sprite animations/', frame count, flipped horizontally)
+ANIMATIONS = {
+    'Chest': ('chest/chest_{}.png', 4, False),
+    'Mini Chest': ('mini_chest/mini_chest_{}.png', 4, False),
+    'Coin': ('coin/coin_{}.png', 4, False),
+    'Small Blue Flask': ('flasks/small_blue_flask_{}.png', 4, False),
+    'Small Red Flask': ('flasks/small_red_flask_{}.png', 4, False),
+    'Large Blue Flask': ('flasks/large_blue_flask_{}.png', 4, False),
+    'Large Red Flask': ('flasks/large_red_flask_{}.png', 4, False),
+    'Golden Key': ('keys/golden_key_{}.png', 4, False),
+    'Silver Key': ('keys/silver_key_{}.png', 4, False),
+    'Front Torch': ('torch/front_torch_{}.png', 4, False),
+    'Left Torch': ('torch/side_torch_{}.png', 4, False),
+    'Right Torch': ('torch/side_torch_{}.png', 4, True),
+    'Small Candlestick': ('torch/small_candlestick_{}.png', 4, False),
+    'Tall Candlestick': ('torch/tall_candlestick_{}.png', 4, False),
+    'Flag': ('flag/flag_{}.png', 4, False),
+    'Mini Silver Box': ('mini_silver_box/mini_silver_box_{}.png', 4, False),
+    'Mini Brown Box': ('mini_brown_box/mini_brown_box_{}.png', 4, False),
+    'Silver Box': ('silver_box/silver_box_{}.png', 4, False),
+    'Brown Box': ('brown_box/brown_box_{}.png', 4, False)
+}
+
+
+class FrameSpec(NamedTuple):
+    paths: tuple[str, ...]
+    size: tuple[int, int] | None = None
+    scale: float | tuple[float, float] | None = None
+    flip: bool = False
+
+
+def animation_spec(layer_name: str) -> FrameSpec:
+    if layer_name not in ANIMATIONS:
+        raise ValueError(f'No animation registered for layer \'{layer_name}\'')
+
+    pattern, frame_count, flip = ANIMATIONS[layer_name]
+    paths = tuple(f'./assets/sprite animations/{pattern.format(i)}' for i in range(1, frame_count + 1))
+
+    return FrameSpec(paths, size=(TILE_SIZE, TILE_SIZE), flip=flip)
+
+
+class AssetRegistry:
+    """
+    Note: Frames handed out by the registry are shared between every sprite that asks for them, so they must not be modified
+    """
+    def __init__(self):
+        self.frames: dict[str, list[pygame.Surface]] = {}
+        self.masks: dict[str, pygame.mask.Mask] = {}
+        self.atlases: dict[str, TextureAtlas] = {}
+        self.oriented_frames: dict[str, dict[bool, list[tuple[pygame.Surface, pygame.mask.Mask]]]] = {}
+        self.variants: dict[tuple, pygame.Surface] = {}
+        self.rotations: dict[str, RotationCache] = {}
+
+        self.load_count = 0 # images read from disk
+        self.loaded_bytes = 0 # pixel memory of the converted and scaled frames held by the registry
+        self.requests = 0
+
+    def load_image(self, path: str) -> pygame.Surface:
+        self.load_count += 1
+        return pygame.image.load(path).convert_alpha()
+
+    def get_frames(self, key: str, spec: FrameSpec) -> list[pygame.Surface]:
+        self.requests += 1
+
+        if key not in self.frames:
+            frames = []
+
+            for path in spec.paths:
+                image = self.load_image(path)
+
+                if spec.size is not None:
+                    image = pygame.transform.scale(image, spec.size)
+                elif spec.scale is not None:
+                    image = pygame.transform.scale_by(image, spec.scale)
+
+                if spec.flip:
+                    image = pygame.transform.flip(image, True, False)
+
+                self.loaded_bytes += image.get_pitch() * image.get_height()
+                frames.append(image)
+
+            self.frames[key] = frames
+
+        return self.frames[key]
+
+    def get_animation(self, layer_name: str) -> list[pygame.Surface]:
+        return self.get_frames(layer_name, animation_spec(layer_name))
+
+    def get_mask(self, layer_name: str) -> pygame.mask.Mask:
+        # Animated tiles keep the mask of their first frame for their whole life
+        if layer_name not in self.masks:
+            self.masks[layer_name] = pygame.mask.from_surface(self.get_animation(layer_name)[0])
+
+        return self.masks[layer_name]
+
+    def get_oriented_frames(self, key: str) -> dict[bool, list[tuple[pygame.Surface, pygame.mask.Mask]]]:
+        """
+        Note: Returns {facing_right: [(frame, mask), ...]} for an already loaded frame list, flipping and building masks once per key
+        """
+        if key not in self.oriented_frames:
+            frames = self.frames[key]
+            flipped = [pygame.transform.flip(frame, True, False) for frame in frames]
+
+            self.oriented_frames[key] = {
+                True: [(frame, pygame.mask.from_surface(frame)) for frame in frames],
+                False: [(frame, pygame.mask.from_surface(frame)) for frame in flipped]
+            }
+
+        return self.oriented_frames[key]
+
+    def get_faded_frame(self, key: str, facing_right: bool, index: int, alpha: int) -> pygame.Surface:
+        # Copy of a shared frame with its own surface alpha, so that fading never touches the shared frame
+        variant = (key, facing_right, index, alpha)
+
+        if variant not in self.variants:
+            frame = self.get_oriented_frames(key)[facing_right][index][0].copy()
+            frame.set_alpha(alpha)
+            self.variants[variant] = frame
+
+        return self.variants[variant]
+
+    def get_silhouette(self, key: str, facing_right: bool, index: int) -> pygame.Surface:
+        # Solid white version of a frame, used to flash a sprite when it gets hit
+        variant = (key, facing_right, index, 'silhouette')
+
+        if variant not in self.variants:
+            frame = self.get_oriented_frames(key)[facing_right][index][1].to_surface()
+            frame.set_colorkey((0, 0, 0))
+            self.variants[variant] = frame
+
+        return self.variants[variant]
+
+    def get_rotations(self, key: str, image: pygame.Surface, with_masks: bool = False) -> RotationCache:
+        # image is only rendered on the first request for key, later requests share that RotationCache
+        if key not in self.rotations:
+            self.rotations[key] = RotationCache(image, with_masks=with_masks)
+
+        return self.rotations[key]
+
+    def atlas_path(self, family: str, specs: dict[str, FrameSpec], cache_dir: str) -> tuple[str, dict]:
+        path = os.path.join(cache_dir, f'{family}.atlas')
+
+        sources = json.loads(json.dumps({key: {**spec._asdict(), 'mtimes': [os.path.getmtime(path) for path in spec.paths]} for key, spec in specs.items()})) # round trip so tuples compare equal to the saved lists
+
+        return path, sources
+
+    def read_atlas(self, family: str, specs: dict[str, FrameSpec], cache_dir: str = ATLAS_CACHE_DIR) -> tuple[memoryview, dict] | None:
+        # The file reading half of load_atlas(), safe to call off the main thread, pass the result to load_atlas() as saved
+        return TextureAtlas.read(*self.atlas_path(family, specs, cache_dir))
+
+    def load_atlas(self, family: str, specs: dict[str, FrameSpec], use_cache: bool = ATLAS_CACHE, cache_dir: str = ATLAS_CACHE_DIR, saved: tuple[memoryview, dict] | None = None):
+        """
+        Note: Packs every frame list in specs into one atlas surface and serves them as subsurfaces from then on.
+        With use_cache, the packed atlas is written to cache_dir, and later runs map that one file instead of loading every
+        frame, as long as none of the source images have changed since
+        """
+        path, sources = self.atlas_path(family, specs, cache_dir)
+
+        if saved is not None:
+            atlas = TextureAtlas.from_buffer(*saved)
+        else:
+            atlas = TextureAtlas.load(path, sources) if use_cache else None
+
+        if atlas is not None:
+            self.load_count += 1
+        else:
+            atlas = TextureAtlas.pack({key: self.get_frames(key, spec) for key, spec in specs.items()})
+
+            if use_cache:
+                try:
+                    atlas.save(path, sources)
+                except OSError: # e.g. a read only checkout, the atlas is packed again next time
+                    pass
+
+        for key in specs:
+            if key in self.frames:
+                self.loaded_bytes -= sum(frame.get_pitch() * frame.get_height() for frame in self.frames[key])
+            self.frames[key] = atlas.frames[key]
+        self.loaded_bytes += atlas.surface.get_pitch() * atlas.surface.get_height()
+
+        self.atlases[family] = atlas
+
+    def report(self) -> dict:
+        return {
+            'animations': len(self.frames),
+            'frames': sum(len(frames) for frames in self.frames.values()),
+            'atlases': len(self.atlases),
+            'load count': self.load_count,
+            'loaded bytes': self.loaded_bytes,
+            'requests': self.requests
+        }
+
+
+assets = AssetRegistry()
@@ -0,0 +1,140 @@
+import pygame
+
+import json
+import mmap
+import os
+import struct
+import tempfile
+from math import sqrt
+
+
+MAGIC = b'DGAT'
+VERSION = 1
+HEADER = struct.Struct('<4sBI') # magic, version, size of the JSON index that follows
+PIXEL_FORMAT = 'BGRA' # byte order of convert_alpha() surfaces on little endian machines, so saved atlases load without converting
+
+
+class TextureAtlas:
+    """
+    Note: Packs a family of frames into one surface with a simple shelf packer (tallest frames first, left to right, row by row)
+    and hands the frames back out as subsurfaces of it
+    """
+    padding = 1 # transparent gap between frames so scaled blits never bleed into a neighbour
+
+    def __init__(self, surface: pygame.Surface, index: dict[str, list[list[int]]]):
+        self.surface = surface
+        self.index = index # frame key -> [x, y, width, height] of every frame in the list
+
+        self.frames = {key: [surface.subsurface(rect) for rect in rects] for key, rects in index.items()}
+
+    @classmethod
+    def pack(cls, frames: dict[str, list[pygame.Surface]], max_width: int | None = None) -> 'TextureAtlas':
+        entries = [(key, i, frame) for key, key_frames in frames.items() for i, frame in enumerate(key_frames)]
+        entries.sort(key=lambda entry: entry[2].get_height(), reverse=True)
+
+        if max_width is None: # aim for a roughly square atlas, which wastes the least space on the last shelf
+            area = sum((frame.get_width() + cls.padding) * (frame.get_height() + cls.padding) for _, _, frame in entries)
+            max_width = max(int(sqrt(area)), max(frame.get_width() for _, _, frame in entries))
+
+        positions = {}
+        x = y = shelf_height = width = 0
+
+        for key, i, frame in entries:
+            w, h = frame.get_size()
+
+            if x + w > max_width and x > 0: # start a new shelf
+                y += shelf_height + cls.padding
+                x = shelf_height = 0
+
+            positions[(key, i)] = [x, y, w, h]
+            x += w + cls.padding
+            width = max(width, x)
+            shelf_height = max(shelf_height, h)
+
+        surface = pygame.Surface((max(width, 1), max(y + shelf_height, 1)), pygame.SRCALPHA).convert_alpha()
+        surface.fill((0, 0, 0, 0))
+
+        for key, i, frame in entries:
+            surface.blit(frame, positions[(key, i)][:2])
+
+        index = {key: [positions[(key, i)] for i in range(len(key_frames))] for key, key_frames in frames.items()}
+
+        return cls(surface, index)
+
+    def save(self, path: str, sources: dict):
+        """
+        Note: Layout is the header, the JSON index (padded so the pixels start 16 byte aligned), then the pixels as raw PIXEL_FORMAT
+        rather than PNG, since decoding one large PNG costs more than the small ones it replaces. The file is written next to path
+        and then moved over it, so a crash never leaves half an atlas behind
+        """
+        index = json.dumps({'sources': sources, 'size': self.surface.get_size(), 'frames': self.index}).encode()
+        index += b' ' * (-(HEADER.size + len(index)) % 16)
+
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        fd, temp_path = tempfile.mkstemp(dir=os.path.dirname(path), suffix='.tmp')
+
+        try:
+            with open(fd, 'wb') as wf:
+                wf.write(HEADER.pack(MAGIC, VERSION, len(index)))
+                wf.write(index)
+                wf.write(pygame.image.tobytes(self.surface, PIXEL_FORMAT))
+
+            os.replace(temp_path, path)
+        except BaseException:
+            os.remove(temp_path)
+            raise
+
+    @staticmethod
+    def read(path: str, sources: dict) -> tuple[memoryview, dict] | None:
+        """
+        Note: Only maps the saved atlas, so it is safe to call off the main thread. Returns the pixels and the index, or None when
+        there is no saved atlas, it was built from different sources (paths, sizes or modification times) or it can't be read
+        (e.g. cut short, in which case the atlas is packed from the source images again)
+        """
+        if not os.path.exists(path):
+            return None
+
+        try:
+            with open(path, 'rb') as rf:
+                size = os.fstat(rf.fileno()).st_size
+                if size < HEADER.size:
+                    return None
+
+                # A private copy on write mapping, so the surfaces made from it can't write to the file and only the pages
+                # actually drawn from are read from disk
+                data = mmap.mmap(rf.fileno(), 0, access=mmap.ACCESS_COPY)
+
+            magic, version, index_size = HEADER.unpack_from(data)
+            if magic != MAGIC or version != VERSION:
+                return None
+
+            offset = HEADER.size + index_size
+            index = json.loads(data[HEADER.size:offset])
+
+            if index['sources'] != sources:
+                return None
+
+            width, height = index['size']
+            if size != offset + width * height * 4:
+                return None
+
+            return memoryview(data)[offset:], index
+
+        except (OSError, ValueError, KeyError, TypeError):
+            return None
+
+    @classmethod
+    def from_buffer(cls, pixels: memoryview, index: dict) -> 'TextureAtlas':
+        # The atlas surface uses pixels in place, it is only copied if the display wants another pixel format
+        surface = pygame.image.frombuffer(pixels, index['size'], PIXEL_FORMAT)
+
+        if surface.get_masks() != pygame.Surface((1, 1), pygame.SRCALPHA).convert_alpha().get_masks():
+            surface = surface.convert_alpha()
+
+        return cls(surface, index['frames'])
+
+    @classmethod
+    def load(cls, path: str, sources: dict) -> 'TextureAtlas | None':
+        saved = cls.read(path, sources)
+
+        return cls.from_buffer(*saved) if saved is not None else None
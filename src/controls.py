@@ -0,0 +1,68 @@
+import pygame
+
+from typing import Iterable, NamedTuple
+
+
+class InputFrame(NamedTuple):
+    keys: frozenset[int] = frozenset() # pygame key constants held down
+    mouse_pressed: bool = False # left mouse button
+    mouse_pos: tuple[int, int] = (0, 0)
+
+
+class PressedKeys:
+    """
+    Note: Indexed by key constant like the result of pygame.key.get_pressed()
+    """
+    def __init__(self, keys: frozenset[int]):
+        self.keys = keys
+
+    def __getitem__(self, key: int) -> bool:
+        return key in self.keys
+
+
+class LiveInput:
+    """
+    Note: Reads the keyboard and mouse directly, this is what the game uses when it runs in a window
+    """
+    def tick(self):
+        pass
+
+    def get_keys(self):
+        return pygame.key.get_pressed()
+
+    def get_mouse_pressed(self) -> bool:
+        return pygame.mouse.get_pressed()[0]
+
+    def get_mouse_pos(self) -> tuple[int, int]:
+        return pygame.mouse.get_pos()
+
+
+class ScriptedInput:
+    """
+    Note: Plays back one InputFrame per simulation tick, then holds the empty frame (or starts over with loop) once the script runs out
+    """
+    def __init__(self, frames: Iterable[InputFrame], loop: bool = False):
+        self.frames = list(frames)
+        self.loop = loop
+
+        self.tick_count = -1
+        self.frame = InputFrame()
+
+    def tick(self):
+        self.tick_count += 1
+
+        if self.tick_count < len(self.frames):
+            self.frame = self.frames[self.tick_count]
+        elif self.loop and self.frames:
+            self.frame = self.frames[self.tick_count % len(self.frames)]
+        else:
+            self.frame = InputFrame()
+
+    def get_keys(self) -> PressedKeys:
+        return PressedKeys(self.frame.keys)
+
+    def get_mouse_pressed(self) -> bool:
+        return self.frame.mouse_pressed
+
+    def get_mouse_pos(self) -> tuple[int, int]:
+        return self.frame.mouse_pos
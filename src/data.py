@@ -0,0 +1,112 @@
+import json
+import os
+from typing import NamedTuple
+
+
+class EnemyStats(NamedTuple):
+    health: int
+    damage: int
+    attack_radius: float
+    pursue_radius: float
+    attack_cooldown: float
+    leap_distance: float
+    leap_speed: float
+    knockback: float
+    coin_drops: int
+
+
+class PlayerStats(NamedTuple):
+    health: int
+    absorption: int
+    knockback: float
+    invincibility_cooldown: float
+
+
+class WeaponStats(NamedTuple):
+    damage: int
+
+
+def parse_record(record_type: type, data: dict, source: str):
+    """
+    Note: Builds record_type from a JSON object whose keys are the field names with spaces instead of underscores,
+    raising a ValueError that names the file and entry when a key is missing
+    """
+    if not isinstance(data, dict):
+        raise ValueError(f'{source} should be an object, not {type(data).__name__}')
+
+    values = []
+    for field in record_type._fields:
+        key = field.replace('_', ' ')
+
+        if key not in data:
+            raise ValueError(f'{source} is missing \'{key}\'')
+        values.append(data[key])
+
+    return record_type(*values)
+
+
+class GameData:
+    """
+    Note: Every data file is read and checked once, on first use, and the records handed out are shared by everything that asks
+    for them (records are named tuples, so nothing can change them)
+    """
+    def __init__(self, data_dir: str = './data', enemy_assets_dir: str = './assets/enemies'):
+        self.data_dir = data_dir
+        self.enemy_assets_dir = enemy_assets_dir
+
+        self.enemies: dict[str, EnemyStats] | None = None
+        self.player: PlayerStats | None = None
+        self.weapons: dict[tuple[str, str], WeaponStats] | None = None # (material, weapon) -> stats
+
+    def read(self, filename: str) -> tuple[dict, str]:
+        path = os.path.join(self.data_dir, filename)
+
+        with open(path) as rf:
+            return json.load(rf), path
+
+    def get_enemies(self) -> dict[str, EnemyStats]:
+        if self.enemies is None:
+            data, path = self.read('enemy_data.json')
+            enemy_folders = set(os.listdir(self.enemy_assets_dir))
+
+            enemies = {}
+            for name, entry in data.items():
+                if name not in enemy_folders:
+                    raise ValueError(f'{path}: enemy \'{name}\' has no frames in {self.enemy_assets_dir}')
+                enemies[name] = parse_record(EnemyStats, entry, f'{path}: enemy \'{name}\'')
+
+            self.enemies = enemies
+
+        return self.enemies
+
+    def get_enemy(self, name: str) -> EnemyStats:
+        enemies = self.get_enemies()
+
+        if name not in enemies:
+            raise ValueError(f'Unknown enemy \'{name}\', expected one of {", ".join(enemies)}')
+
+        return enemies[name]
+
+    def get_player(self) -> PlayerStats:
+        if self.player is None:
+            data, path = self.read('player_data.json')
+            self.player = parse_record(PlayerStats, data, path)
+
+        return self.player
+
+    def get_weapon(self, material: str, weapon: str) -> WeaponStats:
+        if self.weapons is None:
+            data, path = self.read('weapon_data.json')
+
+            self.weapons = {
+                (material_name, weapon_name): parse_record(WeaponStats, entry, f'{path}: {material_name} {weapon_name}')
+                for material_name, material_weapons in data.items() for weapon_name, entry in material_weapons.items()
+            }
+
+        if (material, weapon) not in self.weapons:
+            raise ValueError(f'Unknown weapon \'{material} {weapon}\'')
+
+        return self.weapons[(material, weapon)]
+
+
+game_data = GameData()
@@ -1,13 +1,13 @@
 import pygame
 from pygame.math import Vector2
-from pygame.mixer import Sound
 
-import json
 from typing import Tuple
-from os import listdir
 from math import sqrt
 
 from settings import *
+from support import get_font
+from .assets import assets, FrameSpec
+from .data import game_data
 
 class Enemy(pygame.sprite.Sprite):
     def __init__(self, pos: Tuple[float, float], groups: list, enemy_name: str):
@@ -22,16 +22,15 @@ class Enemy(pygame.sprite.Sprite):
 
         self.scale_factor = 4
 
+        self.import_enemy_data() # first, it is what rejects unknown enemy names
         self.import_images()
-        self.import_sounds()
-        self.import_enemy_data()
 
         # Animation setup
         self.animation_index = 0
-        self.animation_speed = 0.1
+        self.animation_speed = 0.1 * TIME_SCALE
 
         # Enemy setup
-        self.vel = 3
+        self.vel = 3 * TIME_SCALE
         self.direction = Vector2()
         self.delta = Vector2()
         
@@ -47,43 +46,47 @@ class Enemy(pygame.sprite.Sprite):
         self.last_player_coords = Vector2()
         self.last_enemy_coords = Vector2()
         self.new_coords = Vector2()
-        self.attack_cooldown_counter = self.data['attack cooldown']
+        self.attack_cooldown_counter = self.stats.attack_cooldown
         self.total_attack_delta = Vector2()
+        self.player_delta = Vector2() # knockback the player takes from this enemy's leap
 
 
-        self.image = self.animations[int(self.animation_index)]
+        self.image, self.mask = assets.get_oriented_frames(self.frames_key)[self.facing_right][int(self.animation_index)]
         self.rect = self.image.get_rect(topleft=pos)
-        self.mask = pygame.mask.from_surface(self.image)
 
         # Enemy stats
-        self.initial_health = self.data['health']
-        self.health: int = self.data['health']
-        self.damage: int = self.data['damage']
-        self.knockback: int = self.data['knockback']
-        self.attack_cooldown = self.data['attack cooldown']
-        self.leap_speed = self.data['leap speed']
-        self.coin_drops = self.data['coin drops']
+        self.initial_health = self.stats.health
+        self.health: int = self.stats.health
+        self.damage: int = self.stats.damage
+        self.knockback: int = self.stats.knockback
+        self.attack_cooldown = self.stats.attack_cooldown
+        self.leap_speed = self.stats.leap_speed
+        self.coin_drops = self.stats.coin_drops
 
         # Health Bar
         self.health_bar_rect = pygame.Rect(*(self.rect.midtop - Vector2(0, 10)), self.rect.width * 8 / 10, self.rect.height / 6)
         self.health_rect = self.health_bar_rect.copy()
 
         # Font
-        self.font = pygame.font.Font('./assets/fonts/font.ttf', 30)
+        self.font = get_font('font', 30)
 
-    def import_images(self):
-        assert self.enemy_name in listdir('./assets/enemies/'), 'Enemy not found in assets'
+    @staticmethod
+    def frame_specs(enemy_names: list[str]) -> dict[str, FrameSpec]:
+        specs = {}
 
-        edited_enemy_name = '_'.join(self.enemy_name.split(' '))
+        for enemy_name in enemy_names:
+            edited_enemy_name = '_'.join(enemy_name.split(' '))
+            specs[f'enemies/{enemy_name}'] = FrameSpec(tuple(f'./assets/enemies/{enemy_name}/{edited_enemy_name}_{i}.png' for i in range(1, 5)), scale=4)
 
-        self.animations = [pygame.transform.scale_by(pygame.image.load(f'./assets/enemies/{self.enemy_name}/{edited_enemy_name}_{i}.png').convert_alpha(), self.scale_factor) for i in range(1, 5)]
+        return specs
 
-    def import_sounds(self):
-        self.enemy_leap_sound = Sound('./assets/sounds/enemies/enemy_leap.mp3')
+    def import_images(self):
+        self.frames_key = f'enemies/{self.enemy_name}'
+        self.animations = assets.get_frames(self.frames_key, self.frame_specs([self.enemy_name])[self.frames_key])
 
     def import_enemy_data(self):
-        with open('./data/enemy_data.json') as rf:
-            self.data: dict = json.load(rf)[self.enemy_name]
+        # Shared by every enemy of this type, game_data has already checked that the type has frames
+        self.stats = game_data.get_enemy(self.enemy_name)
         
     def persue_player(self, player):
         if self.disable_pursue or self.triggered:
@@ -91,12 +94,12 @@ class Enemy(pygame.sprite.Sprite):
 
         distance = Vector2(player.rect.center).distance_to(self.rect.center)
 
-        if distance <= self.data['attack radius']:
+        if distance <= self.stats.attack_radius:
             self.attack_state = True
             self.last_player_coords = Vector2(player.rect.center)
             self.last_enemy_coords = Vector2(self.rect.center)
 
-        elif distance <= self.data['pursue radius']:
+        elif distance <= self.stats.pursue_radius:
             self.delta = Vector2(self.rect.center).move_towards(player.rect.center, self.vel) - Vector2(self.rect.center)
         
         else:
@@ -107,22 +110,17 @@ class Enemy(pygame.sprite.Sprite):
             if self.stunned_counter > self.stunned_delay:
                 self.stunned_counter = 0
                 self.disable_pursue = False
-                self.image = self.animations[int(self.animation_index)]
             else:
-                self.stunned_counter += 0.1
+                self.stunned_counter += 0.1 * TIME_SCALE
                 self.delta = Vector2()
-                self.image = self.mask.to_surface()
-                self.image.set_colorkey((0, 0, 0))
      
     def update_image(self):
-        image = self.image
-
-        if self.facing_right:
-            self.image = image
-        else:
-            self.image = pygame.transform.flip(image, True, False)
+        # Frames, their flipped versions and masks are shared by every enemy of the same type
+        index = int(self.animation_index)
+        self.image, self.mask = assets.get_oriented_frames(self.frames_key)[self.facing_right][index]
 
-        self.mask = pygame.mask.from_surface(self.image)
+        if self.disable_pursue: # stunned
+            self.image = assets.get_silhouette(self.frames_key, self.facing_right, index)
 
     def draw_enemy(self, offset):
         self.win.blit(self.image, self.rect.topleft - offset)
@@ -200,12 +198,12 @@ class Enemy(pygame.sprite.Sprite):
         
         if self.attack_cooldown_counter >= self.attack_cooldown:
             self.triggered = True
-            # self.enemy_leap_sound.play()
+            # sounds.play('enemy leap')
         else:
-            self.attack_cooldown_counter += 0.1
+            self.attack_cooldown_counter += 0.1 * TIME_SCALE
 
         if self.triggered:
-            if self.total_attack_delta.distance_to(Vector2(0, 0)) >= self.data['leap distance']:
+            if self.total_attack_delta.distance_to(Vector2(0, 0)) >= self.stats.leap_distance:
                 self.attack_state = False
                 self.triggered = False
                 self.total_attack_delta = Vector2()
@@ -213,13 +211,13 @@ class Enemy(pygame.sprite.Sprite):
 
             else:
                 # Calculates new point given the origin point, rule, and distance to that point
-                d = self.data['leap distance']
+                d = self.stats.leap_distance
                 x1, y1 = self.last_enemy_coords
                 x2, y2 = self.last_player_coords
                 x3, y3 = self.get_new_vector(x1, y1, x2, y2, d)
 
-                self.delta = Vector2(x1, y1).move_towards((x3, y3), self.leap_speed) - Vector2(x1, y1)
-                self.player_delta = Vector2(x1, y1).move_towards((x3, y3), player.knockback) - Vector2(x1, y1)
+                self.delta = Vector2(x1, y1).move_towards((x3, y3), self.leap_speed * TIME_SCALE) - Vector2(x1, y1)
+                self.player_delta = Vector2(x1, y1).move_towards((x3, y3), player.knockback * TIME_SCALE) - Vector2(x1, y1)
 
                 # since pygame flips the y axis, we have to calculate for new delta values
                 if x2 - x1 > 0:
@@ -228,11 +226,21 @@ class Enemy(pygame.sprite.Sprite):
 
                 self.total_attack_delta += self.delta
     
-    def update(self, player: pygame.sprite.Sprite, offset: Vector2):
+    def is_busy(self) -> bool:
+        # Attacking or stunned enemies have timers running and must keep thinking every frame
+        return self.attack_state or self.triggered or self.disable_pursue
+
+    def think(self, player: pygame.sprite.Sprite):
         self.persue_player(player)
         self.attack_player(player)
         self.trigger_delay()
         self.update_direction()
-        self.update_image()
+
+    def draw(self, offset: Vector2):
         self.update_health_bar(offset)
-        self.draw_enemy(offset)
\ No newline at end of file
+        self.draw_enemy(offset)
+
+    def update(self, player: pygame.sprite.Sprite, offset: Vector2):
+        self.think(player)
+        self.update_image()
+        self.draw(offset)
\ No newline at end of file
@@ -1,26 +1,41 @@
 import pygame
-from pygame.mixer import Sound
-from pytmx import TiledTileLayer
-from pytmx.util_pygame import load_pygame
 
+import hashlib
+from math import ceil
 from random import randint as rand
 
 from .player import Player
 from .tile import *
-from .groups import CollisionGroup, CameraGroup, AnimationGroup, InteractiveGroup, ActiveGroup
+from .assets import assets, animation_spec, ANIMATIONS
+from .sound import sounds
+from .groups import CollisionGroup, CameraGroup, AnimationGroup, InteractiveGroup, ActiveGroup, EnemyGroup
 from .enemy import Enemy
+from .data import game_data
+from .controls import LiveInput, ScriptedInput
+from .level import LevelData, load_level_data
+from .streaming import ChunkStreamer
+from .pool import coin_pool
+from .loader import GameLoader
 from settings import *
 from support import display_text
 from decorators import run_once
 
 
 class Game:
-    def __init__(self):
+    static_layers = ('Ground', 'Bone', 'Wall') # tile layers baked into the static chunks, walls also get a collision sprite
+
+    def __init__(self, input_source: LiveInput | ScriptedInput | None = None, prepared: dict | None = None):
+        """
+        Note: prepared is what GameLoader read ahead on its worker thread (see src/loader.py), anything missing from it is loaded here
+        """
+        prepared = prepared or {}
+
         self.win = pygame.display.get_surface()
+        self.input = input_source if input_source is not None else LiveInput()
 
         self.collision_sprites = CollisionGroup()
 
-        self.enemy_sprites = pygame.sprite.Group()
+        self.enemy_sprites = EnemyGroup()
         self.player = pygame.sprite.GroupSingle()
         self.active_sprites = ActiveGroup() # enemy sprites + player sprite
 
@@ -28,103 +43,306 @@ class Game:
         self.interactive_sprites = InteractiveGroup()
         self.animation_sprites = AnimationGroup()
 
-        self.load_level()
+        # Index into LEVELS of the level being played, the next one is read by preloader while the player nears a ladder
+        self.level_index = 0
+        self.preloader: GameLoader | None = None
+
+        self.load_atlases(prepared.get('atlases', {}))
+        self.load_level(prepared.get('level'), prepared.get('chunks'))
+
+        # Every weapon angle is rendered here, on GameLoader's worker thread when the game is started from the menu, rather than
+        # the first time a swing passes through it
+        for rotations in assets.rotations.values():
+            rotations.render_all()
 
-        self.coin_image = pygame.transform.scale(pygame.image.load('./assets/sprite animations/coin/coin_1.png').convert_alpha(), (TILE_SIZE, TILE_SIZE))
+        self.coin_image = assets.get_animation('Coin')[0]
 
         self.game_over = False
         self.victory = False
 
+        # Subsystems in the order they run, as (name, method) pairs so that they can be timed one by one (see benchmarks/scenarios.py)
+        self.step_stages = [
+            ('input', self.update_input),
+            ('streaming', self.update_streaming),
+            ('collision', self.update_collision),
+            ('enemy update', self.update_enemies),
+            ('camera', self.update_camera),
+            ('combat', self.update_combat),
+            ('player', self.update_player),
+            ('animation', self.update_animation),
+            ('interaction', self.update_interaction),
+            ('preload', self.update_preload)
+        ]
+        self.draw_stages = [
+            ('draw', self.draw_sprites),
+            ('enemy draw', self.draw_enemies),
+            ('player draw', self.draw_player),
+            ('hud', self.display_coin_counter)
+        ]
+
     @run_once
     def play_music(self):
-        self.music = Sound(f'./assets/sounds/music/otherworld.mp3')
-        self.music.set_volume(0.8)
-        self.music.play(loops=-1, fade_ms=5000)
-
-    def load_level(self):
-        tmx_data = load_pygame('./assets/tmx/level_1.tmx')
-
-        for layer in tmx_data.visible_layers:
-            if isinstance(layer, TiledTileLayer):
-                for x, y, surface in layer.tiles():
-                    pos = (x * TILE_SIZE, y * TILE_SIZE)
-                    image = pygame.transform.scale(surface, (TILE_SIZE, TILE_SIZE))
-
-                    match layer.name:
-                        case 'Ground' | 'Bone':
-                            Tile(pos, image, self.camera_sprites, layer.name)
-                        
-                        case 'Wall':
-                            Tile(pos, image, [self.camera_sprites, self.collision_sprites], layer.name)
-                        
-                        case 'Chest' | 'Mini Chest':
-                            Chest(pos, [self.camera_sprites, self.collision_sprites, self.animation_sprites, self.interactive_sprites], layer.name)
-
-                        case 'Small Red Flask' | 'Large Red Flask' | 'Small Blue Flask' | 'Large Blue Flask':
-                            Flask(pos, [self.camera_sprites, self.animation_sprites, self.interactive_sprites], layer.name)
-
-                        case 'Flag':
-                            Flag(pos, [self.camera_sprites, self.animation_sprites], layer.name)
-
-                        case 'Front Torch' | 'Right Torch' | 'Left Torch' | 'Small Candlestick' | 'Tall Candlestick':
-                            Torch(pos, [self.camera_sprites, self.animation_sprites], layer.name)
-
-                        case 'Coin':
-                            Coin(pos, [self.camera_sprites, self.animation_sprites, self.interactive_sprites], layer.name)
-                        
-                        case 'Ladder':
-                            Tile(pos, image, [self.camera_sprites, self.interactive_sprites], layer.name)
-                        
-                        case 'Golden Key' | 'Silver Key':
-                            Key(pos, [self.camera_sprites, self.animation_sprites, self.interactive_sprites], layer.name)
-                        
-                        case 'Mini Brown Box' | 'Mini Silver Box' | 'Brown Box' | 'Silver Box':
-                            Box(pos, [self.camera_sprites, self.animation_sprites, self.interactive_sprites], layer.name)
-        
-                        case 'Door':
-                            Tile(pos, image, [self.camera_sprites, self.interactive_sprites], layer.name)
-
-                        case _:
-                            raise ValueError(f'Cannot assign layer \'{layer.name}\' to associated class')
-
-        for obj in tmx_data.objects:
-            pos = (obj.x / tmx_data.tilewidth * TILE_SIZE, obj.y / tmx_data.tileheight * TILE_SIZE)
-            match obj.name:
-                case 'Spawn Point':
-                    Player(pos, [self.camera_sprites, self.active_sprites, self.player])
-
-                case _:
-                    Enemy(pos, [self.camera_sprites, self.animation_sprites, self.active_sprites, self.enemy_sprites], obj.name)
-                
+        sounds.play_music('game', fade_ms=5000)
+
+    @staticmethod
+    def atlas_specs() -> dict[str, dict]:
+        enemy_names = list(game_data.get_enemies())
+
+        return {
+            'sprite animations': {layer_name: animation_spec(layer_name) for layer_name in ANIMATIONS},
+            'player': Player.frame_specs(),
+            'enemies': Enemy.frame_specs(enemy_names)
+        }
+
+    def load_atlases(self, saved: dict[str, tuple] | None = None):
+        # saved holds atlases already read from the cache, by family
+        saved = saved or {}
+
+        for family, specs in self.atlas_specs().items():
+            if family not in assets.atlases:
+                assets.load_atlas(family, specs, saved=saved.get(family))
+
+    def load_level(self, level: LevelData | None = None, chunks: dict[tuple[int, int], pygame.Surface] | None = None):
+        """
+        Note: Loads LEVELS[self.level_index] (or level, when it has been read already, with chunks baked by bake_spawn_chunks()).
+        The player is created at the spawn point of the first level and only moved to it on later ones, so it keeps its health and coins
+        """
+        if level is None:
+            level = load_level_data(LEVELS[self.level_index])
+        else:
+            level.convert()
+
+        self.level = level
+
+        for name, x, y in level.objects:
+            if name == 'Spawn Point':
+                if self.player.sprite is None:
+                    Player((x, y), [self.camera_sprites, self.active_sprites, self.player], self.input)
+                else:
+                    self.player.sprite.rect.center = (x, y)
+
+        half_tile = TILE_SIZE / 2
+        self.ladders = [(x + half_tile, y + half_tile) for (x, y), _ in level.layer_tiles('Ladder')] if 'Ladder' in level.layers else []
+
+        if not self.ladders: # the ladder leads to the next level, or wins the game on the last one
+            raise ValueError(f'{LEVELS[self.level_index]} has no ladder, so it could never be finished')
+
+        # Tiles and enemies only exist around the player, the streamer creates and evicts them chunk by chunk
+        self.streamer = ChunkStreamer(self, level, chunks)
+        self.streamer.update(self.player.sprite)
+
+    @classmethod
+    def bake_spawn_chunks(cls, level: LevelData) -> dict[tuple[int, int], pygame.Surface]:
+        """
+        Note: Bakes the static layers of the chunks within STREAM_RADIUS of the spawn point onto surfaces of their own, the same
+        way CameraGroup.add_static_tile() would. It doesn't touch the game, so GameLoader runs it on its worker thread and loading
+        the level only has to create the sprites of those chunks
+        """
+        chunk_pixels = CHUNK_SIZE * TILE_SIZE
+        chunks = {}
+
+        for name, x, y in level.objects:
+            if name != 'Spawn Point':
+                continue
+
+            spawn_x, spawn_y = int(x // chunk_pixels), int(y // chunk_pixels)
+
+            for cx in range(max(0, spawn_x - STREAM_RADIUS), min(ceil(level.width / CHUNK_SIZE), spawn_x + STREAM_RADIUS + 1)):
+                for cy in range(max(0, spawn_y - STREAM_RADIUS), min(ceil(level.height / CHUNK_SIZE), spawn_y + STREAM_RADIUS + 1)):
+                    surface = pygame.Surface((chunk_pixels, chunk_pixels)).convert()
+                    surface.fill(COLOURS['background'])
+
+                    for layer_name, ids in level.layers.items(): # in TMX order, like ChunkStreamer.load_chunk()
+                        if layer_name not in cls.static_layers:
+                            continue
+
+                        for tile_y in range(cy * CHUNK_SIZE, min((cy + 1) * CHUNK_SIZE, level.height)):
+                            row = tile_y * level.width
+
+                            for tile_x in range(cx * CHUNK_SIZE, min((cx + 1) * CHUNK_SIZE, level.width)):
+                                if ids[row + tile_x]:
+                                    surface.blit(level.tiles[ids[row + tile_x]], ((tile_x - cx * CHUNK_SIZE) * TILE_SIZE, (tile_y - cy * CHUNK_SIZE) * TILE_SIZE))
+
+                    chunks[(cx, cy)] = surface
+
+        return chunks
+
+    def unload_level(self):
+        # Removes every sprite of the current level, which is everything but the player
+        player = self.player.sprite
+
+        for group in (self.camera_sprites, self.collision_sprites, self.interactive_sprites, self.animation_sprites, self.active_sprites):
+            for sprite in group.sprites():
+                if sprite is not player:
+                    sprite.kill()
+
+        for chunk in list(self.camera_sprites.static_chunks):
+            self.camera_sprites.remove_static_chunk(chunk)
+
+    def next_level(self):
+        """
+        Note: Moves the player to the next level. Its data is normally read already (see update_preload), if not it is read here
+        """
+        self.level_index += 1
+
+        if self.preloader is None:
+            self.preloader = GameLoader(level_path=LEVELS[self.level_index], build_game=False)
+        prepared = self.preloader.wait()
+        self.preloader = None
+
+        self.unload_level()
+        self.load_level(prepared.get('level'), prepared.get('chunks'))
+
+        # Nothing should be interpolated from where the player was on the previous level
+        self.camera_sprites.center_target_camera(self.player.sprite)
+        self.camera_sprites.save_positions()
+
+    def create_tile(self, layer_name: str, pos: tuple[int, int], tile_id: int, bake: bool = True) -> Sprite | None:
+        """
+        Note: Creates what a cell of a tile layer turns into, returns None for cells that are only baked into the static chunks.
+        bake is False when the cell's chunk has been baked already
+        """
+        level = self.level
+        image = level.tiles[tile_id]
+
+        if bake and layer_name in self.static_layers:
+            self.camera_sprites.add_static_tile(pos, image)
+
+        match layer_name:
+            case 'Ground' | 'Bone':
+                return None
+            
+            case 'Wall':
+                sprite = Tile(pos, image, [self.collision_sprites], layer_name, level.get_mask(tile_id))
+            
+            case 'Chest' | 'Mini Chest':
+                sprite = Chest(pos, [self.camera_sprites, self.collision_sprites, self.animation_sprites, self.interactive_sprites], layer_name)
+
+            case 'Small Red Flask' | 'Large Red Flask' | 'Small Blue Flask' | 'Large Blue Flask':
+                sprite = Flask(pos, [self.camera_sprites, self.animation_sprites, self.interactive_sprites], layer_name)
+
+            case 'Flag':
+                sprite = Flag(pos, [self.camera_sprites, self.animation_sprites], layer_name)
+
+            case 'Front Torch' | 'Right Torch' | 'Left Torch' | 'Small Candlestick' | 'Tall Candlestick':
+                sprite = Torch(pos, [self.camera_sprites, self.animation_sprites], layer_name)
+
+            case 'Coin':
+                sprite = Coin(pos, [self.camera_sprites, self.animation_sprites, self.interactive_sprites], layer_name)
+            
+            case 'Ladder':
+                sprite = Tile(pos, image, [self.camera_sprites, self.interactive_sprites], layer_name, level.get_mask(tile_id))
+            
+            case 'Golden Key' | 'Silver Key':
+                sprite = Key(pos, [self.camera_sprites, self.animation_sprites, self.interactive_sprites], layer_name)
+            
+            case 'Mini Brown Box' | 'Mini Silver Box' | 'Brown Box' | 'Silver Box':
+                sprite = Box(pos, [self.camera_sprites, self.animation_sprites, self.interactive_sprites], layer_name)
+
+            case 'Door':
+                sprite = Tile(pos, image, [self.camera_sprites, self.interactive_sprites], layer_name, level.get_mask(tile_id))
+
+            case _:
+                raise ValueError(f'Cannot assign layer \'{layer_name}\' to associated class')
+
+        return sprite
+
+    def create_enemy(self, name: str, pos: tuple[float, float]) -> Enemy:
+        return Enemy(pos, [self.camera_sprites, self.animation_sprites, self.active_sprites, self.enemy_sprites], name)
+
+    def create_coin(self, pos: tuple[float, float]) -> Coin:
+        return coin_pool.get(pos, [self.camera_sprites, self.animation_sprites, self.interactive_sprites], 'Coin')
+
     def display_coin_counter(self):
         self.win.blit(self.coin_image, (10, 70))
 
         display_text(self.win, f'x{self.player.sprite.coins}', (66, 91), position='topleft')
 
-    def update(self):        
+    def update_input(self):
+        self.input.tick()
+        self.camera_sprites.save_positions()
+
+    def update_streaming(self):
+        self.streamer.update(self.player.sprite)
+
+    def update_collision(self):
         self.collision_sprites.update_active_sprites_position(self.active_sprites, self.player.sprite)
 
-        self.camera_sprites.draw_sprites(self.player.sprite, self.active_sprites)
-        
+    def update_enemies(self):
         self.camera_sprites.update_enemies(self.player.sprite, self.enemy_sprites)
 
+    def update_camera(self):
         self.camera_sprites.center_target_camera(self.player.sprite)
 
-        self.game_over = self.active_sprites.check_collision_between_sprites(self.camera_sprites, self.animation_sprites, self.interactive_sprites)
-        
-        if self.game_over:
-            self.music.stop()
-        
+    def update_combat(self):
+        self.game_over = self.active_sprites.check_collision_between_sprites(self.camera_sprites, self.animation_sprites, self.interactive_sprites, self.enemy_sprites) # plays the death music
+
+    def update_player(self):
         self.camera_sprites.update_player(self.player.sprite)
 
+    def update_animation(self):
         self.animation_sprites.animate()
 
-        self.victory = self.interactive_sprites.update_collision(self.player.sprite)
+    def update_interaction(self):
+        if self.interactive_sprites.update_collision(self.player.sprite): # reached a ladder
+            if self.level_index + 1 < len(LEVELS):
+                self.next_level()
+            else:
+                self.victory = True
+                sounds.play_music('victory', fade_ms=3000)
+
+        self.interactive_sprites.update_sprites(self.player.sprite, self.camera_sprites)
 
-        if self.victory:
-            self.music.stop()
+    def update_preload(self):
+        if self.preloader is not None or self.level_index + 1 == len(LEVELS):
+            return
 
-        self.interactive_sprites.update_sprites(self.player.sprite)
+        x, y = self.player.sprite.rect.center
+        if any((x - ladder_x) ** 2 + (y - ladder_y) ** 2 < PRELOAD_DISTANCE ** 2 for ladder_x, ladder_y in self.ladders):
+            self.preloader = GameLoader(level_path=LEVELS[self.level_index + 1], build_game=False)
+            self.preloader.start()
 
-        self.display_coin_counter()
+    def draw_sprites(self):
+        self.camera_sprites.draw_sprites(self.player.sprite, self.active_sprites)
 
+    def draw_enemies(self):
+        self.camera_sprites.draw_enemies(self.enemy_sprites)
+
+    def draw_player(self):
+        self.camera_sprites.draw_player(self.player.sprite)
+
+    def step(self):
+        """
+        Note: Advances the simulation by one fixed tick (TICK seconds) without drawing anything
+        """
+        sounds.advance()
+
+        for _, stage in self.step_stages:
+            stage()
+
+    def draw(self, alpha: float = 1):
+        """
+        Note: alpha is how far between the previous and the latest tick this frame is, sprites are drawn interpolated between the two
+        """
+        self.camera_sprites.interpolate(alpha)
+
+        for _, stage in self.draw_stages:
+            stage()
+
+    def state_hash(self) -> str:
+        """
+        Note: Fingerprint of everything a tick can change, used to check that a replay ended up exactly where its recording did
+        """
+        player = self.player.sprite
+        state = (
+            self.level_index, player.rect.topleft, player.health, player.coins, tuple(self.camera_sprites.offset),
+            [(sprite.rect.topleft, sprite.health) for sprite in self.enemy_sprites],
+            [sprite.rect.topleft for sprite in self.interactive_sprites],
+            self.game_over, self.victory
+        )
+
+        return hashlib.sha256(repr(state).encode()).hexdigest()[:16]
+
+    def update(self):
+        self.step()
+        self.draw()
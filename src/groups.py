@@ -1,12 +1,16 @@
 import pygame
 from pygame.math import Vector2
 from pygame.sprite import Sprite, Group
-from pygame.mixer import Sound
 
-from random import randint, choice
+from itertools import count
 
 from settings import *
+from support import rng
 from .tile import Coin
+from .pool import coin_pool
+from .spatial import SpatialHash
+from .sound import sounds
+from .steering import SteeringBatch, np
 
 
 class CollisionGroup(Group):
@@ -15,14 +19,26 @@ class CollisionGroup(Group):
 
         self.win = pygame.display.get_surface()
 
-    def check_collision(self, active_sprite: Sprite, sprite_group: Group, direction: str, player: Sprite):
+        self.grid = SpatialHash(TILE_SIZE) # index of walls and chests, which never move, so sprites are indexed once when they are added
+
+    def add_internal(self, sprite: Sprite, layer=None):
+        super().add_internal(sprite, layer)
+        self.grid.add_pending(sprite)
+
+    def remove_internal(self, sprite: Sprite):
+        super().remove_internal(sprite)
+        self.grid.remove(sprite)
+
+    def check_collision(self, active_sprite: Sprite, sprite_group: Group | list, direction: str, player: Sprite):
         """
         Note: All active sprites must have a delta (rate of change) and rect (sprite rect) attribute
         """
 
         # player 
+        in_group = active_sprite in sprite_group # the same for every sprite, and a scan of the whole list when sprite_group is one
+
         for sprite in sprite_group:
-            if active_sprite in sprite_group:
+            if in_group:
                 collision_condition = active_sprite.rect.colliderect(sprite.rect) and not player in (active_sprite, sprite) and active_sprite != sprite
             else:
                 collision_condition = active_sprite.rect.colliderect(sprite.rect)
@@ -42,14 +58,18 @@ class CollisionGroup(Group):
                         active_sprite.rect.top = sprite.rect.bottom
 
     def update_active_sprites_position(self, active_sprites: Group, player: Sprite):
+        active_sprites.build_broad_phase(player)
+
         for active_sprite in active_sprites:
             active_sprite.rect.x += active_sprite.delta.x
-            self.check_collision(active_sprite, self, 'horizontal', player) # check horizontal collision with collision sprites
-            self.check_collision(active_sprite, active_sprites, 'horizontal', player) # check horizontal collision with own active sprites
+            self.check_collision(active_sprite, self.grid.query(active_sprite.rect), 'horizontal', player) # check horizontal collision with the collision sprites in the cells the rect overlaps
+            self.check_collision(active_sprite, active_sprites.get_nearby_sprites(active_sprite, player), 'horizontal', player) # check horizontal collision with nearby active sprites
 
             active_sprite.rect.y += active_sprite.delta.y
-            self.check_collision(active_sprite, self, 'vertical', player) # check vertical collision with collision sprites
-            self.check_collision(active_sprite, active_sprites, 'vertical', player) # check vertical collision with own active sprites
+            self.check_collision(active_sprite, self.grid.query(active_sprite.rect), 'vertical', player) # check vertical collision with the collision sprites in the cells the rect overlaps
+            self.check_collision(active_sprite, active_sprites.get_nearby_sprites(active_sprite, player), 'vertical', player) # check vertical collision with nearby active sprites
+
+            active_sprites.broad_phase.move(active_sprite) # keep the broad phase in sync with the resolved position for the sprites after it
 
 
 class CameraGroup(Group):
@@ -60,32 +80,168 @@ class CameraGroup(Group):
 
         self.offset = Vector2()
 
+        # Interpolation between the last two simulation ticks, see save_positions() and interpolate()
+        self.previous_offset = Vector2()
+        self.previous_positions: dict[Sprite, tuple[int, int]] = {}
+        self.alpha = 1
+        self.draw_offset = Vector2()
+
         self.shadow_image = pygame.image.load(f'./assets/characters/shadow.png').convert_alpha()
+        self.shadow_images: dict[tuple[float, float], pygame.Surface] = {} # shadow_image scaled to each actor size that has asked for one
+
+        # Static tile layers are baked into large chunk surfaces instead of being drawn as one sprite per tile
+        self.chunk_pixels = CHUNK_SIZE * TILE_SIZE
+        self.static_chunks: dict[tuple[int, int], pygame.Surface] = {}
+        self.spare_chunks: list[pygame.Surface] = [] # surfaces of removed chunks, reused since creating one is most of the cost of baking a chunk
+
+        # Spatial index of the camera sprites for viewport (and other range) queries
+        self.spatial_index = SpatialHash(TILE_SIZE * 4)
+        self.draw_order: dict[Sprite, int] = {} # insertion order, which is the order sprites are drawn in
+        self.draw_counter = count()
+        self.moving_sprites: dict[Sprite, None] = {}
+
+    def add_internal(self, sprite: Sprite, layer=None):
+        super().add_internal(sprite, layer)
+
+        self.draw_order[sprite] = next(self.draw_counter)
+        self.spatial_index.add_pending(sprite)
+
+        if not getattr(sprite, 'static', False):
+            self.moving_sprites[sprite] = None
+
+    def remove_internal(self, sprite: Sprite):
+        super().remove_internal(sprite)
+
+        self.draw_order.pop(sprite, None)
+        self.previous_positions.pop(sprite, None) # a pooled sprite can come back somewhere else within the same tick
+        self.moving_sprites.pop(sprite, None)
+        self.spatial_index.remove(sprite)
+
+    def update_index(self):
+        self.spatial_index.flush()
+
+        for sprite in self.moving_sprites:
+            self.spatial_index.move(sprite)
+
+    def sprites_in_rect(self, rect: pygame.Rect) -> list:
+        """
+        Note: Returns the camera sprites whose rect overlaps rect (in world coordinates), in draw order
+        """
+        self.update_index()
+
+        return sorted((sprite for sprite in self.spatial_index.query(rect) if sprite.rect.colliderect(rect)), key=self.draw_order.__getitem__)
+
+    def get_view_rect(self, margin: int = VIEW_MARGIN) -> pygame.Rect:
+        return pygame.Rect(self.draw_offset.x - margin, self.draw_offset.y - margin, WIN_X + margin * 2, WIN_Y + margin * 2)
+
+    def save_positions(self):
+        """
+        Note: Called at the start of every simulation tick so that frames drawn between ticks can interpolate from these positions
+        """
+        self.update_index()
+
+        self.previous_offset = Vector2(self.offset)
+        self.previous_positions = {sprite: sprite.rect.topleft for sprite in self.moving_sprites}
+
+    def interpolate(self, alpha: float):
+        # alpha is how far the frame being drawn is between the previous tick (0) and the latest one (1)
+        self.alpha = alpha
+        self.draw_offset = self.previous_offset.lerp(self.offset, alpha)
+
+    def get_sprite_offset(self, sprite: Sprite) -> Vector2:
+        """
+        Note: The offset to subtract from sprite.rect.topleft to get its interpolated position on screen
+        """
+        if sprite not in self.previous_positions:
+            return self.draw_offset
+
+        return self.draw_offset + (Vector2(sprite.rect.topleft) - self.previous_positions[sprite]) * (1 - self.alpha)
+
+    def set_moving(self, sprite: Sprite, moving: bool):
+        # For sprites that are only sometimes moving, so they are re-indexed and interpolated only while they do
+        if moving:
+            self.moving_sprites[sprite] = None
+            self.previous_positions[sprite] = sprite.rect.topleft
+        else:
+            self.moving_sprites.pop(sprite, None)
+
+    def add_static_tile(self, pos: tuple[int, int], image: pygame.Surface):
+        chunk = (int(pos[0] // self.chunk_pixels), int(pos[1] // self.chunk_pixels))
+
+        if chunk not in self.static_chunks:
+            # Chunks are opaque (filled with the background colour) since opaque blits are a lot cheaper than alpha blits
+            surface = self.spare_chunks.pop() if self.spare_chunks else pygame.Surface((self.chunk_pixels, self.chunk_pixels)).convert()
+            surface.fill(COLOURS['background'])
+            self.static_chunks[chunk] = surface
+
+        self.static_chunks[chunk].blit(image, (pos[0] - chunk[0] * self.chunk_pixels, pos[1] - chunk[1] * self.chunk_pixels))
+
+    def add_static_chunk(self, chunk: tuple[int, int], surface: pygame.Surface):
+        # A chunk baked ahead of time (see Game.bake_spawn_chunks)
+        self.static_chunks[chunk] = surface
+
+    def remove_static_chunk(self, chunk: tuple[int, int]):
+        if chunk in self.static_chunks:
+            self.spare_chunks.append(self.static_chunks.pop(chunk))
+
+    def draw_static_chunks(self):
+        offset = self.draw_offset
+        left, top = int(offset.x // self.chunk_pixels), int(offset.y // self.chunk_pixels)
+        right, bottom = int((offset.x + WIN_X) // self.chunk_pixels), int((offset.y + WIN_Y) // self.chunk_pixels)
+
+        for x in range(left, right + 1):
+            for y in range(top, bottom + 1):
+                if (x, y) in self.static_chunks:
+                    self.win.blit(self.static_chunks[(x, y)], (x * self.chunk_pixels - offset.x, y * self.chunk_pixels - offset.y))
+
+    def get_shadow(self, size: tuple[float, float]) -> pygame.Surface:
+        if size not in self.shadow_images:
+            self.shadow_images[size] = pygame.transform.scale(self.shadow_image, size)
+
+        return self.shadow_images[size]
 
     def center_target_camera(self, target: Sprite):
         self.offset.x = target.rect.centerx - WIN_X / 2
         self.offset.y = target.rect.centery - WIN_Y / 2
     
     def shake_camera(self, x_intensity: int | float = 10, y_intensity: int | float = 0) -> None:
-        self.offset.x += choice([randint(-x_intensity, -x_intensity // 2), randint(x_intensity // 2, x_intensity)])
-        self.offset.y += choice([randint(-y_intensity, -y_intensity // 2), randint(y_intensity // 2, y_intensity)])
+        self.offset.x += rng.choice([rng.randint(-x_intensity, -x_intensity // 2), rng.randint(x_intensity // 2, x_intensity)])
+        self.offset.y += rng.choice([rng.randint(-y_intensity, -y_intensity // 2), rng.randint(y_intensity // 2, y_intensity)])
 
     def draw_sprites(self, player: Sprite, active_sprites: Group):
-        for sprite in self.sprites():
-            offset_pos = sprite.rect.topleft - self.offset
+        self.draw_static_chunks()
+
+        active_sprites = active_sprites.spritedict # plain dict lookups are cheaper than Group.__contains__
+
+        for sprite in self.sprites_in_rect(self.get_view_rect()):
+            offset = self.get_sprite_offset(sprite)
+            offset_pos = sprite.rect.topleft - offset
             if sprite in active_sprites:
-                self.win.blit(pygame.transform.scale(self.shadow_image, (sprite.rect.width if sprite is player else sprite.rect.width / 1.8, sprite.rect.height / 3.5)), (sprite.rect.bottomleft - self.offset + Vector2(2 if sprite is player else 15, -10)))
+                self.win.blit(self.get_shadow((sprite.rect.width if sprite is player else sprite.rect.width / 1.8, sprite.rect.height / 3.5)), (sprite.rect.bottomleft - offset + Vector2(2 if sprite is player else 15, -10)))
             
             else:
                 self.win.blit(sprite.image, offset_pos)
     
     def update_enemies(self, player: Sprite, enemy_sprites: Group):
+        enemy_sprites.update_ai(player)
+
+        # Every enemy picks its frame (and with it the mask combat hit tests use) each tick, whether or not it gets drawn
         for sprite in enemy_sprites:
-            sprite.update(player, self.offset)
+            sprite.update_image()
+
+    def draw_enemies(self, enemy_sprites: Group):
+        # Only enemies on screen get drawn
+        enemies = enemy_sprites.spritedict
+        for sprite in self.sprites_in_rect(self.get_view_rect()):
+            if sprite in enemies:
+                sprite.draw(self.get_sprite_offset(sprite))
     
     def update_player(self, player: Sprite):
         player.update(self)
 
+    def draw_player(self, player: Sprite):
+        player.draw(self.get_sprite_offset(player))
+
 
 class AnimationGroup(Group):
     def __init__(self):
@@ -110,39 +266,46 @@ class InteractiveGroup(Group):
 
         self.win = pygame.display.get_surface()
 
-        self.coin_sound = Sound('./assets/sounds/items/coin-edit.wav')
-        self.victory_music = Sound('./assets/sounds/music/bit win.mp3')
-        self.victory_music.set_volume(0.5)
+        # Spatial index of the interactive sprites, so that only the ones around the player are looked at every tick
+        self.spatial_index = SpatialHash(TILE_SIZE * 2)
+        self.attracted: dict[Sprite, None] = {} # coins the player pulled in on the last tick
+
+    def add_internal(self, sprite: Sprite, layer=None):
+        super().add_internal(sprite, layer)
+        self.spatial_index.add_pending(sprite)
+
+    def remove_internal(self, sprite: Sprite):
+        super().remove_internal(sprite)
+        self.spatial_index.remove(sprite)
     
     def update_collision(self, player: Sprite) -> True | False:
-        for sprite in self.sprites():
+        for sprite in self.spatial_index.query(player.rect):
             if player.rect.colliderect(sprite.rect):
                 if player.mask.overlap(sprite.mask, sprite.rect.topleft - Vector2(player.rect.topleft)):
                     match sprite.layer_name:
                         case 'Coin':
                             player.coins += 1
-                            self.coin_sound.play()
+                            sounds.play('coin')
                             sprite.kill()
 
                         case 'Small Red Flask':
                             player.health += player.initial_health // 6
                             if player.health > player.initial_health:
                                 player.health = player.initial_health
-                            self.coin_sound.play() # Temporary until I find a sound for this
+                            sounds.play('coin') # Temporary until I find a sound for this
                             sprite.kill()
 
                         case 'Small Blue Flask':
                             player.health += player.initial_health // 6
                             if player.health > player.initial_health:
                                 player.health = player.initial_health
-                            self.coin_sound.play() # Temporary until I find a sound for this
+                            sounds.play('coin') # Temporary until I find a sound for this
                             sprite.kill()
 
                         case 'Chest':
                             pass
 
                         case 'Ladder':
-                            self.victory_music.play(loops=-1, fade_ms=3000)
                             return True
 
                         case _:
@@ -150,11 +313,36 @@ class InteractiveGroup(Group):
         
         return False
     
-    def update_sprites(self, player: Sprite):
-        for sprite in self.sprites():
-            match sprite.layer_name:
-                case 'Coin':
-                    sprite.move_towards_player(player.rect.center)
+    def update_sprites(self, player: Sprite, camera_sprites: CameraGroup):
+        """
+        Note: Coins within Coin.radius of the player move towards it. Only the index cells around the player are looked at, the coins
+        everywhere else stay idle (not moved, re-indexed or interpolated by camera_sprites) until the player comes close again
+        """
+        player_x, player_y = player.rect.center
+        radius = Coin.radius
+        attracted = {}
+
+        for sprite in self.spatial_index.query(pygame.Rect(player_x - radius, player_y - radius, radius * 2, radius * 2)):
+            if sprite.layer_name != 'Coin':
+                continue
+
+            dx = player_x - sprite.rect.centerx
+            dy = player_y - sprite.rect.centery
+            distance_squared = dx * dx + dy * dy
+
+            if distance_squared <= radius * radius:
+                if sprite not in self.attracted:
+                    camera_sprites.set_moving(sprite, True)
+
+                sprite.move_towards_player(dx, dy, distance_squared)
+                self.spatial_index.move(sprite)
+                attracted[sprite] = None
+
+        for sprite in self.attracted:
+            if sprite not in attracted:
+                camera_sprites.set_moving(sprite, False)
+
+        self.attracted = attracted
 
 
 class ActiveGroup(Group):
@@ -163,15 +351,31 @@ class ActiveGroup(Group):
 
         self.win = pygame.display.get_surface()
 
-        self.enemy_hurt_sound = Sound('./assets/sounds/enemies/enemy_hurt.wav')
-        self.enemy_die_sound = Sound('./assets/sounds/enemies/enemy_die.wav')
+        self.broad_phase = SpatialHash(TILE_SIZE * 2) # rebuilt every frame since active sprites move
+
+    def build_broad_phase(self, player: Sprite):
+        """
+        Note: The player is left out of the broad phase since it never pushes, or gets pushed by, enemies
+        """
+        self.broad_phase.clear()
+
+        for sprite in self.sprites():
+            if sprite is not player:
+                self.broad_phase.insert(sprite)
+
+    def get_nearby_sprites(self, active_sprite: Sprite, player: Sprite) -> list:
+        if active_sprite is player:
+            return []
 
-        self.player_hurt_sound = Sound('./assets/sounds/player/player_hurt.wav')
-        self.player_hurt_final_sound = Sound('./assets/sounds/player/player_hurt_final.mp3')
+        self.broad_phase.move(active_sprite) # the sprite may have changed cells since its last query
 
-        self.death_music = Sound('./assets/sounds/music/death_music.mp3')
+        return [sprite for sprite in self.broad_phase.query(active_sprite.rect) if sprite is not active_sprite]
 
-    def check_collision_between_sprites(self, camera_sprites: Group, animation_sprites: Group, interactive_sprites: Group) -> True | False:
+    def drop_coins(self, enemy_sprite: Sprite, groups: list[Group]):
+        for _ in range(enemy_sprite.coin_drops):
+            coin_pool.get(enemy_sprite.rect.center + Vector2(rng.randint(1, 30), rng.randint(1, 30)), groups, 'Coin')
+
+    def check_collision_between_sprites(self, camera_sprites: Group, animation_sprites: Group, interactive_sprites: Group, enemy_group: Group) -> True | False:
         player = self.sprites()[0]
         enemy_sprites = self.sprites()[1:]
         
@@ -179,17 +383,19 @@ class ActiveGroup(Group):
             if player.triggered:
                 if enemy_sprite.mask.overlap(player.particle_mask, (player.particle_rect.topleft + camera_sprites.offset - enemy_sprite.rect.topleft)):
                     if enemy_sprite.health <= 0:
-                        [Coin(enemy_sprite.rect.center + Vector2(randint(1, 30), randint(1, 30)), [camera_sprites, animation_sprites, interactive_sprites], 'Coin') for _ in range(enemy_sprite.coin_drops)]
+                        self.drop_coins(enemy_sprite, [camera_sprites, animation_sprites, interactive_sprites])
                         enemy_sprite.kill()
-                        self.enemy_die_sound.play()
+                        sounds.play('enemy die')
 
                     elif not enemy_sprite.disable_pursue:
+                        enemy_group.wake(enemy_sprite)
                         enemy_sprite.health -= player.damage
-                        self.enemy_hurt_sound.play()                        
+                        sounds.play('enemy hurt')                        
                         enemy_sprite.disable_pursue = True
 
                     else:
-                        enemy_sprite.delta = player.origin.move_towards(player.pos, enemy_sprite.knockback) - player.origin
+                        enemy_group.wake(enemy_sprite)
+                        enemy_sprite.delta = player.origin.move_towards(player.pos, enemy_sprite.knockback * TIME_SCALE) - player.origin
                         enemy_sprite.update_direction(inverse_facing_right=True)
                         camera_sprites.shake_camera(y_intensity=2)
 
@@ -197,12 +403,12 @@ class ActiveGroup(Group):
                 if enemy_sprite.mask.overlap(player.mask, enemy_sprite.rect.topleft - Vector2(player.rect.topleft)):
                     if player.health <= 0:
                         player.health = 0
-                        self.death_music.play()
+                        sounds.play_music('death', loops=0)
                         return True
 
                     elif not player.got_attacked:
                         player.health -= enemy_sprite.damage
-                        self.player_hurt_sound.play() if player.health / player.initial_health >= 0.3 else self.player_hurt_final_sound.play()
+                        sounds.play('player hurt' if player.health / player.initial_health >= 0.3 else 'player hurt final')
                         player.got_attacked = True
 
                     else:
@@ -210,3 +416,110 @@ class ActiveGroup(Group):
                         player.update_direction_from_delta(inverse_facing_right=True)
         
         return False
+
+
+class EnemyGroup(Group):
+    """
+    Note: Schedules enemy AI by distance to the player. 'active' enemies think every frame, 'reduced' enemies every
+    AI_REDUCED_INTERVAL frames and 'sleeping' enemies only get their distance checked every AI_SLEEP_INTERVAL frames.
+    Each enemy is given a slot so that the reduced and sleeping enemies are spread out over those frames. When numpy is installed,
+    a tier with at least STEERING_MIN_BATCH enemies due is classified and thought for by a SteeringBatch instead of one enemy at a time
+    """
+    tiers = ('active', 'reduced', 'sleeping')
+
+    def __init__(self):
+        super().__init__()
+
+        self.frame = 0
+        self.slots = count()
+
+        self.tier_sprites: dict[str, dict[Sprite, None]] = {tier: {} for tier in self.tiers}
+        self.tier_counts = {tier: 0 for tier in self.tiers} # enemies updated (or checked, for sleeping) in each tier last frame
+
+        self.steering = SteeringBatch() if np is not None and STEERING_BATCH else None
+        self.pending_steering: dict[Sprite, None] = {} # added before Enemy.__init__ set their stats, registered on the next update
+
+    def add_internal(self, sprite: Sprite, layer=None):
+        super().add_internal(sprite, layer)
+
+        sprite.ai_slot = next(self.slots)
+        sprite.ai_tier = 'active' # new enemies get classified on their first update
+        self.tier_sprites['active'][sprite] = None
+        self.pending_steering[sprite] = None
+
+    def remove_internal(self, sprite: Sprite):
+        super().remove_internal(sprite)
+
+        self.tier_sprites[sprite.ai_tier].pop(sprite, None)
+        self.pending_steering.pop(sprite, None)
+
+        if self.steering is not None:
+            self.steering.remove(sprite)
+
+    def set_tier(self, sprite: Sprite, tier: str):
+        if sprite.ai_tier != tier:
+            self.tier_sprites[sprite.ai_tier].pop(sprite, None)
+            self.tier_sprites[tier][sprite] = None
+            sprite.ai_tier = tier
+
+    def wake(self, sprite: Sprite):
+        # e.g. when an enemy takes damage or gets knocked back, anything that changes an enemy's AI state from outside it has to call this
+        if self.has_internal(sprite):
+            self.set_tier(sprite, 'active')
+
+            if self.steering is not None:
+                self.steering.stale(sprite)
+
+    def classify(self, sprite: Sprite, player: Sprite) -> str:
+        if sprite.is_busy():
+            return 'active'
+
+        dx = sprite.rect.centerx - player.rect.centerx
+        dy = sprite.rect.centery - player.rect.centery
+        distance_squared = dx * dx + dy * dy
+        pursue_radius = sprite.stats.pursue_radius
+
+        if distance_squared <= pursue_radius ** 2:
+            return 'active'
+        elif distance_squared <= (pursue_radius + AI_WAKE_MARGIN) ** 2:
+            return 'reduced'
+        else:
+            return 'sleeping'
+
+    def update_ai(self, player: Sprite):
+        self.frame += 1
+        self.tier_counts = {tier: 0 for tier in self.tiers}
+
+        if self.steering is not None and self.pending_steering:
+            self.steering.add(list(self.pending_steering))
+        self.pending_steering.clear()
+
+        for tier, interval in (('active', 1), ('reduced', AI_REDUCED_INTERVAL), ('sleeping', AI_SLEEP_INTERVAL)):
+            # New tiers are set once the whole tier is done, so an enemy that moves down a tier can still be due there this frame
+            due = list(self.tier_sprites[tier]) if interval == 1 else [sprite for sprite in self.tier_sprites[tier] if not (self.frame + sprite.ai_slot) % interval]
+            self.tier_counts[tier] = len(due)
+
+            if self.steering is not None and len(due) >= STEERING_MIN_BATCH:
+                new_tiers, thinking = self.steering.steer(due, tier, player)
+
+                for sprite in thinking:
+                    sprite.think(player)
+                    self.steering.stale(sprite)
+            else:
+                new_tiers = []
+
+                for sprite in due:
+                    new_tier = self.classify(sprite, player)
+
+                    if new_tier == 'sleeping':
+                        sprite.delta = Vector2() # a sleeping enemy is out of pursue range, so it would have stopped anyway
+                    else:
+                        sprite.think(player)
+
+                    new_tiers.append((sprite, new_tier))
+
+                    if self.steering is not None: # the batch keeps its own copy of the state think() just changed
+                        self.steering.stale(sprite)
+
+            for sprite, new_tier in new_tiers:
+                self.set_tier(sprite, new_tier)
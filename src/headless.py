@@ -0,0 +1,95 @@
+"""
+Runs the game without a window or sound card: SDL is pointed at its dummy video and audio drivers, so the display surface is
+an off-screen surface, sounds play to nowhere and input comes from a ScriptedInput. Game.step() doesn't draw anything, so ticks
+run as fast as the CPU allows unless render is set
+
+Usage: python -m src.headless [--ticks 3600] [--render]
+"""
+import pygame
+
+import argparse
+import os
+from time import perf_counter
+
+from settings import *
+from .controls import InputFrame, ScriptedInput
+
+
+def init_headless():
+    # Must run before the first Game is built, the drivers can't be swapped once the display has been opened
+    os.environ['SDL_VIDEODRIVER'] = 'dummy'
+    os.environ['SDL_AUDIODRIVER'] = 'dummy'
+
+    pygame.init()
+    pygame.display.set_mode((WIN_X, WIN_Y))
+
+
+def demo_script() -> list[InputFrame]:
+    """
+    Note: Walks around the first room swinging the sword, long enough to wake and fight the nearby enemies
+    """
+    frames = []
+    route = ((pygame.K_d,), (pygame.K_d, pygame.K_s), (pygame.K_a,), (pygame.K_a, pygame.K_w), (pygame.K_w,), ())
+
+    for i, keys in enumerate(route):
+        for tick in range(TICK_RATE):
+            swing = tick % (TICK_RATE // 2) < 5
+            frames.append(InputFrame(frozenset(keys), swing, (WIN_X // 2 + (200 if i % 2 else -200), WIN_Y // 2)))
+
+    return frames
+
+
+def fight_script() -> list[InputFrame]:
+    """
+    Note: Walks from the spawn of level_1 down the corridor and east towards the room with the enemies, then stands swinging at
+    alternating sides while they come for the player. Enemies get hit and die and drop coins, and in the end the player dies too
+    """
+    frames = [InputFrame(frozenset({pygame.K_s}))] * (TICK_RATE * 3) + [InputFrame(frozenset({pygame.K_d}))] * (TICK_RATE * 4)
+
+    for tick in range(TICK_RATE * 25):
+        frames.append(InputFrame(frozenset(), tick % 20 < 3, (WIN_X // 2 + (150 if tick // 20 % 2 else -150), WIN_Y // 2 - 100)))
+
+    return frames
+
+
+def run(game, ticks: int, render: bool = False) -> float:
+    """
+    Note: Steps game ticks times (stopping early on game over or victory) and returns the time it took in seconds
+    """
+    win = pygame.display.get_surface()
+    start = perf_counter()
+
+    for _ in range(ticks):
+        game.step()
+
+        if render:
+            win.fill(COLOURS['background'])
+            game.draw()
+
+        if game.game_over or game.victory:
+            break
+
+    return perf_counter() - start
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Run the game headless with a scripted player')
+    parser.add_argument('--ticks', type=int, default=TICK_RATE * 60)
+    parser.add_argument('--render', action='store_true', help='also draw every tick to the off-screen surface')
+    args = parser.parse_args()
+
+    init_headless()
+
+    from .game import Game
+
+    game = Game(ScriptedInput(demo_script(), loop=True))
+
+    elapsed = run(game, args.ticks, args.render)
+    ticks = game.input.tick_count + 1
+
+    print(f'{ticks} ticks ({ticks / TICK_RATE:.1f}s of game time) in {elapsed:.2f}s, {ticks / elapsed:.0f} ticks/s')
+    print(f'health {game.player.sprite.health}, coins {game.player.sprite.coins}, enemies left {len(game.enemy_sprites)}')
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,241 @@
+import pygame
+from pytmx import TiledTileLayer
+from pytmx.util_pygame import load_pygame
+
+import json
+import mmap
+import os
+import struct
+import tempfile
+from xml.etree import ElementTree
+
+from settings import *
+
+
+MAGIC = b'DGLV'
+VERSION = 2 # 2 added the sources to the metadata
+HEADER = struct.Struct('<4sBI') # magic, version, size of the JSON metadata that follows
+
+
+class LevelData:
+    """
+    Note: Everything Game.load_level needs from a TMX file: a tile id per cell for every visible tile layer (0 for an empty cell),
+    the tileset images those ids point at (already scaled to TILE_SIZE) and the objects with their positions in game pixels.
+    Layers are kept in TMX order and cells in row order, which is the order pytmx yields them in
+    """
+    def __init__(self, width: int, height: int, layers: dict, tiles: list[pygame.Surface | None], objects: list[tuple[str, float, float]]):
+        self.width = width
+        self.height = height
+        self.layers = layers # layer name -> sequence of width * height tile ids
+        self.tiles = tiles # tile id -> image, tiles[0] is None
+        self.objects = objects
+
+        self.masks: dict[int, pygame.mask.Mask] = {}
+        self.converted = False
+
+    def convert(self):
+        # Tiles read by read_level_data() are still in the file's RGBA format until this runs on the main thread
+        if not self.converted:
+            self.tiles = [tile.convert_alpha() if tile is not None else None for tile in self.tiles]
+            self.converted = True
+
+    def layer_tiles(self, layer_name: str):
+        # Yields (pos, tile id) for every non empty cell of a layer
+        width = self.width
+
+        for i, tile_id in enumerate(self.layers[layer_name]):
+            if tile_id:
+                yield ((i % width) * TILE_SIZE, (i // width) * TILE_SIZE), tile_id
+
+    def get_mask(self, tile_id: int) -> pygame.mask.Mask:
+        # Cells with the same tile share one mask instead of building their own
+        if tile_id not in self.masks:
+            self.masks[tile_id] = pygame.mask.from_surface(self.tiles[tile_id])
+
+        return self.masks[tile_id]
+
+
+def compile_level(tmx_path: str) -> LevelData:
+    tmx_data = load_pygame(tmx_path)
+
+    gids = {} # pytmx gid -> our tile id
+    tiles = [None]
+    layers = {}
+
+    for layer in tmx_data.visible_layers:
+        if isinstance(layer, TiledTileLayer):
+            ids = []
+
+            for row in layer.data:
+                for gid in row:
+                    if gid and gid not in gids:
+                        gids[gid] = len(tiles)
+                        tiles.append(pygame.transform.scale(tmx_data.images[gid], (TILE_SIZE, TILE_SIZE)))
+
+                    ids.append(gids[gid] if gid else 0)
+
+            layers[layer.name] = ids
+
+    objects = [(obj.name, obj.x / tmx_data.tilewidth * TILE_SIZE, obj.y / tmx_data.tileheight * TILE_SIZE) for obj in tmx_data.objects]
+
+    level = LevelData(tmx_data.width, tmx_data.height, layers, tiles, objects)
+    level.converted = True # pytmx already converted the tileset
+
+    return level
+
+
+def get_sources(tmx_path: str) -> dict[str, int]:
+    """
+    Note: The TMX and every tileset and image it pulls in (following .tsx files), with their modification times in nanoseconds.
+    A compiled level is stale as soon as any of them changes
+    """
+    paths = [os.path.normpath(tmx_path)]
+
+    for path in paths: # grows while the TMX and tileset files are read
+        if path.endswith(('.tmx', '.tsx')):
+            directory = os.path.dirname(path)
+
+            for element in ElementTree.parse(path).getroot().iter():
+                if element.tag in ('tileset', 'image') and 'source' in element.attrib:
+                    source = os.path.normpath(os.path.join(directory, element.attrib['source']))
+                    if source not in paths:
+                        paths.append(source)
+
+    return {path: os.stat(path).st_mtime_ns for path in paths}
+
+
+def save_level(level: LevelData, path: str, sources: dict[str, int]):
+    """
+    Note: Layout is the header, JSON metadata, every layer as little endian uint16 tile ids, then every tile image as raw RGBA.
+    The file is written next to path and then moved over it, so a crash (or another process reading it) never sees half a level
+    """
+    meta = {
+        'tile size': TILE_SIZE,
+        'width': level.width,
+        'height': level.height,
+        'layers': list(level.layers),
+        'tiles': len(level.tiles) - 1,
+        'objects': level.objects,
+        'sources': sources
+    }
+    meta = json.dumps(meta).encode()
+
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    fd, temp_path = tempfile.mkstemp(dir=os.path.dirname(path), suffix='.tmp')
+
+    try:
+        with open(fd, 'wb') as wf:
+            wf.write(HEADER.pack(MAGIC, VERSION, len(meta)))
+            wf.write(meta)
+
+            for ids in level.layers.values():
+                wf.write(struct.pack(f'<{len(ids)}H', *ids))
+
+            for tile in level.tiles[1:]:
+                wf.write(pygame.image.tobytes(tile, 'RGBA'))
+
+        os.replace(temp_path, path)
+    except BaseException:
+        os.remove(temp_path)
+        raise
+
+
+def load_compiled_level(path: str, convert: bool = True) -> LevelData | None:
+    """
+    Note: Memory maps the compiled level, layers are read straight from the mapping. Returns None if the file is from another
+    version or tile size, or any of the files it was compiled from has changed since. Raises ValueError if the file is cut short
+    or has bytes past the end of the level
+    """
+    with open(path, 'rb') as rf:
+        size = os.fstat(rf.fileno()).st_size
+        if size < HEADER.size:
+            raise ValueError(f'{path} is too short to be a compiled level')
+
+        data = mmap.mmap(rf.fileno(), 0, access=mmap.ACCESS_READ)
+
+    magic, version, meta_size = HEADER.unpack_from(data)
+    if magic != MAGIC or version != VERSION:
+        return None
+
+    offset = HEADER.size
+    meta = json.loads(data[offset:offset + meta_size])
+    offset += meta_size
+
+    if meta['tile size'] != TILE_SIZE:
+        return None
+
+    for source, mtime in meta['sources'].items():
+        if not os.path.exists(source) or os.stat(source).st_mtime_ns != mtime:
+            return None
+
+    cells = meta['width'] * meta['height']
+    tile_bytes = TILE_SIZE * TILE_SIZE * 4
+
+    expected_size = offset + len(meta['layers']) * cells * 2 + meta['tiles'] * tile_bytes
+    if size != expected_size:
+        raise ValueError(f'{path} is {size} bytes but its header describes {expected_size}')
+
+    view = memoryview(data)
+
+    layers = {}
+    for name in meta['layers']:
+        layers[name] = view[offset:offset + cells * 2].cast('H') # native byte order, which is little endian on every platform we ship
+        offset += cells * 2
+
+    tiles = [None]
+    for _ in range(meta['tiles']):
+        tiles.append(pygame.image.frombuffer(view[offset:offset + tile_bytes], (TILE_SIZE, TILE_SIZE), 'RGBA'))
+        offset += tile_bytes
+
+    objects = [tuple(obj) for obj in meta['objects']]
+
+    level = LevelData(meta['width'], meta['height'], layers, tiles, objects)
+    if convert:
+        level.convert()
+
+    return level
+
+
+def get_cache_path(tmx_path: str, cache_dir: str) -> str:
+    return os.path.join(cache_dir, os.path.splitext(os.path.basename(tmx_path))[0] + '.level')
+
+
+def read_level_data(tmx_path: str, cache_dir: str = LEVEL_CACHE_DIR) -> LevelData | None:
+    """
+    Note: The file reading half of load_level_data(), safe to call off the main thread. Returns the compiled level with its
+    tiles not converted yet (LevelData.convert() has to run on the main thread), or None when the TMX has to be compiled first:
+    there is no compiled version, it is stale, or it can't be read (e.g. a file left truncated by an older version)
+    """
+    cache_path = get_cache_path(tmx_path, cache_dir)
+
+    if not os.path.exists(cache_path):
+        return None
+
+    try:
+        return load_compiled_level(cache_path, convert=False)
+    except (OSError, ValueError, KeyError, TypeError):
+        return None
+
+
+def load_level_data(tmx_path: str, use_cache: bool = LEVEL_CACHE, cache_dir: str = LEVEL_CACHE_DIR) -> LevelData:
+    """
+    Note: Loads the compiled version of tmx_path from cache_dir, and only parses the TMX with pytmx (then recompiles it) when
+    there is no usable compiled version, or the TMX or anything it uses has been modified since it was compiled
+    """
+    if not use_cache:
+        return compile_level(tmx_path)
+
+    level = read_level_data(tmx_path, cache_dir)
+    if level is not None:
+        level.convert()
+        return level
+
+    sources = get_sources(tmx_path) # before compiling, so a file changed while it compiles makes the next load compile again
+    level = compile_level(tmx_path)
+
+    try:
+        save_level(level, get_cache_path(tmx_path, cache_dir), sources)
+    except OSError: # e.g. a read only checkout, the level is compiled again next time
+        pass
+
+    return level
@@ -0,0 +1,93 @@
+from threading import Thread
+
+from settings import *
+from .assets import assets
+from .sound import sounds, EFFECTS
+from .controls import LiveInput, ScriptedInput
+from .level import load_level_data
+
+
+class GameLoader:
+    """
+    Note: Builds a Game on a worker thread. prepare() loads the level (compiling it first if it has to), the cached atlases and the
+    sound effects, bakes the static chunks around the spawn point, then creates the Game itself, so all build() does on the main
+    thread is hand it over. With build_game=False it stops before creating the Game, which is how the next level is read ahead during
+    play (see Game.update_preload), since a Game that is being played can only be changed by the main thread
+    """
+    def __init__(self, input_source: LiveInput | ScriptedInput | None = None, level_path: str = LEVELS[0], build_game: bool = True):
+        self.input = input_source
+        self.level_path = level_path
+        self.build_game = build_game
+
+        self.prepared = {'atlases': {}}
+        self.game = None
+        self.progress = 0 # 0 to 1
+        self.error: Exception | None = None
+
+        self.thread = Thread(target=self.prepare, daemon=True)
+
+    def start(self):
+        self.thread.start()
+
+    @property
+    def ready(self) -> bool:
+        # True once the worker is done and build() won't block
+        return self.thread.ident is not None and not self.thread.is_alive()
+
+    def prepare(self):
+        from .game import Game
+
+        try:
+            specs = {family: family_specs for family, family_specs in Game.atlas_specs().items() if family not in assets.atlases}
+            steps = 2 + len(specs) + len(EFFECTS) + (1 if self.build_game else 0)
+            done = 0
+
+            self.prepared['level'] = load_level_data(self.level_path)
+            done += 1
+            self.progress = done / steps
+
+            for family, family_specs in specs.items():
+                saved = assets.read_atlas(family, family_specs)
+                if saved is not None:
+                    self.prepared['atlases'][family] = saved
+
+                done += 1
+                self.progress = done / steps
+
+            for name in EFFECTS: # music is streamed, so there is nothing to decode for it
+                sounds.get(name)
+
+                done += 1
+                self.progress = done / steps
+
+            self.prepared['chunks'] = Game.bake_spawn_chunks(self.prepared['level'])
+            done += 1
+            self.progress = done / steps
+
+            if self.build_game:
+                self.game = Game(self.input, self.prepared)
+                self.progress = 1
+
+        except Exception as error: # re-raised by build() on the main thread
+            self.error = error
+
+    def wait(self) -> dict:
+        """
+        Note: Waits for the worker if it is still running (starting it if it never was) and returns what it prepared
+        """
+        if self.thread.ident is None:
+            self.start()
+        self.thread.join()
+
+        if self.error is not None:
+            raise self.error
+
+        return self.prepared
+
+    def build(self):
+        """
+        Note: Returns the Game the worker built, waiting for it if it isn't done yet
+        """
+        self.wait()
+
+        return self.game
@@ -1,10 +1,10 @@
 import pygame
 from pygame.locals import *
-from pygame.mixer import Sound
 
 from settings import *
 from support import display_text
 from decorators import run_once
+from .sound import sounds
 
 
 class Menu:
@@ -19,43 +19,43 @@ class Menu:
         self.clicked = False
 
         self.page = 'main'
+        self.progress = 1 # how far the game has loaded, PLAY shows this until it reaches 1
 
     def import_images(self):
         self.background_image = pygame.transform.scale(pygame.image.load('./assets/background gradient.png'), (WIN_X, WIN_Y))
 
     @run_once
     def play_music(self):
-        self.music = Sound('./assets/sounds/music/space groove.mp3')
-        self.music.set_volume(0.5)
-        self.music.play(loops=-1, fade_ms=1000)
+        sounds.play_music('menu', fade_ms=1000)
 
     def import_sounds(self):
-        self.click_sound = Sound('./assets/sounds/ui/click.wav')
-        self.menu_close_sound = Sound('./assets/sounds/ui/menu close.wav')
-        self.menu_open_sound = Sound('./assets/sounds/ui/menu open.wav')
-        self.select_sound = Sound('./assets/sounds/ui/select.wav')
-
-        self.click_sound.set_volume(0.5)
-        self.select_sound.set_volume(0.5)
+        for name in ('click', 'select', 'menu open', 'menu close'):
+            sounds.get(name)
 
     def display_title(self):
         display_text(self.win, 'Dungeon Game', (WIN_X / 2, WIN_Y / 4), font_name='yoster', font_size=80)
 
+    def get_play_label(self) -> str:
+        if self.progress >= 1:
+            return 'PLAY'
+
+        return 'STARTING...' if not self.in_menu else f'LOADING {int(self.progress * 100)}%'
+
     def options(self):
         pos = pygame.mouse.get_pos()
 
-        for i, text_rect in enumerate((options:=[display_text(self.win, option, (WIN_X / 2, 350 + 90 * i), font_name='font', font_size=50) for i, option in enumerate(['PLAY', 'SHOP', 'SETTINGS'])])):
+        for i, text_rect in enumerate((options:=[display_text(self.win, option, (WIN_X / 2, 350 + 90 * i), font_name='font', font_size=50) for i, option in enumerate([self.get_play_label(), 'SHOP', 'SETTINGS'])])):
             # if above may seem perplexing, the for loop is really just displaying all the diff options available and since display_text() returns the text rect, we can use that to check for mouse collision etc.
             if text_rect.collidepoint(pos):
                 if pygame.mouse.get_pressed()[0] and not self.clicked:
-                    self.click_sound.play()
+                    sounds.play('click')
                     self.clicked = True
                 
                 if pygame.mouse.get_pressed()[0] and self.clicked:
                     match i:
                         case 0:
                             self.in_menu = False
-                            self.music.fadeout(500)
+                            sounds.fadeout_music(500)
                         case 1:
                             print('This feature is still under development!')
 
@@ -71,12 +71,13 @@ class Menu:
                 
                 if not self.hover:
                     self.hover = True
-                    self.select_sound.play()
+                    sounds.play('select')
         
         if not any([text_rect.collidepoint(pos) for text_rect in options]):
             self.hover = False
 
     def update(self):
+        sounds.advance()
         self.win.blit(self.background_image, (0, 0))
         self.display_title()
         self.options()
\ No newline at end of file
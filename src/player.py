@@ -1,27 +1,42 @@
 import pygame
 from pygame.math import Vector2
-from pygame.mixer import Sound
 
-import json
 from math import degrees, atan2
 
 from settings import *
 from support import display_text
+from .assets import assets, FrameSpec
+from .data import game_data
+from .sound import sounds
+from .rotation import RotationCache
+from .controls import LiveInput, ScriptedInput
+
+
+# Animation status -> (frame file prefix in './assets/characters/player1/', frame count)
+PLAYER_ANIMATIONS = {
+    'idle': ('idle', 2),
+    'idle-up': ('idle_up', 1),
+    'run': ('run', 4),
+    'run-finish': ('run_finish', 3),
+    'run-up': ('run_up', 3),
+    'run-up-finish': ('run_up_finish', 3)
+}
 
 
 class Player(pygame.sprite.Sprite):
     """
         Note: Parent classes of Player (groups) access delta, direction, image, and rect for external calculation and value modification
     """
-    def __init__(self, pos: tuple, groups: pygame.sprite.Group):
+    def __init__(self, pos: tuple, groups: pygame.sprite.Group, input_source: LiveInput | ScriptedInput | None = None):
         super().__init__(groups)
 
         self.win = pygame.display.get_surface()
+        self.input = input_source if input_source is not None else LiveInput()
 
         # Player setup
         self.p_scale_factor = 4
         self.p_animation_index = 0
-        self.p_animation_speed = 0.15
+        self.p_animation_speed = 0.15 * TIME_SCALE
         self.delta = Vector2()
 
         # Import player and weapon data
@@ -40,16 +55,16 @@ class Player(pygame.sprite.Sprite):
         self.disable_controls = False
         
         # Weapon stats
-        self.damage = self.weapon_data['stone']['sword']['damage']
+        self.damage = self.weapon_stats.damage
 
         # Player stats
-        self.initial_health = self.player_data['health']
-        self.health = self.player_data['health']
-        self.knockback = self.player_data['knockback']
-        self.invincibility_cooldown = self.player_data['invincibility cooldown']
+        self.initial_health = self.stats.health
+        self.health = self.stats.health
+        self.knockback = self.stats.knockback
+        self.invincibility_cooldown = self.stats.invincibility_cooldown
 
         # Player controls
-        self.vel = 6
+        self.vel = 6 * TIME_SCALE
         self.controls = {
             'a': pygame.K_a,
             'd': pygame.K_d,
@@ -78,7 +93,7 @@ class Player(pygame.sprite.Sprite):
 
         # Weapon properties
         self.weapon_image = self.weapons['sword']
-        self.particle_images = self.weapons['sword-particles']
+        self.particle_images = self.weapons['sword-particles'] # {sword_direction: [RotationCache, ...]}
 
         # Health Bar
         self.hb_scale_factor = 3
@@ -88,37 +103,38 @@ class Player(pygame.sprite.Sprite):
         self.health_bar_rect = pygame.Rect(*(self.hb_template_rect.topleft + Vector2(3, 3) * self.hb_scale_factor), self.hb_template_rect.width * 12 / 13, self.hb_template_rect.height * 5 / 8)
         self.health_rect = self.health_bar_rect.copy()
 
-        # Load Sounds
-        self.import_sounds()
+    @staticmethod
+    def frame_specs() -> dict[str, FrameSpec]:
+        scale = (4, 4.2) # same as (p_scale_factor, p_scale_factor + 0.2)
+
+        return {f'player/{status}': FrameSpec(tuple(f'./assets/characters/player1/{name}_{i}.png' for i in range(1, frame_count + 1)), scale=scale) for status, (name, frame_count) in PLAYER_ANIMATIONS.items()}
 
     def import_images(self):
-        self.p_animations = {
-            'idle': [pygame.transform.scale_by(pygame.image.load(f'./assets/characters/player1/idle_{i}.png').convert_alpha(), (self.p_scale_factor, self.p_scale_factor + 0.2)) for i in range(1, 3)],
-            'idle-up': [pygame.transform.scale_by(pygame.image.load(f'./assets/characters/player1/idle_up_{i}.png').convert_alpha(), (self.p_scale_factor, self.p_scale_factor + 0.2)) for i in range(1, 2)],
-            'run': [pygame.transform.scale_by(pygame.image.load(f'./assets/characters/player1/run_{i}.png').convert_alpha(), (self.p_scale_factor, self.p_scale_factor + 0.2)) for i in range(1, 5)],
-            'run-finish': [pygame.transform.scale_by(pygame.image.load(f'./assets/characters/player1/run_finish_{i}.png').convert_alpha(), (self.p_scale_factor, self.p_scale_factor + 0.2)) for i in range(1, 4)],
-            'run-up': [pygame.transform.scale_by(pygame.image.load(f'./assets/characters/player1/run_up_{i}.png').convert_alpha(), (self.p_scale_factor, self.p_scale_factor + 0.2))for i in range(1, 4)],
-            'run-up-finish': [pygame.transform.scale_by(pygame.image.load(f'./assets/characters/player1/run_up_finish_{i}.png').convert_alpha(), (self.p_scale_factor, self.p_scale_factor + 0.2)) for i in range(1, 4)],
-        }
+        specs = self.frame_specs()
+        self.p_animations = {status: assets.get_frames(f'player/{status}', specs[f'player/{status}']) for status in PLAYER_ANIMATIONS}
 
-        self.weapons = {
-            'sword': pygame.transform.rotate(pygame.transform.scale_by(pygame.image.load(f'./assets/weapons/stone/stone_sword_2.png').convert_alpha(), self.w_scale_factor), -45), # 45 degrees offset
-            'sword-particles': [pygame.transform.scale_by(pygame.image.load(f'./assets/weapons/sword_particles_{i}.png'), self.w_scale_factor) for i in range(1, 3)] # -90 degrees offset
-        }
+        self.weapons = self.import_weapon('stone', 'sword')
 
-    def import_sounds(self):
-        self.sword_sound = Sound('./assets/sounds/items/sword.wav')
-        self.player_roll_sound = Sound('./assets/sounds/player/player_roll.wav')
-        # self.footsteps_sound = Sound('./assets/sounds/player/footsteps.wav')
+    def import_weapon(self, material: str, weapon: str) -> dict:
+        """
+        Note: Weapon images are pre-rendered at every ROTATION_STEP degrees (particles with their masks for the hit test) and shared through the asset registry
+        """
+        key = f'weapons/{material}/{weapon}'
 
-    def import_data(self):
-        # Import weapon data
-        with open('./data/weapon_data.json') as rf:
-            self.weapon_data = json.load(rf)
+        weapon_image = assets.get_frames(key, FrameSpec((f'./assets/weapons/{material}/{material}_{weapon}_2.png',), scale=self.w_scale_factor))[0]
+        particle_images = assets.get_frames(f'{key}-particles', FrameSpec(tuple(f'./assets/weapons/{weapon}_particles_{i}.png' for i in range(1, 3)), scale=self.w_scale_factor))
 
-        # Import player data
-        with open('./data/player_data.json') as rf:
-            self.player_data = json.load(rf)      
+        return {
+            weapon: assets.get_rotations(key, pygame.transform.rotate(weapon_image, -45)), # 45 degrees offset
+            f'{weapon}-particles': { # -90 degrees offset, flipped vertically for backhand swings
+                1: [assets.get_rotations(f'{key}-particles/{i}', image, with_masks=True) for i, image in enumerate(particle_images)],
+                -1: [assets.get_rotations(f'{key}-particles/{i}/flipped', pygame.transform.flip(image, False, True), with_masks=True) for i, image in enumerate(particle_images)]
+            }
+        }
+
+    def import_data(self):
+        self.weapon_stats = game_data.get_weapon('stone', 'sword')
+        self.stats = game_data.get_player()
 
     def animate(self):
         self.p_animation_index += self.p_animation_speed * 0.1 if self.status == 'idle' and int(self.p_animation_index) == 0 else self.p_animation_speed
@@ -133,28 +149,23 @@ class Player(pygame.sprite.Sprite):
                 case 'run-up-finish':
                     self.status = 'idle-up'
         
-        image = self.p_animations[self.status][int(self.p_animation_index)]
+        key = f'player/{self.status}'
+        index = int(self.p_animation_index)
 
-        if self.facing_right:
-            self.image = image
-        else:
-            self.image = pygame.transform.flip(image, True, False)
+        # Flipped frames, masks and faded copies are all cached by the registry, the shared frames themselves are never modified
+        self.image, self.mask = assets.get_oriented_frames(key)[self.facing_right][index]
 
         if self.got_attacked:
             if int(self.invincibility_counter * 10) % 6 == 0:
-                self.image.set_alpha(80)
+                self.image = assets.get_faded_frame(key, self.facing_right, index, 80)
             else:
-                self.image.set_alpha(200)
-        else:
-            self.image.set_alpha(255)
-
-        self.mask = pygame.mask.from_surface(self.image)
+                self.image = assets.get_faded_frame(key, self.facing_right, index, 200)
 
     def user_input(self):
         if self.disable_controls:
             return
 
-        keys = pygame.key.get_pressed()
+        keys = self.input.get_keys()
 
         self.delta = Vector2()
 
@@ -210,18 +221,18 @@ class Player(pygame.sprite.Sprite):
     def draw_player(self, offset):
         self.win.blit(self.image, self.rect.topleft - offset)
 
-    def rotate_on_pivot(self, image: pygame.Surface, angle: float, origin: Vector2, radius: Vector2, angle_offset: float=0) -> tuple:
+    def rotate_on_pivot(self, rotations: RotationCache, angle: float, origin: Vector2, radius: Vector2, angle_offset: float=0) -> tuple:
         """
-        Note: angle and angle_offset are for counter-clockwise rotation
+        Note: angle and angle_offset are for counter-clockwise rotation, and angle is rounded to the nearest pre-rendered rotation
         """
-        angle += angle_offset
+        angle = rotations.quantize(angle + angle_offset)
 
-        surf = pygame.transform.rotate(image, angle) # rotates angle counter-clockwise (full 360 is just rotating 180 counter-clockwise and -180 counter-clockwise, which is just 180 clockwise)
+        surf, mask = rotations.get(angle) # rotated angle counter-clockwise (full 360 is just rotating 180 counter-clockwise and -180 counter-clockwise, which is just 180 clockwise)
 
         new_rotated_point = origin + radius.rotate(-angle) # origin point + coords of radius that intersects with the circle given an angle (think about the unit circle, except the radius may not be 1)
         rect = surf.get_rect(center = new_rotated_point) # creates the rect surface where the rotated image gets centered on new_rotated_point (a point that lies on the circle that has its origin at the origin's center)
 
-        return surf, rect
+        return surf, mask, rect
     
     def update_direction_from_delta(self, inverse_facing_right=False):
         if self.delta.x > 0:
@@ -255,32 +266,33 @@ class Player(pygame.sprite.Sprite):
         
         self.status = 'run-up' if self.facing_up else 'run'
 
-    def draw_sword(self, angle: float):
-        image = self.weapon_image
-        image, self.weapon_rect = self.rotate_on_pivot(image, angle, self.origin, Vector2(60, 0), angle_offset=90 * self.sword_direction)
-        self.win.blit(image, self.weapon_rect)
+    def rotate_sword(self, angle: float):
+        self.rotated_weapon_image, _, self.weapon_rect = self.rotate_on_pivot(self.weapon_image, angle, self.origin, Vector2(60, 0), angle_offset=90 * self.sword_direction)
 
-    def draw_sword_particles(self, angle: float):
-            particle_image = self.particle_images[round(self.w_animation_counter / self.w_animation_period)] if self.sword_direction == 1 else pygame.transform.flip(self.particle_images[round(self.w_animation_counter / self.w_animation_period)], False, True)
-            particle_image, self.particle_rect = self.rotate_on_pivot(particle_image, angle, self.origin, Vector2(45, -15 if self.sword_direction == 1 else 15))
-            self.particle_mask = pygame.mask.from_surface(particle_image)
+    def rotate_sword_particles(self, angle: float):
+            particle_rotations = self.particle_images[self.sword_direction][round(self.w_animation_counter / self.w_animation_period)]
+            self.particle_image, self.particle_mask, self.particle_rect = self.rotate_on_pivot(particle_rotations, angle, self.origin, Vector2(45, -15 if self.sword_direction == 1 else 15))
 
-            self.win.blit(particle_image, self.particle_rect)
+    def draw_sword(self):
+        # The sword is positioned in screen coordinates from where the swing started (self.origin), so it doesn't need the camera offset
+        if self.triggered:
+            self.win.blit(self.rotated_weapon_image, self.weapon_rect)
+            self.win.blit(self.particle_image, self.particle_rect)
 
     def add_recoil(self):
         self.delta = self.origin.move_towards(self.pos, self.vel * 3 / 4) - self.origin
 
     def sword_mechanics(self, offset):
         if self.w_delay_counter >= self.w_delay:
-            if pygame.mouse.get_pressed()[0] and not self.triggered and not self.clicked: # Initialisation for self.triggered
+            if self.input.get_mouse_pressed() and not self.triggered and not self.clicked: # Initialisation for self.triggered
                     self.clicked = True
                     self.triggered = True
                     self.disable_controls = True
                     self.origin = Vector2(self.rect.center - offset)
-                    self.pos = Vector2(pygame.mouse.get_pos())
-                    self.sword_sound.play()
+                    self.pos = Vector2(self.input.get_mouse_pos())
+                    sounds.play('sword')
             
-            if not pygame.mouse.get_pressed()[0]:
+            if not self.input.get_mouse_pressed():
                 self.clicked = False
             
             if self.triggered:
@@ -292,18 +304,18 @@ class Player(pygame.sprite.Sprite):
                     self.sword_direction *= -1
                     return
                 
-                self.w_animation_counter += 0.1
+                self.w_animation_counter += 0.1 * TIME_SCALE
 
                 mouse_offset = self.pos - self.origin # essentially creates a cartesian plane where the origin is at the center of the player (except y value is reversed)
                 angle = -degrees(atan2(mouse_offset.y, mouse_offset.x)) # since the value of y is reversed, the output will always be reversed, that's why there is a negative sign in front
 
-                self.draw_sword(angle)
-                self.draw_sword_particles(angle)
+                self.rotate_sword(angle)
+                self.rotate_sword_particles(angle)
                 self.update_player_direction_and_animation_status()
                 self.add_recoil()
 
         else:
-            self.w_delay_counter += 0.1
+            self.w_delay_counter += 0.1 * TIME_SCALE
 
     def update_health_bar(self):
         self.health_rect = self.health_bar_rect.copy()
@@ -331,13 +343,16 @@ class Player(pygame.sprite.Sprite):
             else:
                 if self.invincibility_counter <= self.invincibility_cooldown / 4:
                     camera_sprites.shake_camera(x_intensity=15, y_intensity=4) 
-                self.invincibility_counter += 0.1
+                self.invincibility_counter += 0.1 * TIME_SCALE
 
     def update(self, camera_sprites: pygame.sprite.Group):
         self.sword_mechanics(camera_sprites.offset) # self.sword_mechanics() should be ran before self.user_input() so that self.direction and self.delta values are more accurate (a change of values by one tick/frame could cause some issues/bugs with collision detection)
         self.user_input()
         self.invincibility(camera_sprites)
         self.animate()
-        self.draw_player(camera_sprites.offset)
+
+    def draw(self, offset: Vector2):
+        self.draw_sword()
+        self.draw_player(offset)
         self.update_health_bar()
         
\ No newline at end of file
@@ -0,0 +1,39 @@
+from pygame.sprite import Sprite, Group
+
+from settings import *
+from .tile import Coin
+
+
+class SpritePool:
+    """
+    Note: Keeps killed sprites of one class and hands them out again instead of building new ones. A pooled class gives itself
+    back with release() from kill() and implements reset(pos, *args), which has to undo everything its life could have changed
+    """
+    def __init__(self, sprite_class: type, limit: int = POOL_LIMIT):
+        self.sprite_class = sprite_class
+        self.limit = limit
+
+        self.free: list[Sprite] = []
+
+        self.created = 0
+        self.reused = 0
+
+    def get(self, pos, groups: list[Group], *args) -> Sprite:
+        if self.free:
+            sprite = self.free.pop()
+            sprite.reset(pos, *args)
+            sprite.add(*groups)
+            self.reused += 1
+        else:
+            sprite = self.sprite_class(pos, groups, *args)
+            sprite.pool = self
+            self.created += 1
+
+        return sprite
+
+    def release(self, sprite: Sprite):
+        if len(self.free) < self.limit:
+            self.free.append(sprite)
+
+
+coin_pool = SpritePool(Coin) # coins dropped by enemies, the level's own coins aren't pooled (see ChunkStreamer.unload_chunk)
@@ -0,0 +1,134 @@
+import pygame
+
+import json
+from collections import deque
+from time import perf_counter
+
+from settings import *
+from support import display_text
+
+
+class Profiler:
+    """
+    Note: Times every stage in game.step_stages and game.draw_stages while enabled, by swapping them for timed wrappers. When
+    disabled the original stages are put back, so the only cost left is the enabled check in begin_frame() and end_frame()
+    """
+    def __init__(self, game, window: int = PROFILER_WINDOW):
+        self.win = pygame.display.get_surface()
+        self.game = game
+        self.window = window
+        self.enabled = False
+
+        self.stage_names = [name for name, _ in game.step_stages + game.draw_stages]
+        self.frame_times: deque[float] = deque(maxlen=window)
+        self.stage_times: dict[str, deque[float]] = {name: deque(maxlen=window) for name in self.stage_names}
+        self.frame_stage_times = dict.fromkeys(self.stage_names, 0) # totals for the frame in progress, a frame can run several ticks
+        self.frames: deque[list[tuple]] = deque(maxlen=window) # (name, start, duration) events of each frame, for export_trace()
+        self.events: list[tuple] = []
+        self.frame_start = 0
+
+        # The overlay's numbers are only re-rendered every few frames, otherwise they'd change too fast to read
+        self.overlay_interval = 15
+        self.overlay_counter = 0
+        self.overlay_means = dict.fromkeys(self.stage_names, 0)
+        self.overlay_tiers = dict(game.enemy_sprites.tier_counts)
+
+        self.panel = pygame.Surface((320, 138 + 18 * len(self.stage_names)))
+        self.panel.set_alpha(200)
+        self.graph_height = 80
+
+    def toggle(self):
+        self.enabled = not self.enabled
+
+        if self.enabled:
+            self.stages = (self.game.step_stages, self.game.draw_stages)
+            self.game.step_stages = [(name, self.timed(name, stage)) for name, stage in self.game.step_stages]
+            self.game.draw_stages = [(name, self.timed(name, stage)) for name, stage in self.game.draw_stages]
+        else:
+            self.game.step_stages, self.game.draw_stages = self.stages
+
+    def timed(self, name: str, stage):
+        def run():
+            start = perf_counter()
+            stage()
+            duration = perf_counter() - start
+
+            self.frame_stage_times[name] += duration
+            self.events.append((name, start, duration))
+        return run
+
+    def begin_frame(self):
+        if not self.enabled:
+            return
+
+        self.frame_start = perf_counter()
+        self.events = []
+        self.frame_stage_times = dict.fromkeys(self.stage_names, 0)
+
+    def end_frame(self):
+        if not self.enabled:
+            return
+
+        duration = perf_counter() - self.frame_start
+
+        self.frame_times.append(duration)
+        for name, total in self.frame_stage_times.items():
+            self.stage_times[name].append(total)
+        self.frames.append([('frame', self.frame_start, duration)] + self.events)
+
+    def get_means(self) -> dict[str, float]:
+        # Mean time per frame of every stage over the window, in seconds
+        return {name: sum(times) / len(times) if times else 0 for name, times in self.stage_times.items()}
+
+    def draw(self):
+        if not self.enabled:
+            return
+
+        self.overlay_counter += 1
+        if self.overlay_counter >= self.overlay_interval:
+            self.overlay_counter = 0
+            self.overlay_means = self.get_means()
+            self.overlay_tiers = dict(self.game.enemy_sprites.tier_counts)
+
+        panel = self.panel
+        panel.fill('black')
+        width = panel.get_width()
+
+        # Frame time graph, one column per frame, with a line at the frame budget
+        budget = 1 / FPS if FPS else TICK
+        scale = self.graph_height / (budget * 2)
+        bar_width = width / self.window
+
+        for i, frame_time in enumerate(self.frame_times):
+            height = min(self.graph_height, frame_time * scale)
+            colour = COLOURS['green'] if frame_time <= budget else COLOURS['orange'] if frame_time <= budget * 2 else COLOURS['red']
+            pygame.draw.rect(panel, colour, (i * bar_width, 10 + self.graph_height - height, max(1, bar_width), height))
+
+        pygame.draw.line(panel, 'white', (0, 10 + self.graph_height / 2), (width, 10 + self.graph_height / 2))
+
+        # Per stage bars, scaled to the frame budget
+        for i, name in enumerate(self.stage_names):
+            y = 110 + i * 18
+            mean_time = self.overlay_means[name]
+            pygame.draw.rect(panel, COLOURS['orange'], (110, y + 4, min(140, mean_time / budget * 140), 10))
+            display_text(panel, name, (6, y), font_size=14, position='topleft')
+            display_text(panel, f'{mean_time * 1000:.2f}', (256, y), font_size=14, position='topleft')
+
+        # Enemies the AI updated (or checked, for sleeping ones) on the last tick in the active, reduced and sleeping tiers
+        y = 110 + len(self.stage_names) * 18
+        display_text(panel, 'ai tiers', (6, y), font_size=14, position='topleft')
+        display_text(panel, '   '.join(f'{tier[0]} {count}' for tier, count in self.overlay_tiers.items()), (110, y), font_size=14, position='topleft')
+
+        self.win.blit(panel, (WIN_X - width - 10, 10))
+
+    def export_trace(self, path: str = PROFILER_TRACE_PATH):
+        """
+        Note: Writes the frames in the window as complete ("X") events in the Chrome trace event format, in microseconds
+        """
+        events = []
+        for frame in self.frames:
+            for name, start, duration in frame:
+                events.append({'name': name, 'ph': 'X', 'ts': round(start * 1e6, 1), 'dur': round(duration * 1e6, 1), 'pid': 1, 'tid': 1})
+
+        with open(path, 'w') as wf:
+            json.dump({'traceEvents': events, 'displayTimeUnit': 'ms'}, wf)
@@ -0,0 +1,193 @@
+"""
+Records the input of every simulation tick plus the RNG seed to a small file, and plays it back headless at uncapped speed.
+The simulation runs on a fixed timestep and all randomness comes from support.rng, so a replay goes through exactly the same
+ticks as the recording did, and the state hash at the end must match the one that was saved
+
+Record: python main.py --record run.replay
+Replay: python -m src.replay run.replay [--trace trace.csv]
+Check:  python -m src.replay --check run.replay (records a scripted fight to run.replay, drawing like the live game, then replays it)
+"""
+import pygame
+
+import argparse
+import os
+import struct
+import zlib
+from statistics import mean
+from time import perf_counter
+from typing import NamedTuple
+
+from settings import *
+from support import rng
+from .controls import InputFrame, PressedKeys, LiveInput, ScriptedInput
+
+
+RECORDED_KEYS = (pygame.K_a, pygame.K_d, pygame.K_s, pygame.K_w) # the only keys the game reads, stored as a bitmask
+MAGIC = b'DGRP'
+VERSION = 2 # bumped whenever the simulation changes, older replays would end in a different state
+HEADER = struct.Struct('<4sBBIQI8s') # magic, version, tick rate, seed, ticks, compressed size, state hash
+FRAME = struct.Struct('<BBhh') # key bitmask, mouse pressed, mouse x, mouse y
+
+
+class Replay(NamedTuple):
+    seed: int
+    frames: list[InputFrame]
+    state_hash: str
+
+
+class RecordingInput:
+    """
+    Note: Wraps another input source and keeps a copy of the input of every tick. Seeds support.rng on creation, so it has to be
+    made before the game's first tick
+    """
+    def __init__(self, source: LiveInput | ScriptedInput | None = None, seed: int | None = None):
+        self.source = source if source is not None else LiveInput()
+        self.seed = seed if seed is not None else int.from_bytes(os.urandom(4), 'little')
+        self.frames: list[InputFrame] = []
+        self.frame = InputFrame()
+
+        rng.seed(self.seed)
+
+    def tick(self):
+        self.source.tick()
+
+        keys = self.source.get_keys()
+        self.frame = InputFrame(frozenset(key for key in RECORDED_KEYS if keys[key]), self.source.get_mouse_pressed(), tuple(self.source.get_mouse_pos()))
+        self.frames.append(self.frame)
+
+    def get_keys(self) -> PressedKeys:
+        return PressedKeys(self.frame.keys)
+
+    def get_mouse_pressed(self) -> bool:
+        return self.frame.mouse_pressed
+
+    def get_mouse_pos(self) -> tuple[int, int]:
+        return self.frame.mouse_pos
+
+    def save(self, path: str, state_hash: str):
+        save_replay(path, Replay(self.seed, self.frames, state_hash))
+
+
+def save_replay(path: str, replay: Replay):
+    body = bytearray()
+
+    for frame in replay.frames:
+        mask = sum(1 << i for i, key in enumerate(RECORDED_KEYS) if key in frame.keys)
+        body += FRAME.pack(mask, frame.mouse_pressed, *frame.mouse_pos)
+
+    body = zlib.compress(bytes(body), 9)
+
+    with open(path, 'wb') as wf:
+        wf.write(HEADER.pack(MAGIC, VERSION, TICK_RATE, replay.seed, len(replay.frames), len(body), bytes.fromhex(replay.state_hash)))
+        wf.write(body)
+
+
+def load_replay(path: str) -> Replay:
+    with open(path, 'rb') as rf:
+        try:
+            magic, version, tick_rate, seed, ticks, size, state_hash = HEADER.unpack(rf.read(HEADER.size))
+        except struct.error:
+            raise ValueError(f'\'{path}\' is truncated (no complete header)') from None
+
+        if magic != MAGIC or version != VERSION:
+            raise ValueError(f'\'{path}\' is not a version {VERSION} replay')
+
+        if tick_rate != TICK_RATE:
+            raise ValueError(f'\'{path}\' was recorded at {tick_rate} ticks/s but the game runs at {TICK_RATE}')
+
+        try:
+            body = zlib.decompress(rf.read(size))
+        except zlib.error:
+            raise ValueError(f'\'{path}\' is truncated or corrupt') from None
+
+    frames = []
+    for mask, mouse_pressed, x, y in FRAME.iter_unpack(body):
+        keys = frozenset(key for i, key in enumerate(RECORDED_KEYS) if mask & 1 << i)
+        frames.append(InputFrame(keys, bool(mouse_pressed), (x, y)))
+
+    if len(frames) != ticks:
+        raise ValueError(f'\'{path}\' is truncated ({len(frames)} of {ticks} ticks)')
+
+    return Replay(seed, frames, state_hash.hex())
+
+
+def record(frames: list[InputFrame], path: str, seed: int = 0) -> str:
+    """
+    Note: Plays frames through a RecordingInput the way the live game does, drawing between ticks, except that every third tick
+    isn't drawn and every fifth is drawn twice (as when the frame rate drops or runs ahead of the tick rate). Saves the recording
+    to path and returns the state hash it ended on
+    """
+    from .game import Game
+
+    win = pygame.display.get_surface()
+    recording = RecordingInput(ScriptedInput(frames), seed)
+    game = Game(recording)
+
+    for tick in range(len(frames)):
+        game.step()
+
+        for _ in range((tick % 3 != 0) + (tick % 5 == 0)):
+            win.fill(COLOURS['background'])
+            game.draw()
+
+        if game.game_over or game.victory:
+            break
+
+    state_hash = game.state_hash()
+    recording.save(path, state_hash)
+
+    return state_hash
+
+
+def play(replay: Replay) -> tuple[list[float], str]:
+    """
+    Note: Replays every recorded tick as fast as possible and returns the time each tick took (in seconds) and the final state hash
+    """
+    from .game import Game
+
+    rng.seed(replay.seed)
+    game = Game(ScriptedInput(replay.frames))
+
+    times = []
+    for _ in replay.frames:
+        start = perf_counter()
+        game.step()
+        times.append(perf_counter() - start)
+
+    return times, game.state_hash()
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Replay a recorded run headless and check it ends in the recorded state')
+    parser.add_argument('path')
+    parser.add_argument('--trace', help='write the time of every tick to this CSV file')
+    parser.add_argument('--check', action='store_true', help='first record the headless fight script (which meets enemies) to path, then replay it')
+    args = parser.parse_args()
+
+    from .headless import init_headless, fight_script
+    init_headless()
+
+    if args.check:
+        print(f'Recorded {record(fight_script(), args.path)} to \'{args.path}\'')
+
+    replay = load_replay(args.path)
+    times, state_hash = play(replay)
+
+    if args.trace:
+        with open(args.trace, 'w') as wf:
+            wf.write('tick,ms\n')
+            wf.writelines(f'{tick},{time * 1000:.4f}\n' for tick, time in enumerate(times))
+
+    if times:
+        slowest = max(range(len(times)), key=times.__getitem__)
+        print(f'{len(times)} ticks in {sum(times):.2f}s, mean {mean(times) * 1000:.3f}ms, slowest tick {slowest} ({times[slowest] * 1000:.3f}ms)')
+
+    if state_hash != replay.state_hash:
+        print(f'State hash mismatch: recorded {replay.state_hash}, replayed {state_hash}')
+        raise SystemExit(1)
+
+    print(f'State hash {state_hash} matches the recording')
+
+
+if __name__ == '__main__':
+    main()
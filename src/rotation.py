@@ -0,0 +1,37 @@
+import pygame
+
+from settings import *
+
+
+class RotationCache:
+    """
+    Note: Renders an image (and optionally its mask) at multiples of step degrees, all of them up front with render_all() or each
+    one the first time it is asked for, and then keeps them, so rotating it during play is a lookup. Angles are counter-clockwise
+    like pygame.transform.rotate and get rounded to the nearest step
+    """
+    def __init__(self, image: pygame.Surface, step: float = ROTATION_STEP, with_masks: bool = False):
+        self.image = image
+        self.step = step
+        self.count = round(360 / step)
+        self.with_masks = with_masks
+
+        self.images: list[pygame.Surface | None] = [None] * self.count
+        self.masks: list[pygame.mask.Mask | None] = [None] * self.count
+
+    def render_all(self):
+        for i in range(self.count):
+            self.get(i * self.step)
+
+    def quantize(self, angle: float) -> float:
+        return round(angle / self.step) % self.count * self.step
+
+    def get(self, angle: float) -> tuple[pygame.Surface, pygame.mask.Mask | None]:
+        i = round(angle / self.step) % self.count
+
+        if self.images[i] is None:
+            self.images[i] = pygame.transform.rotate(self.image, i * self.step)
+
+            if self.with_masks:
+                self.masks[i] = pygame.mask.from_surface(self.images[i])
+
+        return self.images[i], self.masks[i]
@@ -0,0 +1,132 @@
+import pygame
+from pygame.mixer import Sound, Channel
+
+import os
+import warnings
+from threading import Lock
+
+from settings import *
+
+
+# Effect name -> (path, volume), decoded into a Sound once and shared by everything that plays it
+EFFECTS = {
+    'coin': ('./assets/sounds/items/coin-edit.wav', 1),
+    'sword': ('./assets/sounds/items/sword.wav', 1),
+    'player roll': ('./assets/sounds/player/player_roll.wav', 1),
+    'player hurt': ('./assets/sounds/player/player_hurt.wav', 1),
+    'player hurt final': ('./assets/sounds/player/player_hurt_final.mp3', 1),
+    'enemy hurt': ('./assets/sounds/enemies/enemy_hurt.wav', 1),
+    'enemy die': ('./assets/sounds/enemies/enemy_die.wav', 1),
+    'enemy leap': ('./assets/sounds/enemies/enemy_leap.mp3', 1),
+    'click': ('./assets/sounds/ui/click.wav', 0.5),
+    'select': ('./assets/sounds/ui/select.wav', 0.5),
+    'menu open': ('./assets/sounds/ui/menu open.wav', 1),
+    'menu close': ('./assets/sounds/ui/menu close.wav', 1)
+}
+
+# Music name -> (path, volume), streamed from disk by pygame.mixer.music instead of being decoded into memory. Tracks missing from
+# the checkout (the game and victory music aren't distributed with the repository) are skipped with a warning
+MUSIC = {
+    'menu': ('./assets/sounds/music/space groove.mp3', 0.5),
+    'game': ('./assets/sounds/music/otherworld.mp3', 0.8),
+    'victory': ('./assets/sounds/music/bit win.mp3', 0.5),
+    'death': ('./assets/sounds/music/death_music.mp3', 1)
+}
+
+
+class SoundBank:
+    """
+    Note: Effects play on pooled mixer channels, at most SOUND_VOICES at once per effect (the oldest voice restarts past that),
+    and plays of the same effect within SOUND_MERGE_TICKS ticks of each other are merged into one, so a sword hitting a whole group
+    of enemies in one tick plays the hurt sound once instead of stacking it up. Ticks are counted by advance(), so merging follows
+    the simulation rather than the wall clock and a replay merges the same plays as its recording
+    """
+    def __init__(self):
+        self.effects: dict[str, Sound] = {}
+        self.voices: dict[str, list[Channel]] = {} # channels each effect was last started on, oldest first
+        self.lock = Lock() # GameLoader decodes the effects on its worker thread while the menu plays them on the main thread
+        self.last_played: dict[str, int] = {} # tick each effect last started on
+        self.tick = 0
+
+        self.fading = False
+        self.pending_music: tuple[str, int, int] | None = None
+
+        self.plays = 0
+        self.merged = 0
+
+    def get(self, name: str) -> Sound:
+        with self.lock:
+            if name not in self.effects:
+                if not self.effects: # first effect, so the mixer is up by now
+                    pygame.mixer.set_num_channels(SOUND_CHANNELS)
+
+                path, volume = EFFECTS[name]
+                sound = Sound(path)
+                sound.set_volume(volume)
+                self.effects[name] = sound
+
+            return self.effects[name]
+
+    def advance(self):
+        # Called once a simulation tick, and once a frame by the menu, which has no ticks
+        self.tick += 1
+
+    def play(self, name: str):
+        if name in self.last_played and self.tick - self.last_played[name] < SOUND_MERGE_TICKS:
+            self.merged += 1
+            return
+
+        self.last_played[name] = self.tick
+        sound = self.get(name)
+
+        voices = [channel for channel in self.voices.get(name, ()) if channel.get_sound() is sound] # drop the finished ones
+
+        if len(voices) >= SOUND_VOICES:
+            channel = voices.pop(0)
+        else:
+            channel = pygame.mixer.find_channel(True) # takes the longest playing channel when all of them are busy
+
+        channel.play(sound)
+        voices.append(channel)
+        self.voices[name] = voices
+        self.plays += 1
+
+    def play_music(self, name: str, loops: int = -1, fade_ms: int = 0):
+        """
+        Note: Replaces whatever music is playing (with silence if the track is missing). Loading new music while the old one fades
+        out blocks until the fade is over, so if it is, the new music is held back until update() sees the fade has finished
+        """
+        if self.fading and pygame.mixer.music.get_busy():
+            self.pending_music = (name, loops, fade_ms)
+            return
+
+        path, volume = MUSIC[name]
+
+        if os.path.exists(path):
+            pygame.mixer.music.load(path)
+            pygame.mixer.music.set_volume(volume)
+            pygame.mixer.music.play(loops, fade_ms=fade_ms)
+        else:
+            warnings.warn(f'Music \'{name}\' is missing ({path}), playing none instead')
+            pygame.mixer.music.stop()
+
+        self.fading = False
+        self.pending_music = None
+
+    def fadeout_music(self, fade_ms: int):
+        pygame.mixer.music.fadeout(fade_ms)
+        self.fading = True
+
+    def update(self):
+        # Called once a frame
+        if self.pending_music is not None and not pygame.mixer.music.get_busy():
+            self.play_music(*self.pending_music)
+
+    def get_decoded_bytes(self) -> int:
+        # Memory taken by the decoded effects, music is streamed so it takes none
+        frequency, size, channels = pygame.mixer.get_init()
+
+        return int(sum(sound.get_length() * frequency for sound in self.effects.values()) * abs(size) // 8 * channels)
+
+
+sounds = SoundBank()
@@ -0,0 +1,84 @@
+import pygame
+from pygame.sprite import Sprite
+
+from collections import defaultdict
+
+from settings import *
+
+
+class SpatialHash:
+    """
+    Note: Buckets sprites into square cells by their rect so that queries only look at the cells a rect overlaps.
+    Buckets are dicts rather than sets so that query order (and so collision resolution) is the same on every run.
+    Groups add sprites before their rect exists (Sprite.__init__ joins its groups first), so those are added with add_pending()
+    and only indexed on the next flush() or query()
+    """
+    def __init__(self, cell_size: int = TILE_SIZE):
+        self.cell_size = cell_size
+
+        self.cells: defaultdict[tuple[int, int], dict] = defaultdict(dict)
+        self.sprite_cells: dict[Sprite, tuple] = {}
+        self.pending: dict[Sprite, None] = {}
+
+    def __len__(self) -> int:
+        return len(self.sprite_cells)
+
+    def __contains__(self, sprite: Sprite) -> bool:
+        return sprite in self.sprite_cells
+
+    def get_cells(self, rect: pygame.Rect) -> tuple:
+        left = rect.left // self.cell_size
+        top = rect.top // self.cell_size
+        right = max(rect.right - 1, rect.left) // self.cell_size # right and bottom edges are exclusive, so a 64 wide rect at x=0 only covers cell 0
+        bottom = max(rect.bottom - 1, rect.top) // self.cell_size
+
+        return tuple((x, y) for x in range(left, right + 1) for y in range(top, bottom + 1))
+
+    def insert(self, sprite: Sprite):
+        cells = self.get_cells(sprite.rect)
+        self.sprite_cells[sprite] = cells
+
+        for cell in cells:
+            self.cells[cell][sprite] = None
+
+    def add_pending(self, sprite: Sprite):
+        self.pending[sprite] = None
+
+    def flush(self):
+        for sprite in self.pending:
+            self.insert(sprite)
+        self.pending.clear()
+
+    def remove(self, sprite: Sprite):
+        self.pending.pop(sprite, None)
+
+        for cell in self.sprite_cells.pop(sprite, ()):
+            bucket = self.cells[cell]
+            bucket.pop(sprite, None)
+
+            if not bucket:
+                del self.cells[cell]
+
+    def move(self, sprite: Sprite):
+        # Sprites that were never inserted are ignored rather than added, pending ones are indexed where they are once flushed
+        if sprite in self.sprite_cells and self.sprite_cells[sprite] != self.get_cells(sprite.rect):
+            self.remove(sprite)
+            self.insert(sprite)
+
+    def clear(self):
+        self.cells.clear()
+        self.sprite_cells.clear()
+        self.pending.clear()
+
+    def query(self, rect: pygame.Rect) -> list:
+        if self.pending:
+            self.flush()
+
+        found = {}
+        cells = self.cells
+
+        for cell in self.get_cells(rect):
+            if cell in cells:
+                found.update(cells[cell])
+
+        return list(found)
@@ -0,0 +1,251 @@
+from pygame.math import Vector2
+from pygame.sprite import Sprite
+
+from collections import deque
+from itertools import chain, repeat
+from operator import attrgetter
+
+from settings import *
+
+try:
+    import numpy as np
+except ImportError: # optional, without it EnemyGroup thinks for every enemy one at a time
+    np = None
+
+
+class SteeringBatch:
+    """
+    Note: Thinks for the enemies EnemyGroup schedules for a frame in one vectorised pass: distances to the player, AI tiers, and
+    Enemy.think itself (pursuing, the attack cooldown, the leap and the stun timer) with the same arithmetic, so the results match
+    it exactly. Per enemy stats and AI state live in columns indexed by each enemy's steer_index and are kept between frames, and
+    only the sprites whose state changed get it written back. Anything else that changes an enemy's AI state has to stale() it
+    """
+    stats = {'vel': 'vel', 'attack_radius': 'stats.attack_radius', 'pursue_radius': 'stats.pursue_radius', 'attack_cooldown': 'attack_cooldown',
+             'leap_distance': 'stats.leap_distance', 'leap_speed': 'leap_speed', 'stunned_delay': 'stunned_delay'} # column: where Enemy.think reads it
+    flags = ('attack_state', 'triggered', 'disable_pursue', 'facing_right')
+    timers = ('stunned_counter', 'attack_cooldown_counter')
+    vectors = ('delta', 'direction', 'player_delta', 'total_attack_delta', 'last_player_coords', 'last_enemy_coords')
+    state = flags + timers + vectors
+
+    def __init__(self, capacity: int = 256):
+        self.columns: dict[str, np.ndarray] = {}
+
+        for name in (*self.stats, *self.timers):
+            self.columns[name] = np.zeros(capacity)
+        for name in self.flags:
+            self.columns[name] = np.zeros(capacity, dtype=bool)
+        for name in self.vectors + ('center',): # center is refreshed from the rects every frame, since collision moves them
+            self.columns[name] = np.zeros((capacity, 2))
+        self.columns['sprite'] = np.empty(capacity, dtype=object)
+
+        self.free_indices: list[int] = []
+        self.size = 0
+        self.stale_sprites: dict[Sprite, None] = {} # read again before the next pass
+
+    def add(self, sprites: list[Sprite]):
+        for sprite in sprites:
+            if self.free_indices:
+                index = self.free_indices.pop()
+            else:
+                index = self.size
+                self.size += 1
+
+                if index == len(self.columns['vel']):
+                    for name, column in self.columns.items():
+                        grown = np.zeros((len(column) * 2,) + column.shape[1:], dtype=column.dtype)
+                        grown[:len(column)] = column
+                        self.columns[name] = grown
+
+            sprite.steer_index = index
+            self.columns['sprite'][index] = sprite
+
+        self.load(sprites)
+
+    def remove(self, sprite: Sprite):
+        self.stale_sprites.pop(sprite, None)
+
+        if getattr(sprite, 'steer_index', None) is not None:
+            self.columns['sprite'][sprite.steer_index] = None
+            self.free_indices.append(sprite.steer_index)
+            sprite.steer_index = None
+
+    def stale(self, sprite: Sprite):
+        self.stale_sprites[sprite] = None
+
+    def load(self, sprites: list[Sprite]):
+        # Copies everything Enemy.think uses from the sprites into their rows
+        count = len(sprites)
+        indices = np.fromiter(map(attrgetter('steer_index'), sprites), dtype=np.intp, count=count)
+
+        for name, attribute in chain(self.stats.items(), zip(self.state, self.state)):
+            column = self.columns[name]
+
+            if column.ndim == 2:
+                column[indices] = np.fromiter(chain.from_iterable(map(attrgetter(attribute), sprites)), dtype=float, count=count * 2).reshape(count, 2)
+            else:
+                column[indices] = np.fromiter(map(attrgetter(attribute), sprites), dtype=column.dtype, count=count)
+
+    @staticmethod
+    def move_towards(x: np.ndarray, y: np.ndarray, target_x: np.ndarray, target_y: np.ndarray, distance: np.ndarray | float) -> tuple[np.ndarray, np.ndarray]:
+        # Vector2((x, y)).move_towards((target_x, target_y), distance) - Vector2((x, y)), for every row at once
+        dx = target_x - x
+        dy = target_y - y
+        magnitude = np.sqrt(dx * dx + dy * dy)
+
+        with np.errstate(divide='ignore', invalid='ignore'):
+            scale = distance / magnitude
+
+        arrived = magnitude <= distance
+        return np.where(arrived, dx, (x + dx * scale) - x), np.where(arrived, dy, (y + dy * scale) - y)
+
+    @staticmethod
+    def get_new_vectors(x1: np.ndarray, y1: np.ndarray, x2: np.ndarray, y2: np.ndarray, d: np.ndarray) -> tuple[np.ndarray, np.ndarray, np.ndarray]:
+        """
+        Note: Enemy.get_new_vector for every row at once, operation for operation. The last array is False for the rows it raises
+        a ValueError for (the player on the enemy's center, or a negative square root)
+        """
+        with np.errstate(divide='ignore', invalid='ignore'):
+            m = (y2 - y1) / (x2 - x1)
+            c = y1 - (m * x1)
+            root = 2 * c * (y1 - x1 * m) - (y1 - x1 * m) ** 2 - c ** 2 + d ** 2 * (m ** 2 + 1) + x1 - c * m + y1 * m
+            x3 = (-np.sqrt(root)) / m ** 2 + 1
+            y3 = m * x3 + c
+
+        vertical = x2 - x1 == 0
+        horizontal = ~vertical & (y2 - y1 == 0)
+
+        x3 = np.where(vertical, x1, np.where(horizontal, np.where(x2 - x1 > 0, x1 + d, x1 - d), x3))
+        y3 = np.where(vertical, np.where(y2 - y1 > 0, y1 + d, y1 - d), np.where(horizontal, y1, y3))
+        valid = np.where(vertical | horizontal, (x2 - x1 != 0) | (y2 - y1 != 0), root >= 0)
+
+        return x3, y3, valid
+
+    def steer(self, sprites: list[Sprite], tier: str, player: Sprite) -> tuple[list[tuple[Sprite, str]], list[Sprite]]:
+        """
+        Note: sprites are the enemies of tier that are due. Returns the ones that move to another tier with their new tier, and the
+        ones that still need Enemy.think, which are only those whose leap get_new_vectors() can't work out. Every other sprite has
+        been thought for (or stopped, when sleeping) already
+        """
+        if self.stale_sprites:
+            self.load(list(self.stale_sprites))
+            self.stale_sprites.clear()
+
+        columns = self.columns
+        count = len(sprites)
+        indices = np.fromiter(map(attrgetter('steer_index'), sprites), dtype=np.intp, count=count)
+
+        columns['center'][indices] = np.fromiter(chain.from_iterable(map(attrgetter('rect.center'), sprites)), dtype=float, count=count * 2).reshape(count, 2)
+        x, y = columns['center'][indices].T
+
+        old = {name: columns[name][indices] for name in self.state}
+        new = {name: value.copy() for name, value in old.items()}
+        attack_state, triggered, disable_pursue, facing_right = (new[name] for name in self.flags)
+        stunned_counter, attack_cooldown_counter = (new[name] for name in self.timers)
+        delta, direction, player_delta, total_attack_delta, last_player_coords, last_enemy_coords = (new[name] for name in self.vectors)
+
+        player_x, player_y = player.rect.center
+        dx = player_x - x
+        dy = player_y - y
+        distance = np.sqrt(dx * dx + dy * dy)
+
+        # EnemyGroup.classify
+        pursue_radius = columns['pursue_radius'][indices]
+        active = attack_state | triggered | disable_pursue | (distance <= pursue_radius)
+        sleeping = ~active & (distance > pursue_radius + AI_WAKE_MARGIN)
+        awake = ~sleeping
+
+        delta[sleeping] = 0 # a sleeping enemy is out of pursue range, so it would have stopped anyway
+
+        # Enemy.persue_player
+        pursuing = awake & ~disable_pursue & ~triggered
+        reached = pursuing & (distance <= columns['attack_radius'][indices])
+        chasing = pursuing & ~reached & (distance <= pursue_radius)
+
+        attack_state |= reached
+        last_player_coords[reached] = player_x, player_y
+        last_enemy_coords[reached, 0] = x[reached]
+        last_enemy_coords[reached, 1] = y[reached]
+
+        chase_x, chase_y = self.move_towards(x, y, player_x, player_y, columns['vel'][indices])
+        delta[chasing, 0] = chase_x[chasing]
+        delta[chasing, 1] = chase_y[chasing]
+        delta[pursuing & ~reached & ~chasing] = 0
+
+        # Enemy.attack_player
+        attacking = awake & attack_state
+        ready = attacking & (attack_cooldown_counter >= columns['attack_cooldown'][indices])
+        triggered |= ready
+        attack_cooldown_counter[attacking & ~ready] += 0.1 * TIME_SCALE
+
+        leaping = attacking & triggered
+        leap_distance = columns['leap_distance'][indices]
+        landed = leaping & (np.sqrt(total_attack_delta[:, 0] * total_attack_delta[:, 0] + total_attack_delta[:, 1] * total_attack_delta[:, 1]) >= leap_distance)
+
+        attack_state[landed] = False
+        triggered[landed] = False
+        total_attack_delta[landed] = 0
+        attack_cooldown_counter[landed] = 0
+
+        rows = np.flatnonzero(leaping & ~landed)
+        failed = np.zeros(count, dtype=bool)
+
+        if len(rows):
+            x1, y1 = last_enemy_coords[rows].T
+            x2, y2 = last_player_coords[rows].T
+            x3, y3, valid = self.get_new_vectors(x1, y1, x2, y2, leap_distance[rows])
+
+            failed[rows[~valid]] = True
+            rows, x1, y1, x2, x3, y3 = rows[valid], x1[valid], y1[valid], x2[valid], x3[valid], y3[valid]
+
+            leap = np.column_stack(self.move_towards(x1, y1, x3, y3, columns['leap_speed'][indices[rows]] * TIME_SCALE))
+            knockback = np.column_stack(self.move_towards(x1, y1, x3, y3, player.knockback * TIME_SCALE))
+
+            # since pygame flips the y axis, we have to calculate for new delta values
+            flip = x2 - x1 > 0
+            leap[flip] *= -1
+            knockback[flip] *= -1
+
+            delta[rows] = leap
+            player_delta[rows] = knockback
+            total_attack_delta[rows] += leap
+
+        # Enemy.trigger_delay
+        stunned = awake & disable_pursue
+        recovered = stunned & (stunned_counter > columns['stunned_delay'][indices])
+        stunned_counter[recovered] = 0
+        disable_pursue[recovered] = False
+
+        still = stunned & ~recovered
+        stunned_counter[still] += 0.1 * TIME_SCALE
+        delta[still] = 0
+
+        # Enemy.update_direction
+        facing_right[delta[:, 0] > 0] = True
+        facing_right[delta[:, 0] < 0] = False
+        direction[delta > 0] = 1
+        direction[delta < 0] = -1
+
+        # The rows get_new_vectors() failed for keep their state for Enemy.think, everything else is stored and written back
+        for name, value in new.items():
+            value[failed] = old[name][failed]
+            changed = value != old[name]
+
+            if value.ndim == 2:
+                changed = changed.any(axis=1)
+
+            rows = np.flatnonzero(changed)
+            if not len(rows):
+                continue
+
+            columns[name][indices[rows]] = value[rows]
+            changed_sprites = columns['sprite'][indices[rows]]
+
+            if name in self.vectors: # updated in place, like Enemy.think's Vector2s nothing else holds a reference to them
+                deque(map(Vector2.update, map(attrgetter(name), changed_sprites), value[rows].tolist()), maxlen=0)
+            else:
+                deque(map(setattr, changed_sprites, repeat(name), value[rows].tolist()), maxlen=0)
+
+        new_tiers = np.where(active, 'active', np.where(sleeping, 'sleeping', 'reduced'))
+        moved = np.flatnonzero(new_tiers != tier)
+
+        return list(zip(columns['sprite'][indices[moved]].tolist(), new_tiers[moved].tolist())), columns['sprite'][indices[failed]].tolist()
@@ -0,0 +1,172 @@
+import pygame
+from pygame.sprite import Sprite
+
+from math import ceil
+
+from settings import *
+from .level import LevelData
+from .tile import Coin
+
+
+class ChunkStreamer:
+    """
+    Note: Splits the level into CHUNK_SIZE x CHUNK_SIZE tile chunks and only keeps the ones around the player alive as sprites.
+    Evicting a chunk keeps what has happened in it: collected items stay gone, killed enemies stay dead, and enemies and dropped
+    coins are stored with their position (and enemies with their health) and come back where they were when the chunk is loaded again.
+    Loading a chunk takes a few milliseconds, so the ring just outside STREAM_RADIUS is prefetched a chunk or so per tick as the
+    player nears it instead of loading a whole row of chunks in the tick the player crosses into a new chunk
+    """
+    def __init__(self, game, level: LevelData, baked: dict[tuple[int, int], pygame.Surface] | None = None):
+        self.game = game
+        self.level = level
+        self.baked = baked or {} # static chunk surfaces baked ahead of time, used by the first load of their chunk
+
+        self.chunk_pixels = CHUNK_SIZE * TILE_SIZE
+        self.chunks_x = ceil(level.width / CHUNK_SIZE)
+        self.chunks_y = ceil(level.height / CHUNK_SIZE)
+
+        self.loaded: dict[tuple[int, int], list[tuple[tuple, Sprite]]] = {} # chunk -> (cell, sprite) of every sprite made from a tile layer cell
+        self.cell_sprites: set[Sprite] = set()
+        self.removed: set[tuple[str, int]] = set() # (layer name, cell index) of items that have been collected
+
+        # Enemies are identified by their index in level.objects, they are either alive in actors or stored in the chunk they are in
+        self.actors: dict[int, Sprite] = {}
+        self.stored_enemies: dict[tuple[int, int], dict[int, tuple[str, tuple[float, float], int | None]]] = {}
+        self.stored_coins: dict[tuple[int, int], list[tuple[float, float]]] = {} # coins dropped by enemies
+
+        for object_id, (name, x, y) in enumerate(level.objects):
+            if name != 'Spawn Point':
+                self.stored_enemies.setdefault(self.get_chunk((x, y)), {})[object_id] = (name, (x, y), None)
+
+        self.player_chunk = None
+        self.tick_count = 0
+
+    def get_chunk(self, pos) -> tuple[int, int]:
+        return int(pos[0] // self.chunk_pixels), int(pos[1] // self.chunk_pixels)
+
+    def get_chunks_around(self, chunk: tuple[int, int], radius: int) -> list[tuple[int, int]]:
+        cx, cy = chunk
+
+        return [(x, y) for x in range(max(0, cx - radius), min(self.chunks_x, cx + radius + 1)) for y in range(max(0, cy - radius), min(self.chunks_y, cy + radius + 1))]
+
+    def update(self, player: Sprite):
+        self.tick_count += 1
+        chunk = self.get_chunk(player.rect.center)
+
+        if chunk != self.player_chunk:
+            self.player_chunk = chunk
+            cx, cy = chunk
+
+            for key in [key for key in self.loaded if max(abs(key[0] - cx), abs(key[1] - cy)) > STREAM_EVICT_RADIUS]:
+                self.unload_chunk(key)
+
+            # Only chunks the player can already see and that weren't prefetched in time (or at all, on the first update of a level)
+            # are loaded here, prefetch() loads the rest of STREAM_RADIUS over the next ticks
+            view = pygame.Rect(0, 0, WIN_X + VIEW_MARGIN * 2, WIN_Y + VIEW_MARGIN * 2)
+            view.center = player.rect.center
+
+            for key in self.get_chunks_around(chunk, STREAM_RADIUS):
+                if key not in self.loaded and view.colliderect((key[0] * self.chunk_pixels, key[1] * self.chunk_pixels, self.chunk_pixels, self.chunk_pixels)):
+                    self.load_chunk(key)
+
+            self.evict_strays()
+
+        elif self.tick_count % STREAM_INTERVAL == 0:
+            self.evict_strays()
+
+        self.prefetch(player)
+
+    def prefetch(self, player: Sprite):
+        """
+        Note: Loads the nearest STREAM_LOADS_PER_TICK chunks that are within STREAM_RADIUS but not loaded yet, or in the ring outside
+        it and within STREAM_PREFETCH_MARGIN pixels of being inside it, i.e. that the player is about to need
+        """
+        x, y = player.rect.center
+        size = self.chunk_pixels
+        reach = STREAM_RADIUS * size + STREAM_PREFETCH_MARGIN
+        candidates = []
+
+        for key in self.get_chunks_around(self.player_chunk, STREAM_RADIUS + 1):
+            if key not in self.loaded:
+                left, top = key[0] * size, key[1] * size
+                distance = max(left - x, x - left - size, top - y, y - top - size) # to the nearest edge of the chunk
+
+                if distance <= reach:
+                    candidates.append((distance, key))
+
+        for _, key in sorted(candidates)[:STREAM_LOADS_PER_TICK]:
+            self.load_chunk(key)
+
+    def load_chunk(self, key: tuple[int, int]):
+        level = self.level
+        cx, cy = key
+        sprites = []
+
+        baked = self.baked.pop(key, None)
+        if baked is not None:
+            self.game.camera_sprites.add_static_chunk(key, baked)
+
+        for layer_name, ids in level.layers.items():
+            for y in range(cy * CHUNK_SIZE, min((cy + 1) * CHUNK_SIZE, level.height)):
+                row = y * level.width
+
+                for x in range(cx * CHUNK_SIZE, min((cx + 1) * CHUNK_SIZE, level.width)):
+                    tile_id = ids[row + x]
+
+                    if tile_id and (layer_name, row + x) not in self.removed:
+                        sprite = self.game.create_tile(layer_name, (x * TILE_SIZE, y * TILE_SIZE), tile_id, bake=baked is None)
+
+                        if sprite is not None:
+                            sprites.append(((layer_name, row + x), sprite))
+                            self.cell_sprites.add(sprite)
+
+        self.loaded[key] = sprites
+
+        for object_id, (name, pos, health) in self.stored_enemies.pop(key, {}).items():
+            enemy = self.game.create_enemy(name, pos)
+            if health is not None:
+                enemy.health = health
+            self.actors[object_id] = enemy
+
+        for pos in self.stored_coins.pop(key, ()):
+            self.game.create_coin(pos)
+
+    def unload_chunk(self, key: tuple[int, int]):
+        for cell, sprite in self.loaded.pop(key):
+            self.cell_sprites.discard(sprite)
+
+            if sprite.alive():
+                sprite.kill()
+            else: # collected while the chunk was loaded
+                self.removed.add(cell)
+
+        self.game.camera_sprites.remove_static_chunk(key)
+
+    def evict_strays(self):
+        # Stores the enemies and dropped coins that are in chunks that aren't loaded (anymore)
+        for object_id, enemy in list(self.actors.items()):
+            if not enemy.alive(): # killed
+                del self.actors[object_id]
+                continue
+
+            key = self.get_chunk(enemy.rect.center)
+            if key not in self.loaded:
+                self.stored_enemies.setdefault(key, {})[object_id] = (enemy.enemy_name, enemy.rect.topleft, enemy.health)
+                enemy.kill()
+                del self.actors[object_id]
+
+        for sprite in self.game.interactive_sprites.sprites():
+            if isinstance(sprite, Coin) and sprite not in self.cell_sprites:
+                key = self.get_chunk(sprite.rect.center)
+                if key not in self.loaded:
+                    self.stored_coins.setdefault(key, []).append(sprite.rect.topleft)
+                    sprite.kill()
+
+    def report(self) -> dict:
+        return {
+            'loaded chunks': len(self.loaded),
+            'chunks': self.chunks_x * self.chunks_y,
+            'live enemies': len(self.actors),
+            'stored enemies': sum(len(enemies) for enemies in self.stored_enemies.values()),
+            'collected': len(self.removed)
+        }
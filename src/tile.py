@@ -3,162 +3,93 @@ from pygame.sprite import Sprite, Group
 from pygame.math import Vector2
 
 from settings import *
+from .assets import assets
 
 
 class Tile(Sprite):
-    def __init__(self, pos: tuple[int, int], surface: pygame.Surface, groups: list[Group], layer_name: str) -> None:
+    static = True # whether the sprite stays put once placed (CameraGroup only re-indexes sprites that can move)
+
+    def __init__(self, pos: tuple[int, int], surface: pygame.Surface, groups: list[Group], layer_name: str, mask: pygame.mask.Mask | None = None) -> None:
         super().__init__(groups)
 
         self.image = surface
         self.rect = self.image.get_rect(topleft = pos)
-        self.mask = pygame.mask.from_surface(self.image)
+        self.mask = mask if mask is not None else pygame.mask.from_surface(self.image)
         self.layer_name = layer_name
 
 
-class Chest(Tile):
+class AnimatedTile(Tile):
+    """
+    Note: Subclasses list the layers they can be built from in layer_names, the frames themselves come from the shared asset registry
+    """
+    layer_names: tuple[str, ...] = ()
+
     def __init__(self, pos, groups, layer_name):
-        match layer_name:
-            case 'Chest':
-                self.animations = [pygame.transform.scale(pygame.image.load(f'./assets/sprite animations/chest/chest_{i}.png').convert_alpha(), (TILE_SIZE, TILE_SIZE)) for i in range(1, 5)]
-            
-            case 'Mini Chest':
-                self.animations = [pygame.transform.scale(pygame.image.load(f'./assets/sprite animations/mini_chest/mini_chest_{i}.png').convert_alpha(), (TILE_SIZE, TILE_SIZE)) for i in range(1, 5)]
-            
-            case _:
-                raise ValueError(f'Cannot assign layer \'{layer_name}\' to {__class__.__name__}.animations')
-        
-        super().__init__(pos, self.animations[0], groups, layer_name)
+        if layer_name not in self.layer_names:
+            raise ValueError(f'Cannot assign layer \'{layer_name}\' to {self.__class__.__name__}.animations')
 
-        self.animation_index = 0
-        self.animation_speed = 0.1
-                
+        self.animations = assets.get_animation(layer_name)
+
+        super().__init__(pos, self.animations[0], groups, layer_name, assets.get_mask(layer_name))
 
-class Coin(Tile):
-    def __init__(self, pos, groups, layer_name):
-        match layer_name:
-            case 'Coin':
-                self.animations = [pygame.transform.scale(pygame.image.load(f'./assets/sprite animations/coin/coin_{i}.png'), (TILE_SIZE, TILE_SIZE)) for i in range(1, 5)]
-            
-            case _:
-                raise ValueError(f'Cannot assign layer \'{layer_name}\' to {__class__.__name__}.animations')
-            
-        super().__init__(pos, self.animations[0], groups, layer_name)
-    
         self.animation_index = 0
-        self.animation_speed = 0.1
+        self.animation_speed = 0.1 * TIME_SCALE
 
-        self.radius = 150
-        self.vel = 4
-        # self.delta = Vector2()
 
-    def move_towards_player(self, player_center: Vector2 | tuple):
-        if Vector2(self.rect.center).distance_to(player_center) <= self.radius:
-            self.rect.center += Vector2(self.rect.center).move_towards(player_center, self.vel) - self.rect.center
-            
+class Chest(AnimatedTile):
+    layer_names = ('Chest', 'Mini Chest')
 
-class Flask(Tile):
-    def __init__(self, pos, groups, layer_name):
-        match layer_name:
-            case 'Small Blue Flask':
-                self.animations = [pygame.transform.scale(pygame.image.load(f'./assets/sprite animations/flasks/small_blue_flask_{i}.png').convert_alpha(), (TILE_SIZE, TILE_SIZE)) for i in range(1, 5)]
-            
-            case 'Small Red Flask':
-                self.animations = [pygame.transform.scale(pygame.image.load(f'./assets/sprite animations/flasks/small_red_flask_{i}.png').convert_alpha(), (TILE_SIZE, TILE_SIZE)) for i in range(1, 5)]
-
-            case 'Large Blue Flask':
-                self.animations = [pygame.transform.scale(pygame.image.load(f'./assets/sprite animations/flasks/large_blue_flask_{i}.png').convert_alpha(), (TILE_SIZE, TILE_SIZE)) for i in range(1, 5)]
-            
-            case 'Large Red Flask':
-                self.animations = [pygame.transform.scale(pygame.image.load(f'./assets/sprite animations/flasks/large_red_flask_{i}.png').convert_alpha(), (TILE_SIZE, TILE_SIZE)) for i in range(1, 5)]
-
-            case _:
-                raise ValueError(f'Cannot assign layer \'{layer_name}\' to {__class__.__name__}.animations')
-            
-        super().__init__(pos, self.animations[0], groups, layer_name)
-    
-        self.animation_index = 0
-        self.animation_speed = 0.1
 
+class Coin(AnimatedTile):
+    static = True # idle until the player gets within radius, see InteractiveGroup.update_sprites
+    layer_names = ('Coin',)
+    pool = None # the SpritePool the coin goes back to when it is killed, if it came from one
+    radius = 150
 
-class Key(Tile):
     def __init__(self, pos, groups, layer_name):
-        match layer_name:
-            case 'Golden Key':
-                self.animations = [pygame.transform.scale(pygame.image.load(f'./assets/sprite animations/keys/golden_key_{i}.png').convert_alpha(), (TILE_SIZE, TILE_SIZE)) for i in range(1, 5)]
-            
-            case 'Silver Key':
-                self.animations = [pygame.transform.scale(pygame.image.load(f'./assets/sprite animations/keys/silver_key_{i}.png').convert_alpha(), (TILE_SIZE, TILE_SIZE)) for i in range(1, 5)]
-
-            case _:
-                raise ValueError(f'Cannot assign layer \'{layer_name}\' to {__class__.__name__}.animations')
-
-        super().__init__(pos, self.animations[0], groups, layer_name)
-    
-        self.animation_index = 0
-        self.animation_speed = 0.1
+        super().__init__(pos, groups, layer_name)
 
+        self.vel = 4 * TIME_SCALE
+        # self.delta = Vector2()
 
-class Torch(Tile):
-    def __init__(self, pos, groups, layer_name):
-        match layer_name:
-            case 'Front Torch':
-                self.animations = [pygame.transform.scale(pygame.image.load(f'./assets/sprite animations/torch/front_torch_{i}.png').convert_alpha(), (TILE_SIZE, TILE_SIZE)) for i in range(1, 5)]
-            
-            case 'Left Torch':
-                self.animations = [pygame.transform.scale(pygame.image.load(f'./assets/sprite animations/torch/side_torch_{i}.png').convert_alpha(), (TILE_SIZE, TILE_SIZE)) for i in range(1, 5)]
-
-            case 'Right Torch':
-                self.animations = [pygame.transform.flip(pygame.transform.scale(pygame.image.load(f'./assets/sprite animations/torch/side_torch_{i}.png').convert_alpha(), (TILE_SIZE, TILE_SIZE)), True, False) for i in range(1, 5)]
-
-            case 'Small Candlestick':
-                self.animations = [pygame.transform.scale(pygame.image.load(f'./assets/sprite animations/torch/small_candlestick_{i}.png').convert_alpha(), (TILE_SIZE, TILE_SIZE)) for i in range(1, 5)]
-
-            case 'Tall Candlestick':
-                self.animations = [pygame.transform.scale(pygame.image.load(f'./assets/sprite animations/torch/tall_candlestick_{i}.png').convert_alpha(), (TILE_SIZE, TILE_SIZE)) for i in range(1, 5)]
-
-            case _:
-                raise ValueError(f'Cannot assign layer \'{layer_name}\' to {__class__.__name__}.animations')
-            
-        super().__init__(pos, self.animations[0], groups, layer_name)
-    
+    def reset(self, pos, layer_name='Coin'):
+        self.rect.topleft = pos
+        self.image = self.animations[0]
         self.animation_index = 0
-        self.animation_speed = 0.1
 
+    def kill(self):
+        was_alive = self.alive()
+        super().kill()
 
-class Flag(Tile):
-    def __init__(self, pos, groups, layer_name):
-        match layer_name:
-            case 'Flag':
-                self.animations = [pygame.transform.scale(pygame.image.load(f'./assets/sprite animations/flag/flag_{i}.png').convert_alpha(), (TILE_SIZE, TILE_SIZE)) for i in range(1, 5)]
-
-            case _:
-                raise ValueError(f'Cannot assign layer \'{layer_name}\' to {__class__.__name__}.animations')
-            
-        super().__init__(pos, self.animations[0], groups, layer_name)
-    
-        self.animation_index = 0
-        self.animation_speed = 0.1
+        if was_alive and self.pool is not None: # only once, however often a dead coin gets killed
+            self.pool.release(self)
 
+    def move_towards_player(self, dx: float, dy: float, distance_squared: float):
+        # dx, dy is the offset from the coin's center to the player's, the coin moves vel along it without overshooting
+        if distance_squared <= self.vel * self.vel:
+            self.rect.centerx += dx
+            self.rect.centery += dy
+        else:
+            scale = self.vel / distance_squared ** 0.5
+            self.rect.centerx = self.rect.centerx + dx * scale
+            self.rect.centery = self.rect.centery + dy * scale
 
-class Box(Tile):
-    def __init__(self, pos, groups, layer_name):    
-        match layer_name:
-            case 'Mini Silver Box':
-                self.animations = [pygame.transform.scale(pygame.image.load(f'./assets/sprite animations/mini_silver_box/mini_silver_box_{i}.png').convert_alpha(), (TILE_SIZE, TILE_SIZE)) for i in range(1, 5)]
 
-            case 'Mini Brown Box':
-                self.animations = [pygame.transform.scale(pygame.image.load(f'./assets/sprite animations/mini_brown_box/mini_brown_box_{i}.png').convert_alpha(), (TILE_SIZE, TILE_SIZE)) for i in range(1, 5)]
+class Flask(AnimatedTile):
+    layer_names = ('Small Blue Flask', 'Small Red Flask', 'Large Blue Flask', 'Large Red Flask')
 
-            case 'Silver Box':
-                self.animations = [pygame.transform.scale(pygame.image.load(f'./assets/sprite animations/silver_box/silver_box_{i}.png').convert_alpha(), (TILE_SIZE, TILE_SIZE)) for i in range(1, 5)]
 
-            case 'Brown Box':
-                self.animations = [pygame.transform.scale(pygame.image.load(f'./assets/sprite animations/brown_box/brown_box_{i}.png').convert_alpha(), (TILE_SIZE, TILE_SIZE)) for i in range(1, 5)]
+class Key(AnimatedTile):
+    layer_names = ('Golden Key', 'Silver Key')
 
-            case _:
-                raise ValueError(f'Cannot assign layer \'{layer_name}\' to {__class__.__name__}.animations')
-            
-        super().__init__(pos, self.animations[0], groups, layer_name)
-    
-        self.animation_index = 0
-        self.animation_speed = 0.1
\ No newline at end of file
+
+class Torch(AnimatedTile):
+    layer_names = ('Front Torch', 'Left Torch', 'Right Torch', 'Small Candlestick', 'Tall Candlestick')
+
+
+class Flag(AnimatedTile):
+    layer_names = ('Flag',)
+
+
+class Box(AnimatedTile):
+    layer_names = ('Mini Silver Box', 'Mini Brown Box', 'Silver Box', 'Brown Box')
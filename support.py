@@ -1,10 +1,47 @@
 import pygame
 
 from typing import NoReturn
+from functools import lru_cache
+from random import Random
+
+
+TEXT_CACHE_SIZE = 256
+
+rng = Random() # every random roll in the game goes through this, so that a replay can seed it the same way as the recording
+
+
+@lru_cache(maxsize=None)
+def get_font(font_name: str, font_size: int) -> pygame.font.Font:
+    # Fonts are only read from disk once per (name, size)
+    return pygame.font.Font(f'./assets/fonts/{font_name}.ttf', font_size)
+
+
+@lru_cache(maxsize=TEXT_CACHE_SIZE)
+def render_text(text: str, font_name: str, font_size: int, colour: tuple[int, int, int] | str) -> pygame.Surface:
+    """
+    Note: The returned surface is shared between callers, so it must not be modified
+    """
+    return get_font(font_name, font_size).render(text, True, colour)
+
+
+def get_text_cache_info() -> dict:
+    info = {}
+
+    for name, cache in (('font', get_font), ('text', render_text)):
+        stats = cache.cache_info()
+        lookups = stats.hits + stats.misses
+        info[name] = {
+            'hits': stats.hits,
+            'misses': stats.misses,
+            'size': stats.currsize,
+            'hit rate': stats.hits / lookups if lookups else 0
+        }
+
+    return info
+
 
 def display_text(surface: pygame.Surface, text: str, pos: tuple[float, float], colour: tuple[int, int, int] | str = 'white', font_name: str = 'font', font_size: int = 30, position: str = 'center') -> pygame.Rect | NoReturn:
-    font = pygame.font.Font(f'./assets/fonts/{font_name}.ttf', font_size)
-    image = font.render(text, True, colour)
+    image = render_text(text, font_name, font_size, tuple(colour) if isinstance(colour, list) else colour)
 
     match position:
         case 'topleft':
@@ -16,6 +53,6 @@ def display_text(surface: pygame.Surface, text: str, pos: tuple[float, float], c
             rect = image.get_rect(center=pos)
             surface.blit(image, rect)
             return rect
-        
+
         case _:
             raise ValueError('Invalid position.')
\ No newline at end of file